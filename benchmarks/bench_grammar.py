@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of the grammar engine."""
+from __future__ import unicode_literals, print_function, absolute_import
+
+from estnltk.text import Text
+from estnltk.grammar import Regex, Union, compile_grammar
+from estnltk.grammar.conflictresolver import resolve_using_maximal_coverage
+
+from .common import corpus_text
+
+
+class MaximalCoverageResolver(object):
+    """Conflict resolution of broad, overlapping candidate matches
+    (one to three word sequences; book-length text at the largest size)."""
+    params = [1000, 10000, 100000]
+    param_names = ['words']
+    timeout = 600
+
+    def setup(self, n_words):
+        symbol = Union(Regex('\\w+'), Regex('\\w+\\s+\\w+'), Regex('\\w+\\s+\\w+\\s+\\w+'),
+                       Regex('\\w+[,.]?\\s+\\w+'))
+        self.matches = symbol.get_matches(Text(corpus_text(n_words)), conflict_resolver=None)
+
+    def time_resolve(self, n_words):
+        resolve_using_maximal_coverage(list(self.matches))
+
+    def track_candidates(self, n_words):
+        return len(self.matches)
+
+
+class AdjectivePhraseGrammar(object):
+    """Matching of the adjective phrase grammar, interpreted and compiled."""
+    params = [1000, 10000, 100000]
+    param_names = ['words']
+    timeout = 600
+
+    def setup(self, n_words):
+        from estnltk.taggers.adjective_phrase_tagger.grammars import adjective_phrases
+        self.grammar = adjective_phrases
+        self.compiled = compile_grammar(adjective_phrases)
+        self.text = Text(corpus_text(n_words))
+        self.text.tag_analysis()
+        # the word attributes are cached by the text, so that only the matching is timed
+        self.text.lemma_lists, self.text.postag_lists, self.text.word_spans, self.text.word_texts
+
+    def time_interpreted(self, n_words):
+        self.grammar.get_matches(self.text)
+
+    def time_compiled(self, n_words):
+        self.compiled.get_matches(self.text)
+
+
+if __name__ == '__main__':
+    import time
+    print('{0:>10}{1:>14}{2:>12}'.format('words', 'candidates', 'seconds'))
+    for n_words in MaximalCoverageResolver.params:
+        benchmark = MaximalCoverageResolver()
+        benchmark.setup(n_words)
+        start = time.time()
+        benchmark.time_resolve(n_words)
+        print('{0:>10}{1:>14}{2:>12.3f}'.format(n_words, len(benchmark.matches), time.time() - start))
+
+    print()
+    print('{0:>10}{1:>14}{2:>12}'.format('words', 'interpreted', 'compiled'))
+    for n_words in AdjectivePhraseGrammar.params:
+        benchmark = AdjectivePhraseGrammar()
+        benchmark.setup(n_words)
+        times = []
+        for method in (benchmark.time_interpreted, benchmark.time_compiled):
+            start = time.time()
+            method(n_words)
+            times.append(time.time() - start)
+        print('{0:>10}{1:>14.3f}{2:>12.3f}'.format(n_words, *times))
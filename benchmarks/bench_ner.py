@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of the named entity recognizer."""
+from __future__ import unicode_literals, print_function, absolute_import
+
+from estnltk.text import Text
+from estnltk.ner import json_document_to_estner_document, load_shared_ner_tagger
+from estnltk.estner.featureextraction import GlobalContextFeatureExtractor
+
+from .common import corpus_text
+
+
+class GlobalContextFeatures(object):
+    """Global context features of long documents (book-length at the largest size)."""
+    params = [1000, 10000, 100000]
+    param_names = ['words']
+    timeout = 600
+
+    def setup(self, n_words):
+        text = Text(corpus_text(n_words))
+        self.doc = json_document_to_estner_document(text)
+        # the global context features depend on the output of the other extractors
+        for fex in load_shared_ner_tagger().fex.fex_list:
+            if not isinstance(fex, GlobalContextFeatureExtractor):
+                fex.process(self.doc)
+        self.fex = GlobalContextFeatureExtractor()
+
+    def time_process(self, n_words):
+        self.fex.process(self.doc)
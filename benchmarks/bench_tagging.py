@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""End-to-end benchmarks of the :py:class:`~estnltk.text.Text` tagging methods.
+
+Each benchmark times one tagging method on a text that already contains the
+layers the method depends on, so that the measurements are attributed to the
+layer itself. Besides the running time, the benchmarks report the throughput
+in words per second and the peak resident set size of the process.
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import time
+from copy import deepcopy
+
+from estnltk.text import Text
+
+from .common import corpus_text
+
+SIZES = [1000, 10000, 50000]
+
+# prepared (prerequisite-tagged) texts, keyed by benchmark class and size
+_prepared = {}
+
+
+class TaggingBenchmark(object):
+    """Base class of the tagging benchmarks."""
+    params = SIZES
+    param_names = ['words']
+    number = 1
+    repeat = 3
+    warmup_time = 0
+    timeout = 1800
+    unit = 'words/s'
+
+    # the name of the timed Text method
+    method = None
+    # the names of the Text methods creating the layers the timed method depends on
+    prerequisites = ()
+    # keyword arguments of Text
+    text_kwargs = {}
+
+    def prepare(self, n_words):
+        """Return a text of `n_words` words with the prerequisite layers tagged."""
+        key = (type(self), n_words)
+        if key not in _prepared:
+            text = Text(corpus_text(n_words), **self.text_kwargs)
+            for method in self.prerequisites:
+                getattr(text, method)()
+            # load the taggers and models before the measurements start
+            getattr(Text('Tere!', **self.text_kwargs), self.method)()
+            _prepared[key] = dict(text)
+        return _prepared[key]
+
+    def setup(self, n_words):
+        self.text = Text(deepcopy(self.prepare(n_words)), **self.text_kwargs)
+
+    def tag(self):
+        getattr(self.text, self.method)()
+
+    def count_words(self):
+        return len(self.text.words)
+
+    def time_tag(self, n_words):
+        self.tag()
+
+    def peakmem_tag(self, n_words):
+        self.tag()
+
+    def track_words_per_second(self, n_words):
+        start = time.time()
+        self.tag()
+        return self.count_words() / (time.time() - start)
+
+
+class TokenizeWords(TaggingBenchmark):
+    method = 'tokenize_words'
+
+
+class TagAnalysis(TaggingBenchmark):
+    method = 'tag_analysis'
+    prerequisites = ('tokenize_words',)
+
+
+class TagNamedEntities(TaggingBenchmark):
+    method = 'tag_named_entities'
+    prerequisites = ('tag_analysis',)
+
+
+class TagClauses(TaggingBenchmark):
+    method = 'tag_clauses'
+    prerequisites = ('tag_analysis',)
+
+
+class TagVerbChains(TaggingBenchmark):
+    method = 'tag_verb_chains'
+    prerequisites = ('tag_clauses',)
+
+
+class TagTimexes(TaggingBenchmark):
+    method = 'tag_timexes'
+    prerequisites = ('tag_analysis',)
+
+
+class TagWordnet(TaggingBenchmark):
+    method = 'tag_wordnet'
+    prerequisites = ('tag_analysis',)
+
+
+class TagSyntaxMaltParser(TaggingBenchmark):
+    method = 'tag_syntax_maltparser'
+    prerequisites = ('tag_analysis',)
+    text_kwargs = {'disambiguate': True}
+
+
+class TagSyntaxVISLCG3(TaggingBenchmark):
+    method = 'tag_syntax_vislcg3'
+    prerequisites = ('tag_analysis',)
+    text_kwargs = {'disambiguate': False}
+
+
+BENCHMARKS = [TokenizeWords, TagAnalysis, TagNamedEntities, TagClauses, TagVerbChains,
+              TagTimexes, TagWordnet, TagSyntaxMaltParser, TagSyntaxVISLCG3]
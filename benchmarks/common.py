@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Helpers shared by the benchmarks.
+
+The benchmark documents are built from the TEI corpus bundled with Estnltk
+(:py:data:`estnltk.core.AA_PATH`).
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import os
+
+from estnltk.core import AA_PATH, get_filenames
+from estnltk.teicorpus import parse_tei_corpus
+
+_corpus_texts = []
+
+
+def corpus_texts():
+    """Return the plain texts of all the documents in the bundled corpus."""
+    if not _corpus_texts:
+        for fnm in sorted(get_filenames(AA_PATH, suffix='.xml')):
+            docs = parse_tei_corpus(os.path.join(AA_PATH, fnm), target=['artikkel'], encoding='utf-8')
+            _corpus_texts.extend(doc.text for doc in docs)
+    return _corpus_texts
+
+
+def corpus_text(n_words):
+    """Return a text with approximately `n_words` words.
+
+    The text consists of whole corpus documents separated by paragraph breaks.
+    If the corpus is smaller than required, the documents are repeated.
+    """
+    parts = []
+    total = 0
+    texts = corpus_texts()
+    while total < n_words:
+        for text in texts:
+            parts.append(text)
+            total += len(text.split())
+            if total >= n_words:
+                break
+    return '\n\n'.join(parts)
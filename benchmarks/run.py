@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Run the tagging benchmarks without airspeed velocity.
+
+Each measurement runs in a separate process, so that the reported peak
+resident set size belongs to a single layer and document size (it includes
+the memory used for creating the prerequisite layers).
+
+Usage::
+
+    python -m benchmarks.run [--sizes 1000 10000] [--layers tag_analysis tag_clauses]
+
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import argparse
+import multiprocessing
+import sys
+import time
+
+from .bench_tagging import BENCHMARKS, SIZES
+
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in megabytes, or None, if unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return maxrss / (1024.0 * 1024.0) if sys.platform == 'darwin' else maxrss / 1024.0
+
+
+def measure(benchmark_class, n_words, queue):
+    benchmark = benchmark_class()
+    try:
+        benchmark.setup(n_words)
+        start = time.time()
+        benchmark.tag()
+        seconds = time.time() - start
+        queue.put((benchmark.count_words(), seconds, peak_rss_mb(), None))
+    except Exception as e:
+        message = str(e).strip().splitlines()
+        queue.put((None, None, None, '{0}: {1}'.format(type(e).__name__, message[0] if message else '')))
+
+
+def run(benchmark_class, n_words):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=measure, args=(benchmark_class, n_words, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the throughput of Text tagging methods.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='document sizes in words (default: %(default)s)')
+    parser.add_argument('--layers', nargs='+', default=None,
+                        help='names of the Text methods to benchmark (default: all)')
+    args = parser.parse_args(argv)
+
+    benchmarks = [b for b in BENCHMARKS if args.layers is None or b.method in args.layers]
+    print('{0:<24}{1:>10}{2:>12}{3:>14}{4:>14}'.format('method', 'words', 'seconds', 'words/s', 'peak RSS MB'))
+    for benchmark_class in benchmarks:
+        for n_words in args.sizes:
+            words, seconds, rss, error = run(benchmark_class, n_words)
+            if error is not None:
+                print('{0:<24}{1:>10}  failed: {2}'.format(benchmark_class.method, n_words, error))
+                continue
+            print('{0:<24}{1:>10}{2:>12.3f}{3:>14.0f}{4:>14}'.format(
+                benchmark_class.method, words, seconds, words / seconds,
+                '-' if rss is None else '{0:.1f}'.format(rss)))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals, print_function, absolute_import
 
+import sys
+import importlib
+
 from .__about__ import __version__
 
 from .vabamorf.morf import Vabamorf, analyze, spellcheck, fix_spelling, synthesize, disambiguate
@@ -8,11 +11,40 @@ from .vabamorf.morf import syllabify_word, syllabify_words
 from .text import Text
 from .textcleaner import TextCleaner, EST_ALPHA, RUS_ALPHA, DIGITS, WHITESPACE, PUNCTUATION, ESTONIAN, RUSSIAN
 from .disambiguator import Disambiguator
-from .ner import NerTrainer, NerTagger
-from .timex import TimexTagger
 from .clausesegmenter import ClauseSegmenter
-from .disambiguator import Disambiguator
 from .prettyprinter import PrettyPrinter
 from .grammar import *
-from .database import elastic
 from .tokenizers.word_tokenizer import EstWordTokenizer
+
+# Attributes with expensive imports (crfsuite models, Java components, database clients)
+# are imported on first access: name -> (module, attribute)
+_LAZY_ATTRIBUTES = {
+    'NerTrainer': ('.ner', 'NerTrainer'),
+    'NerTagger': ('.ner', 'NerTagger'),
+    'TimexTagger': ('.timex', 'TimexTagger'),
+    'elastic': ('.database', 'elastic'),
+}
+
+
+def _load_lazy_attribute(name):
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name in _LAZY_ATTRIBUTES:
+            return _load_lazy_attribute(name)
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+else:
+    # module level __getattr__ is not supported, import everything right away
+    for _name in list(_LAZY_ATTRIBUTES):
+        _load_lazy_attribute(_name)
+
+__all__ = sorted(set(name for name in globals() if not name.startswith('_') and name not in ('sys', 'importlib')) |
+                 set(_LAZY_ATTRIBUTES))
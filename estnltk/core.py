@@ -216,4 +216,22 @@ def get_filenames(root, prefix=u'', suffix=u''):
     list of str
         List of filenames matching the prefix and suffix criteria.
     """
-    return [fnm for fnm in os.listdir(root) if fnm.startswith(prefix) and fnm.endswith(suffix)]
\ No newline at end of file
+    return [fnm for fnm in os.listdir(root) if fnm.startswith(prefix) and fnm.endswith(suffix)]
+
+
+def default_cache_dir():
+    """Return the directory of the cache files of estnltk.
+
+    The directory is given by the environment variable ``ESTNLTK_CACHE_DIR`` or, by default,
+    is the directory ``estnltk`` in the user's cache directory (``$XDG_CACHE_HOME`` or ``~/.cache``).
+
+    Returns
+    -------
+    str
+        The path of the cache directory (which may not exist yet).
+    """
+    cache_dir = os.environ.get('ESTNLTK_CACHE_DIR')
+    if not cache_dir:
+        user_cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        cache_dir = os.path.join(user_cache_dir, 'estnltk')
+    return cache_dir
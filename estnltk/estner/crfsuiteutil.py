@@ -52,7 +52,7 @@ class Trainer(object):
 class Tagger():
     """Class for named entity tagging using a crfsuite model."""
 
-    def __init__(self, settings, model_filename):
+    def __init__(self, settings, model_filename=None, model_data=None):
         """Initialize the tagger.
 
         Parameters
@@ -62,9 +62,17 @@ class Tagger():
         model_filename: str
             The filename pointing to the path of the model that
             should be loaded.
+        model_data: bytes
+            The contents of a model, used instead of `model_filename`
+            (for instance, when the model is read from a model bundle).
         """
         self.tagger = pycrfsuite.Tagger()
-        self.tagger.open(model_filename)
+        if model_data is not None:
+            # crfsuite does not copy the data, so we have to keep a reference to it
+            self.model_data = model_data
+            self.tagger.open_inmemory(model_data)
+        else:
+            self.tagger.open(model_filename)
 
     def tag(self, nerdoc):
         """Tag the given document.
@@ -7,9 +7,10 @@ from __future__ import unicode_literals, print_function
 import re
 import codecs
 from collections import defaultdict
-from functools import reduce
 from itertools import product
 
+from six.moves import cPickle as pickle
+
 # Separator of field values.
 separator = ' '
 
@@ -237,6 +238,32 @@ class MorphFeatureExtractor(BaseFeatureExtractor):
         t[PUN] = b(t[POS] == '_Z_')
 
 
+def load_gazetteer(filename):
+    """Load a gazetteer file into a dictionary.
+
+    Parameters
+    ----------
+    filename: str
+        Path of the gazetteer file. Each line of the file contains a phrase
+        and a label separated by a tab.
+
+    Returns
+    -------
+    dict of str to frozenset of str
+        Mapping from phrases to their labels. The label sets are immutable, so
+        they can be safely shared between tokens and documents.
+    """
+    data = defaultdict(set)
+    with codecs.open(filename, 'rb', encoding="utf8") as f:
+        for ln in f:
+            word, lbl = ln.strip().rsplit("\t", 1)
+            data[word].add(lbl)
+    # there are only a few distinct label sets, share them between the phrases
+    label_sets = {}
+    return dict((word, label_sets.setdefault(frozenset(labels), frozenset(labels)))
+                for word, labels in data.items())
+
+
 class GazetteerFeatureExtractor(BaseFeatureExtractor):
     """Generates features indicating whether the token is present in a precompiled
     list of organisations, geographical locations or person names. For instance,
@@ -260,11 +287,26 @@ class GazetteerFeatureExtractor(BaseFeatureExtractor):
 
         """
         self.look_ahead = look_ahead
-        self.data = defaultdict(set)
-        with codecs.open(settings.GAZETTEER_FILE, 'rb', encoding="utf8") as f:
-            for ln in f:
-                word, lbl = ln.strip().rsplit("\t", 1)
-                self.data[word].add(lbl)
+        self._data = load_gazetteer(settings.GAZETTEER_FILE)
+        self._pickled_data = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = pickle.loads(self._pickled_data)
+            self._pickled_data = None
+        return self._data
+
+    def __getstate__(self):
+        # The gazetteer is stored as a nested pickle, so that unpickling the extractor
+        # is cheap and the gazetteer is decoded only when it is first used.
+        return {'look_ahead': self.look_ahead,
+                'pickled_data': pickle.dumps(self.data, protocol=2)}
+
+    def __setstate__(self, state):
+        self.look_ahead = state['look_ahead']
+        self._data = None
+        self._pickled_data = state['pickled_data']
 
     def process(self, doc):
         tokens = list(doc.tokens)
@@ -283,40 +325,85 @@ class GazetteerFeatureExtractor(BaseFeatureExtractor):
 
 
 class GlobalContextFeatureExtractor(BaseFeatureExtractor):
+    """Aggregates features over all occurrences of a lemma in the document,
+    provided that the lemma is capitalised somewhere else than at the beginning
+    of a sentence or after a quotation mark.
+
+    Tokens are grouped by lemmas in a single pass over the document and the
+    gazetteer labels of the neighbouring tokens are accumulated as bitmasks,
+    so the extraction takes linear time in the length of the document.
+    """
+
+    QUOTES = frozenset([u'\u201d', u'\u201e', u'\u201c'])
+
     def process(self, doc):
         IUOC = 'iuoc'
         NPROP = 'nprop'
         PPROP = 'pprop'
         NGAZ = 'ngaz'
         PGAZ = 'pgaz'
-        ui_lems = set([t['lem'] for t in doc.tokens
-                       if ('iu' in t and 'fsnt' not in t and
-                           t.prew.word not in set([u'\u201d', u'\u201e', u'\u201c']))])
-        sametoks_dict = defaultdict(list)
-        for t in doc.tokens:
-            if t['lem'] in ui_lems:
-                sametoks_dict[t['lem']].append(t)
-
-        for sametoks in sametoks_dict.values():
+        quotes = self.QUOTES
+
+        # bit values of the gazetteer labels seen in the document and of the label sets
+        label_bits = {}
+        labelset_masks = {}
+
+        def gaz_mask(labels):
+            key = frozenset(labels)
+            mask = labelset_masks.get(key)
+            if mask is None:
+                mask = 0
+                for label in key:
+                    if label not in label_bits:
+                        label_bits[label] = 1 << len(label_bits)
+                    mask |= label_bits[label]
+                labelset_masks[key] = mask
+            return mask
+
+        # lemma -> [tokens, capitalised occurrence, prew proper, next proper, prew gaz mask, next gaz mask]
+        groups = {}
+        for snt in doc.sentences:
+            for t in snt:
+                lem = t['lem']
+                group = groups.get(lem)
+                if group is None:
+                    group = groups[lem] = [[t], False, False, False, 0, 0]
+                else:
+                    group[0].append(t)
+                prew = t.prew
+                next = t.next
+                if not group[1] and 'iu' in t and 'fsnt' not in t and prew.word not in quotes:
+                    group[1] = True
+                if prew is not None:
+                    if not group[2] and 'prop' in prew:
+                        group[2] = True
+                    if 'gaz' in prew:
+                        group[4] |= gaz_mask(prew['gaz'])
+                if next is not None:
+                    if not group[3] and 'prop' in next:
+                        group[3] = True
+                    if 'gaz' in next:
+                        group[5] |= gaz_mask(next['gaz'])
+
+        bit_labels = [(bit, label) for label, bit in label_bits.items()]
+
+        def labels_of(mask):
+            return set(label for bit, label in bit_labels if mask & bit)
+
+        for sametoks, ui, pprop, nprop, pgaz_mask, ngaz_mask in groups.values():
+            if not ui:
+                continue
+            pgaz_set = labels_of(pgaz_mask) if pgaz_mask else None
+            ngaz_set = labels_of(ngaz_mask) if ngaz_mask else None
             for t in sametoks:
                 t[IUOC] = 'y'
-
-            if any(t.prew and 'prop' in t.prew for t in sametoks):
-                for t in sametoks:
+                if pprop:
                     t[PPROP] = 'y'
-
-            if any(t.next and 'prop' in t.next for t in sametoks):
-                for t in sametoks:
+                if nprop:
                     t[NPROP] = 'y'
-
-            pgaz_set = reduce(set.union, [t.prew["gaz"] for t in sametoks if t.prew and 'gaz' in t.prew], set([]))
-            if pgaz_set:
-                for t in sametoks:
+                if pgaz_set:
                     t[PGAZ] = pgaz_set
-
-            ngaz_set = reduce(set.union, [t.next["gaz"] for t in sametoks if t.next and 'gaz' in t.next], set([]))
-            if ngaz_set:
-                for t in sametoks:
+                if ngaz_set:
                     t[NGAZ] = ngaz_set
 
     def __process(self, doc):
@@ -502,6 +589,23 @@ class LocalFeatureExtractor(BaseFeatureExtractor):
         t[LEN] = str(len(t[FEAT]))
 
 
+def compile_templates(templates):
+    """Precompute the feature names of the given templates.
+
+    Parameters
+    ----------
+    templates: list of template tuples (str, int)
+        Feature templates, see :py:func:`apply_templates`.
+
+    Returns
+    -------
+    list of (str, tuple)
+        Pairs of feature name and the corresponding template.
+    """
+    return [('|'.join(['%s[%d]' % (f, o) for f, o in template]), tuple(template))
+            for template in templates]
+
+
 def apply_templates(toks, templates):
     """
     Generate features for an item sequence by applying feature templates.
@@ -520,8 +624,12 @@ def apply_templates(toks, templates):
         where name and offset specify a field name and offset from which
         the template extracts a feature value.
     """
-    for template in templates:
-        name = '|'.join(['%s[%d]' % (f, o) for f, o in template])
+    apply_compiled_templates(toks, compile_templates(templates))
+
+
+def apply_compiled_templates(toks, compiled_templates):
+    """Apply feature templates compiled with :py:func:`compile_templates`."""
+    for name, template in compiled_templates:
         for t in range(len(toks)):
             values_list = []
             for field, offset in template:
@@ -531,7 +639,7 @@ def apply_templates(toks, templates):
                     break
                 if field in toks[p]:
                     value = toks[p][field]
-                    values_list.append(value if isinstance(value, (set, list)) else [value])
+                    values_list.append(value if isinstance(value, (set, frozenset, list)) else [value])
             if len(template) == len(values_list):
                 for values in product(*values_list):
                     toks[t]['F'].append('%s=%s' % (name, '|'.join(values)))
@@ -551,6 +659,7 @@ class FeatureExtractor(object):
             The settings and configuration of the NER system.
         """
         self.settings = settings
+        self.templates = compile_templates(settings.TEMPLATES)
         self.fex_list = []
         for fex_name in settings.FEATURE_EXTRACTORS:
             fex_class = FeatureExtractor._get_class(fex_name)
@@ -571,7 +680,7 @@ class FeatureExtractor(object):
         # apply the feature templates.
         for doc in docs:
             for snt in doc.sentences:
-                apply_templates(snt, self.settings.TEMPLATES)
+                apply_compiled_templates(snt, self.templates)
 
     @staticmethod
     def _get_class(kls):
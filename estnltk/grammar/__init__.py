@@ -1 +1,4 @@
 from .grammar import *
+from .match import concatenate_matches
+from .compiler import compile_grammar
+from .context import GrammarContext
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""Compiler of grammars into word-level automata.
+
+The symbols of a grammar are evaluated independently of each other: every
+:py:class:`~estnltk.grammar.Lemmas` or :py:class:`~estnltk.grammar.Postags` symbol
+runs its regular expression over all analyses of all words and every
+:py:class:`~estnltk.grammar.Concatenation` joins the full match lists of its
+symbols. :py:func:`compile_grammar` turns a grammar into an equivalent symbol,
+which gives exactly the same matches, but
+
+* the word-level symbols (:py:class:`~estnltk.grammar.Lemmas`,
+  :py:class:`~estnltk.grammar.Postags`, :py:class:`~estnltk.grammar.Suffix`
+  and their unions and intersections) are evaluated in a single pass over the
+  words of the text; the tests of the lemmas, postags and word forms are memoized,
+  so that each distinct value is tested only once,
+* the concatenations of word-level symbols, regular expressions (such as the
+  whitespace separators) and other such concatenations are run as an automaton
+  over the text positions: the states reached after each symbol are kept, only the
+  words and separators that continue a state are visited and match objects are
+  created only for the resulting matches.
+
+The symbols that cannot be compiled (layers, gaps, custom symbols) are evaluated
+as usual, with their compilable sub-symbols replaced by the compiled ones.
+
+Example::
+
+    from estnltk.grammar import Postags, Regex, Concatenation, compile_grammar
+
+    grammar = compile_grammar(Concatenation(Postags('D'), Regex('\\s'), Postags('A'), name='phrase'))
+    grammar.annotate(text)
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+from functools import reduce
+
+from .grammar import Symbol, Regex, IRegex, Lemmas, Postags, Suffix, Union, Intersection
+from .grammar import Concatenation, AllGaps, Gaps
+from .match import Match, concatenate_match_sequence
+
+# keys of the evaluation cache (the symbol matches are cached by integer ids)
+WORD_TABLE = 'word_table'
+START_INDEX = 'start_index'
+
+
+def compile_grammar(symbol):
+    """Compile the grammar to a symbol that is evaluated in one pass over the words.
+
+    Parameters
+    ----------
+    symbol: :py:class:`~estnltk.grammar.Symbol`
+        The root symbol of the grammar.
+
+    Returns
+    -------
+    :py:class:`~estnltk.grammar.Symbol`
+        The compiled symbol, which gives the same matches as the original one.
+        The original grammar is not modified.
+    """
+    return _Compiler().compile(symbol)
+
+
+class _Compiler(object):
+
+    def __init__(self):
+        self.compiled = {}
+        self.leaves = []
+
+    def compile(self, symbol):
+        # shared sub-symbols are compiled once, so that their matches are still cached once
+        key = id(symbol)
+        if key not in self.compiled:
+            self.compiled[key] = self._compile(symbol)
+        return self.compiled[key]
+
+    def _compile(self, symbol):
+        cls = type(symbol)
+        if cls in (Lemmas, Postags, Suffix):
+            leaf = _WordLeaf(symbol, self.leaves)
+            self.leaves.append(leaf)
+            return leaf
+        if cls in (Union, Intersection):
+            symbols = [self.compile(s) for s in symbol.symbols]
+            if all(isinstance(s, _WordSymbol) for s in symbols):
+                return _WordOperation(cls, symbols, symbol.name, self.leaves)
+            return cls(*symbols, name=symbol.name)
+        if cls is Concatenation:
+            symbols = [self.compile(s) for s in symbol.symbols]
+            if all(_is_monotonic(s) for s in symbols):
+                return _ConcatenationAutomaton(symbols, symbol.name)
+            return Concatenation(*symbols, name=symbol.name)
+        if cls in (Regex, IRegex):
+            return _CompiledRegex(symbol)
+        if cls in (AllGaps, Gaps):
+            symbols = [self.compile(s) for s in symbol.symbols]
+            return cls(*symbols, name=symbol.name, max_gap=symbol.max_gap)
+        return symbol
+
+
+def _is_monotonic(symbol):
+    """Are both the start and the end positions of the matches of the symbol non-decreasing?"""
+    return isinstance(symbol, (_WordSymbol, _CompiledRegex, _ConcatenationAutomaton))
+
+
+class _WordTable(object):
+    """The words of a text and the results of the word-level tests."""
+
+    def __init__(self, text, leaves):
+        self.text = text.text
+        self.spans = text.word_spans
+        self.starts = dict((start, idx) for idx, (start, _) in enumerate(self.spans))
+        self.names = {}
+        self.counts = {}
+        for kind in set(leaf.kind for leaf in leaves):
+            if kind is Lemmas:
+                values = text.lemma_lists
+            elif kind is Postags:
+                values = text.postag_lists
+            else:
+                values = [[word_text.lower()] for word_text in text.word_texts]
+            # many words have the same values, so the tests are run once for each distinct list of values
+            keys = [tuple(word_values) for word_values in values]
+            distinct = set(keys)
+            for leaf in leaves:
+                if leaf.kind is kind:
+                    counts = dict((key, leaf.count(key)) for key in distinct)
+                    self.counts[id(leaf)] = [counts[key] for key in keys]
+
+
+class _WordSymbol(Symbol):
+    """Base class of the compiled word-level symbols.
+
+    The matches of a word-level symbol are given by the names of the matches
+    on each word; there are as many names as the original symbol has matches
+    on the word."""
+
+    def __init__(self, name, leaves):
+        super(_WordSymbol, self).__init__(name)
+        self.leaves = leaves
+
+    def word_table(self, text, cache):
+        # the cache may be shared by several compiled grammars (see GrammarContext)
+        key = (WORD_TABLE, id(self.leaves))
+        table = cache.get(key)
+        if table is None:
+            table = cache[key] = _WordTable(text, self.leaves)
+        return table
+
+    def word_names(self, table):
+        """The list of match names on each word."""
+        names = table.names.get(id(self))
+        if names is None:
+            names = table.names[id(self)] = self.compute_word_names(table)
+        return names
+
+    def compute_word_names(self, table):
+        raise NotImplementedError()
+
+    def get_matches_without_cache(self, text, **env):
+        table = self.word_table(text, env['cache'])
+        matches = []
+        for (start, end), names in zip(table.spans, self.word_names(table)):
+            for name in names:
+                matches.append(Match(start, end, table.text[start:end], name))
+        return matches
+
+    def start_index(self, text, cache):
+        """Mapping from start positions to lists of (order, end, match) tuples.
+        The matches are (start, end, name) tuples, which are converted to
+        :py:class:`~estnltk.grammar.match.Match` objects only in the results."""
+        table = self.word_table(text, cache)
+        return _WordStartIndex(table, self.word_names(table))
+
+    def items(self, text, cache):
+        """The (start, end, match) tuples of the symbol, in the order of the matches."""
+        table = self.word_table(text, cache)
+        for (start, end), names in zip(table.spans, self.word_names(table)):
+            for name in names:
+                yield start, end, (start, end, name)
+
+
+class _WordStartIndex(object):
+    """Start index of the matches of a word-level symbol."""
+
+    def __init__(self, table, word_names):
+        self.table = table
+        self.word_names = word_names
+
+    def get(self, start, default=None):
+        idx = self.table.starts.get(start)
+        if idx is None or not self.word_names[idx]:
+            return default
+        end = self.table.spans[idx][1]
+        return [((idx, k), end, (start, end, name)) for k, name in enumerate(self.word_names[idx])]
+
+
+class _WordLeaf(_WordSymbol):
+    """Compiled :py:class:`~estnltk.grammar.Lemmas`, :py:class:`~estnltk.grammar.Postags`
+    or :py:class:`~estnltk.grammar.Suffix` symbol."""
+
+    def __init__(self, symbol, leaves):
+        super(_WordLeaf, self).__init__(symbol.name, leaves)
+        self.kind = type(symbol)
+        if self.kind is Suffix:
+            suffix = symbol.suffix
+            self.test = lambda value: value.endswith(suffix)
+        else:
+            pattern = symbol.pattern
+            self.test = lambda value: pattern.match(value) is not None
+        self.memo = {}
+
+    def count(self, values):
+        """The number of matching values."""
+        memo = self.memo
+        n = 0
+        for value in values:
+            result = memo.get(value)
+            if result is None:
+                result = memo[value] = self.test(value)
+            if result:
+                n += 1
+        return n
+
+    def compute_word_names(self, table):
+        name = (self.name, )
+        return [name * n for n in table.counts[id(self)]]
+
+
+class _WordOperation(_WordSymbol):
+    """Compiled :py:class:`~estnltk.grammar.Union` or :py:class:`~estnltk.grammar.Intersection`
+    of word-level symbols."""
+
+    def __init__(self, kind, symbols, name, leaves):
+        super(_WordOperation, self).__init__(name, leaves)
+        self.kind = kind
+        self.symbols = symbols
+
+    def compute_word_names(self, table):
+        columns = [s.word_names(table) for s in self.symbols]
+        if self.kind is Union:
+            # the matches are sorted by position, so that the matches on a word are in the order of the symbols
+            names = [reduce(lambda a, b: a + b, word_names) for word_names in zip(*columns)]
+        else:
+            # intersect() pairs the equal matches one by one, keeping the left ones
+            names = [reduce(lambda a, b: a[:len(b)], word_names) for word_names in zip(*columns)]
+        if self.name is not None:
+            name = (self.name, )
+            names = [name * len(word_names) for word_names in names]
+        return names
+
+
+class _CompiledRegex(Symbol):
+    """Compiled :py:class:`~estnltk.grammar.Regex` symbol.
+
+    In concatenations, the matches are represented by (start, end, name) tuples."""
+
+    def __init__(self, symbol):
+        super(_CompiledRegex, self).__init__(symbol.name)
+        self.symbol = symbol
+
+    def get_matches_without_cache(self, text, **env):
+        return self.symbol.get_matches_without_cache(text, **env)
+
+    def items(self, text, cache):
+        name = self.name
+        return ((m.start(), m.end(), (m.start(), m.end(), name)) for m in self.symbol.pattern.finditer(text.text))
+
+    def start_index(self, text, cache):
+        key = (START_INDEX, id(self))
+        index = cache.get(key)
+        if index is None:
+            index = cache[key] = {}
+            for k, (start, end, m) in enumerate(self.items(text, cache)):
+                index.setdefault(start, []).append((k, end, m))
+        return index
+
+
+def _match_start_index(symbol, text, cache):
+    key = (START_INDEX, id(symbol))
+    index = cache.get(key)
+    if index is None:
+        index = cache[key] = {}
+        for k, m in enumerate(symbol.get_matches(text, cache=cache)):
+            index.setdefault(m.start, []).append((k, m.end, m))
+    return index
+
+
+class _ConcatenationAutomaton(Symbol):
+    """Compiled :py:class:`~estnltk.grammar.Concatenation` of symbols, whose matches
+    are ordered by both the start and the end positions.
+
+    The concatenation joins each match of a symbol with the first joined sequence
+    (in the order of the matches) that ends at the start of the match. The automaton
+    keeps this sequence for every end position reached after a symbol, so that
+    only the matches starting at these positions are visited."""
+
+    def __init__(self, symbols, name):
+        super(_ConcatenationAutomaton, self).__init__(name)
+        self.symbols = symbols
+
+    def items(self, text, cache):
+        return ((m.start, m.end, m) for m in self.get_matches(text, cache=cache))
+
+    def start_index(self, text, cache):
+        return _match_start_index(self, text, cache)
+
+    def get_matches_without_cache(self, text, **env):
+        cache = env['cache']
+        symbols = self.symbols
+        first = symbols[0]
+        states = {}
+        sequences = []
+        for start, end, m in _symbol_items(first, text, cache):
+            if len(symbols) == 1:
+                sequences.append((m, ))
+            elif end not in states:
+                states[end] = (m, )
+        for level, symbol in enumerate(symbols[1:], 2):
+            index = _symbol_start_index(symbol, text, cache)
+            candidates = []
+            for position, sequence in states.items():
+                for order, end, m in index.get(position, ()):
+                    candidates.append((order, end, sequence + (m, )))
+            candidates.sort(key=lambda candidate: candidate[0])
+            if level == len(symbols):
+                sequences = [sequence for _, _, sequence in candidates]
+            else:
+                states = {}
+                for _, end, sequence in candidates:
+                    if end not in states:
+                        states[end] = sequence
+        text_str = text.text
+        return [concatenate_match_sequence([_as_match(m, text_str) for m in sequence], text_str, self.name)
+                for sequence in sequences]
+
+
+def _symbol_items(symbol, text, cache):
+    if isinstance(symbol, (_WordSymbol, _CompiledRegex, _ConcatenationAutomaton)):
+        return symbol.items(text, cache)
+    return ((m.start, m.end, m) for m in symbol.get_matches(text, cache=cache))
+
+
+def _symbol_start_index(symbol, text, cache):
+    if isinstance(symbol, (_WordSymbol, _CompiledRegex, _ConcatenationAutomaton)):
+        return symbol.start_index(text, cache)
+    return _match_start_index(symbol, text, cache)
+
+
+def _as_match(m, text):
+    if isinstance(m, Match):
+        return m
+    start, end, name = m
+    return Match(start, end, text[start:end], name)
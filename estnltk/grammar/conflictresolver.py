@@ -2,12 +2,23 @@
 """Module containing functionality to resolve conflicting matches."""
 from __future__ import unicode_literals, print_function, absolute_import
 
+from bisect import bisect_left
+
 
 def resolve_using_maximal_coverage(matches):
     """Given a list of matches, select a subset of matches
     such that there are no overlaps and the total number of
     covered characters is maximal.
 
+    This is a weighted interval scheduling: the matches are processed
+    in the order of their start positions, and the best score of a match
+    is its length plus the best score of the matches ending before it.
+    The matches ending before a match are found with binary search over
+    the matches sorted by their end positions, so the running time is
+    O(N log N) in the number of matches.
+    If there are several equally good selections, the matches earlier
+    in the sorted order are preferred.
+
     Parameters
     ----------
     matches: list of Match
@@ -22,26 +33,29 @@ def resolve_using_maximal_coverage(matches):
     N = len(matches)
     scores = [len(match) for match in matches]
     prev = [-1] * N
+    # (end, index) of the matches, sorted by the end positions
+    ends = sorted((match.end, i) for i, match in enumerate(matches))
+    # the best score (and the first match having it) among the matches ending before the current one
+    bestscore = 0
+    bestprev = -1
+    n_before = 0
     for i in range(1, N):
-        bestscore = -1
-        bestprev = -1
-        j = i
-        while j >= 0:
-            # if matches do not overlap
-            if matches[j].is_before(matches[i]):
-                l = scores[j] + len(matches[i])
-                if l >= bestscore:
-                    bestscore = l
-                    bestprev = j
-            else:
-                # in case of overlapping matches
-                l = scores[j] - len(matches[j]) + len(matches[i])
-                if l >= bestscore:
-                    bestscore = l
-                    bestprev = prev[j]
-            j = j - 1
-        scores[i] = bestscore
-        prev[i] = bestprev
+        match = matches[i]
+        # the matches before (start, i) in the order of ends have been processed
+        # and do not overlap with the current match
+        n = bisect_left(ends, (match.start, i), n_before)
+        for end, j in ends[n_before:n]:
+            if scores[j] > bestscore or (scores[j] == bestscore and j < bestprev):
+                bestscore = scores[j]
+                bestprev = j
+        n_before = n
+        scores[i] += bestscore
+        if bestscore > 0:
+            prev[i] = bestprev
+        elif matches[0].end <= match.start:
+            # no characters are covered before the match, but there are
+            # zero-length matches: the first one is linked to
+            prev[i] = 0
     # first find the matching with highest combined score
     bestscore = max(scores)
     bestidx = len(scores) - scores[-1::-1].index(bestscore) -1
@@ -53,4 +67,3 @@ def resolve_using_maximal_coverage(matches):
         bestidx = prev[bestidx]
     # filter the matches
     return [matches[idx] for idx in reversed(keepidxs)]
-
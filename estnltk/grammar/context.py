@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Evaluation context that caches grammar matches sentence by sentence.
+
+:py:meth:`~estnltk.grammar.Symbol.get_matches` evaluates a grammar on the whole text
+and caches the matches of the shared sub-symbols only during the call.
+:py:class:`GrammarContext` evaluates the grammars on the sentences of the text
+and keeps the matches of all symbols for each sentence, keyed by the hash of the
+sentence contents. When a text is annotated again after an edit, only the changed
+sentences are evaluated; when several grammars with shared sub-symbols are run over
+the same corpus, the shared sub-symbols are evaluated once per sentence::
+
+    from estnltk.grammar import GrammarContext
+
+    context = GrammarContext()
+    grammar.annotate(text, context=context)
+    other_grammar.annotate(text, context=context)
+
+Note that as the grammars are evaluated sentence by sentence, the matches cannot
+span several sentences and only the layer elements within a sentence are visible
+to the symbols. The sentence key covers what the symbols of the grammar read: the
+text of the sentence, the spans, texts, lemmas and postags of the words and the
+spans of the elements of the layers of the :py:class:`~estnltk.grammar.Layer` and
+:py:class:`~estnltk.grammar.LayerRegex` symbols. So the layers added by annotating
+a text do not change the keys, unless the grammar reads them. If the grammar
+contains custom symbols, the key covers the spans of the elements of all layers.
+The symbols must not be modified while their matches are cached.
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import hashlib
+from bisect import bisect_right
+from collections import OrderedDict
+
+import six
+
+from ..names import TEXT, START, END, WORDS, SENTENCES, ANALYSIS, LEMMA, POSTAG
+from ..text import Text
+from .grammar import Regex, IRegex, Lemmas, Postags, Suffix, Layer, LayerRegex
+from .grammar import Union, Intersection, Concatenation, AllGaps, Gaps
+from .compiler import _WordLeaf, _WordOperation, _CompiledRegex, _ConcatenationAutomaton
+from .match import shift_match
+from .conflictresolver import resolve_using_maximal_coverage
+
+# the symbols that read only the text and the words
+_TEXT_SYMBOLS = (Regex, IRegex, Lemmas, Postags, Suffix, _WordLeaf, _CompiledRegex)
+# the symbols that read only their sub-symbols
+_COMPOSITE_SYMBOLS = (Union, Intersection, Concatenation, AllGaps, Gaps, _WordOperation, _ConcatenationAutomaton)
+
+
+class GrammarContext(object):
+    """Cache of the grammar matches of sentences."""
+
+    def __init__(self, conflict_resolver=resolve_using_maximal_coverage, max_sentences=None):
+        """Initialize a new context.
+
+        Parameters
+        ----------
+        conflict_resolver: function
+            The default conflict resolver of the root symbol matches.
+        max_sentences: int
+            The maximum number of sentences to keep. If the limit is reached, the
+            least recently used sentences are dropped. By default, there is no limit.
+        """
+        self.conflict_resolver = conflict_resolver
+        self.max_sentences = max_sentences
+        self.hits = 0
+        self.misses = 0
+        self.__sentences = OrderedDict()
+        # the matches are cached by the ids of the symbols, so the symbols must be kept alive
+        self.__symbols = {}
+        # the layers read by the grammars, by the ids of the root symbols
+        self.__layers = {}
+
+    def __len__(self):
+        return len(self.__sentences)
+
+    def clear(self):
+        """Drop all cached sentences."""
+        self.__sentences.clear()
+        self.__symbols.clear()
+        self.__layers.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_matches(self, symbol, text, conflict_resolver=None):
+        """Get the matches of the symbol on given text.
+
+        Parameters
+        ----------
+        symbol: :py:class:`~estnltk.grammar.Symbol`
+            The root symbol of the grammar.
+        text: :py:class:`~estnltk.text.Text`
+            The text to match.
+        conflict_resolver: function
+            The conflict resolver of the matches. By default, the resolver of the context is used.
+
+        Returns
+        -------
+        list of :py:class:`~estnltk.grammar.match.Match`
+        """
+        if isinstance(text, six.string_types):
+            text = Text(text)
+        if conflict_resolver is None:
+            conflict_resolver = self.conflict_resolver
+        self.__symbols[id(symbol)] = symbol
+        if id(symbol) not in self.__layers:
+            self.__layers[id(symbol)] = symbol_layers(symbol)
+        spans = text.sentence_spans
+        keys = sentence_keys(text, spans, self.__layers[id(symbol)])
+        entries = self.__get_entries(text, spans, keys)
+        matches = []
+        for (start, _), (sentence, cache) in zip(spans, entries):
+            for match in symbol.get_matches(sentence, cache=cache):
+                matches.append(shift_match(match, start))
+        if conflict_resolver is not None:
+            matches = conflict_resolver(matches)
+        return matches
+
+    def __get_entries(self, text, spans, keys):
+        sentences = self.__sentences
+        entries = [None] * len(keys)
+        # positions of the sentences that are not cached, by the keys
+        missing = OrderedDict()
+        for idx, key in enumerate(keys):
+            entry = sentences.pop(key, None)
+            if entry is None:
+                missing.setdefault(key, []).append(idx)
+            else:
+                entries[idx] = sentences[key] = entry
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+        if missing:
+            pieces = text.split_given_spans([spans[positions[0]] for positions in missing.values()])
+            for (key, positions), piece in zip(missing.items(), pieces):
+                entry = sentences[key] = (piece, {})
+                for idx in positions:
+                    entries[idx] = entry
+        if self.max_sentences is not None:
+            while len(sentences) > self.max_sentences:
+                sentences.popitem(last=False)
+        return entries
+
+
+def symbol_layers(symbol):
+    """Find the layers read by the symbols of the grammar.
+
+    Parameters
+    ----------
+    symbol: :py:class:`~estnltk.grammar.Symbol`
+        The root symbol of the grammar.
+
+    Returns
+    -------
+    list of str
+        The sorted names of the layers, or None, if the grammar contains custom symbols,
+        which may read any layer.
+    """
+    layers = set()
+    stack = [symbol]
+    seen = set()
+    while stack:
+        s = stack.pop()
+        if id(s) in seen:
+            continue
+        seen.add(id(s))
+        cls = type(s)
+        if cls in (Layer, LayerRegex):
+            layers.add(s.layer_name)
+        elif cls in _COMPOSITE_SYMBOLS:
+            stack.extend(s.symbols)
+        elif cls not in _TEXT_SYMBOLS:
+            return None
+    return sorted(layers)
+
+
+def sentence_keys(text, spans, layers=None):
+    """Compute the content hashes of the sentences of the text.
+
+    Parameters
+    ----------
+    text: :py:class:`~estnltk.text.Text`
+        The text.
+    spans: list of (int, int)
+        The spans of the sentences.
+    layers: list of str
+        The names of the layers to hash in addition to the words (see :py:func:`symbol_layers`).
+        By default, all layers are hashed.
+
+    Returns
+    -------
+    list of str
+    """
+    starts = [start for start, _ in spans]
+    if layers is None:
+        names = sorted(text.keys())
+        marker = None
+    else:
+        names = [WORDS] + [layer for layer in layers if layer != WORDS]
+        marker = tuple((layer, layer in text) for layer in names)
+    contents = [[text.text[start:end], marker] for start, end in spans]
+    for layer in names:
+        elements = text[layer] if layer in text else None
+        if layer in (TEXT, SENTENCES) or not isinstance(elements, list):
+            continue
+        for element in elements:
+            start, end = element[START], element[END]
+            # the sentences contain only the elements within their spans
+            if isinstance(start, list):
+                first, last = min(start), max(end)
+            else:
+                first, last = start, end
+            idx = bisect_right(starts, first) - 1
+            if idx < 0 or last > spans[idx][1]:
+                continue
+            offset = spans[idx][0]
+            if isinstance(start, list):
+                span = (tuple(s - offset for s in start), tuple(e - offset for e in end))
+            else:
+                span = (start - offset, end - offset)
+            if layer == WORDS:
+                analysis = tuple((a[LEMMA], a[POSTAG]) for a in element.get(ANALYSIS, []))
+                contents[idx].append((layer, span, element[TEXT], analysis))
+            else:
+                contents[idx].append((layer, span))
+    return [hashlib.sha1(repr(content).encode('utf-8')).hexdigest() for content in contents]
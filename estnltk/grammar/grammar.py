@@ -2,12 +2,13 @@
 from __future__ import unicode_literals, print_function, absolute_import
 
 import regex as re
+from bisect import bisect_left, bisect_right
 from functools import reduce
 from itertools import chain
 from collections import defaultdict
 import six
 from ..text import Text
-from .match import Match, concatenate_matches, copy_rename, intersect
+from .match import Match, concatenate_match_sequence, copy_rename, intersect
 from .conflictresolver import resolve_using_maximal_coverage
 
 
@@ -28,10 +29,10 @@ class Symbol(object):
         assert isinstance(value, str)
         self.__name = value
 
-    def annotate(self, text, conflict_resolver=resolve_using_maximal_coverage):
+    def annotate(self, text, conflict_resolver=resolve_using_maximal_coverage, context=None):
         if isinstance(text, six.string_types):
             text = Text(text)
-        matches = self.get_matches(text, conflict_resolver=conflict_resolver)
+        matches = self.get_matches(text, conflict_resolver=conflict_resolver, context=context)
         layers = defaultdict(list)
         for m in matches:
             md = m.dict
@@ -42,8 +43,13 @@ class Symbol(object):
             text[k] = v
         return text
 
-    def get_matches(self, text, cache=None, conflict_resolver=resolve_using_maximal_coverage):
-        """Get the matches of the symbol on given text."""
+    def get_matches(self, text, cache=None, conflict_resolver=resolve_using_maximal_coverage, context=None):
+        """Get the matches of the symbol on given text.
+
+        If a :py:class:`~estnltk.grammar.context.GrammarContext` is given, the matches
+        are evaluated sentence by sentence and cached in the context."""
+        if context is not None and cache is None:
+            return context.get_matches(self, text, conflict_resolver=conflict_resolver)
         is_root_node = False
         if cache is None:
             cache = {}
@@ -245,20 +251,94 @@ class Intersection(Symbol):
         return matches
 
 
-def concat(matches_a, matches_b, text, name=None):
-    i, j = 0, 0
-    n, m = len(matches_a), len(matches_b)
-    matches = []
-    while i < n and j < m:
-        a, b = matches_a[i], matches_b[j]
-        if a.end == b.start:
-            matches.append(concatenate_matches(a, b, text.text, name))
+class _StartIndex(object):
+    """Index of matches by their start positions.
+
+    The start positions are kept in a sorted array, so that the matches starting
+    within a range of positions are found with binary search. The matches are
+    reported by their positions in the original list, in the original order."""
+
+    def __init__(self, matches):
+        self.matches = matches
+        starts = [m.start for m in matches]
+        if all(s1 <= s2 for s1, s2 in zip(starts, starts[1:])):
+            self.order = None
+            self.starts = starts
+        else:
+            self.order = sorted(range(len(matches)), key=lambda k: starts[k])
+            self.starts = [starts[k] for k in self.order]
+
+    def _range(self, start, max_gap):
+        lo = bisect_left(self.starts, start)
+        if max_gap is None:
+            return lo, len(self.starts)
+        return lo, bisect_right(self.starts, start + max_gap)
+
+    def positions(self, start, max_gap=None):
+        """Positions of the matches that start at `start` or later,
+        but not later than `start + max_gap` (if given)."""
+        lo, hi = self._range(start, max_gap)
+        if self.order is None:
+            return range(lo, hi)
+        return sorted(self.order[lo:hi])
+
+    def first(self, start, max_gap=None):
+        """Position of the first match returned by :py:meth:`positions`, or None."""
+        lo, hi = self._range(start, max_gap)
+        if lo == hi:
+            return None
+        if self.order is None:
+            return lo
+        return min(self.order[lo:hi])
+
+
+# The joins below extend sequences of matches (tuples) with the matches of the
+# next symbol. The sequences are generated lazily, so that the intermediate results
+# of a chain of joins are not stored, and Match objects are created only for the
+# final sequences (see concatenate_match_sequence).
+
+def _join_concat(sequences, matches):
+    sequences = iter(sequences)
+    seq = next(sequences, None)
+    j, m = 0, len(matches)
+    while seq is not None and j < m:
+        b = matches[j]
+        if seq[-1].end == b.start:
+            yield seq + (b,)
             j += 1
-        elif a.end < b.start:
-            i += 1
+        elif seq[-1].end < b.start:
+            seq = next(sequences, None)
         else:
             j += 1
-    return matches
+
+
+def _join_allgaps(sequences, matches, max_gap=None):
+    index = _StartIndex(matches)
+    for seq in sequences:
+        for k in index.positions(seq[-1].end, max_gap):
+            yield seq + (matches[k],)
+
+
+def _join_gaps(sequences, matches, max_gap=None):
+    index = _StartIndex(matches)
+    for seq in sequences:
+        k = index.first(seq[-1].end, max_gap)
+        if k is not None:
+            yield seq + (matches[k],)
+
+
+def _join_symbols(symbols, text, env, join):
+    """Get the matches of the symbols and join them from left to right."""
+    symbol_matches = [e.get_matches(text, **env) for e in symbols]
+    sequences = ((m,) for m in symbol_matches[0])
+    for matches in symbol_matches[1:]:
+        sequences = join(sequences, matches)
+    return sequences
+
+
+def concat(matches_a, matches_b, text, name=None):
+    sequences = _join_concat(((a,) for a in matches_a), matches_b)
+    return [concatenate_match_sequence(seq, text.text, name) for seq in sequences]
 
 
 class Concatenation(Symbol):
@@ -287,65 +367,80 @@ class Concatenation(Symbol):
         return self.__symbols
 
     def get_matches_without_cache(self, text, **env):
-        symbol_matches = [e.get_matches(text, **env) for e in self.symbols]
-        matches = list(reduce(lambda a, b: concat(a, b, text), symbol_matches))
-        if self.name is not None:
-            matches = [copy_rename(m, self.name) for m in matches]
-        return matches
+        sequences = _join_symbols(self.symbols, text, env, _join_concat)
+        return [concatenate_match_sequence(seq, text.text, self.name) for seq in sequences]
 
 
-def allgaps(matches_a, matches_b, text, name=None):
-    matches = []
-    for a in matches_a:
-        for b in matches_b:
-            if a.end <= b.start:
-                matches.append(concatenate_matches(a, b, text.text, name))
-    return matches
+def allgaps(matches_a, matches_b, text, name=None, max_gap=None):
+    sequences = _join_allgaps(((a,) for a in matches_a), matches_b, max_gap)
+    return [concatenate_match_sequence(seq, text.text, name) for seq in sequences]
 
 
 class AllGaps(Symbol):
     """Concatenate symbols, but allow gaps of any size between the symbols."""
 
     def __init__(self, *symbols, **kwargs):
+        """
+
+        Parameters
+        ----------
+        symbol.. : list of :py:class:`~estnltk.grammar.Symbol`
+            The symbols that are going to be concatenated.
+        max_gap: int
+            The optional maximum number of characters between the matches
+            of consecutive symbols.
+        """
         super(AllGaps, self).__init__(kwargs.get('name'))
         self.__symbols = symbols
+        self.__max_gap = kwargs.get('max_gap', None)
 
     @property
     def symbols(self):
         return self.__symbols
 
+    @property
+    def max_gap(self):
+        return self.__max_gap
+
     def get_matches_without_cache(self, text, **env):
-        symbol_matches = [e.get_matches(text, **env) for e in self.symbols]
-        matches = list(reduce(lambda a, b: allgaps(a, b, text), symbol_matches))
-        if self.name is not None:
-            matches = [copy_rename(m, self.name) for m in matches]
-        return matches
+        max_gap = self.max_gap
+        sequences = _join_symbols(self.symbols, text, env, lambda a, b: _join_allgaps(a, b, max_gap))
+        return [concatenate_match_sequence(seq, text.text, self.name) for seq in sequences]
 
 
-def gaps(matches_a, matches_b, text, name=None):
-    matches = []
-    for a in matches_a:
-        for b in matches_b:
-            if a.end <= b.start:
-                matches.append(concatenate_matches(a, b, text.text, name))
-                break
-    return matches
+def gaps(matches_a, matches_b, text, name=None, max_gap=None):
+    sequences = _join_gaps(((a,) for a in matches_a), matches_b, max_gap)
+    return [concatenate_match_sequence(seq, text.text, name) for seq in sequences]
 
 
 class Gaps(Symbol):
+    """Concatenate symbols, allowing gaps between the symbols, but join each
+    match only with the first following match of the next symbol."""
 
     def __init__(self, *symbols, **kwargs):
+        """
+
+        Parameters
+        ----------
+        symbol.. : list of :py:class:`~estnltk.grammar.Symbol`
+            The symbols that are going to be concatenated.
+        max_gap: int
+            The optional maximum number of characters between the matches
+            of consecutive symbols.
+        """
         super(Gaps, self).__init__(kwargs.get('name'))
         self.__symbols = symbols
+        self.__max_gap = kwargs.get('max_gap', None)
 
     @property
     def symbols(self):
         return self.__symbols
 
-    def get_matches_without_cache(self, text, **env):
-        symbol_matches = [e.get_matches(text, **env) for e in self.symbols]
-        matches = list(reduce(lambda a, b: gaps(a, b, text), symbol_matches))
-        if self.name is not None:
-            matches = [copy_rename(m, self.name) for m in matches]
-        return matches
+    @property
+    def max_gap(self):
+        return self.__max_gap
 
+    def get_matches_without_cache(self, text, **env):
+        max_gap = self.max_gap
+        sequences = _join_symbols(self.symbols, text, env, lambda a, b: _join_gaps(a, b, max_gap))
+        return [concatenate_match_sequence(seq, text.text, self.name) for seq in sequences]
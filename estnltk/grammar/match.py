@@ -97,12 +97,48 @@ def concatenate_matches(a, b, text, name):
     return match
 
 
+def concatenate_match_sequence(matches, text, name):
+    """Concatenate a sequence of matches.
+    The result is the same as concatenating the matches pairwise from
+    left to right (with unnamed intermediate matches), but only the
+    resulting match is created."""
+    if len(matches) == 1:
+        return matches[0] if name is None else copy_rename(matches[0], name)
+    first, last = matches[0], matches[-1]
+    match = Match(first.start, last.end, text[first.start:last.end], name)
+    # the first two matches are merged as in concatenate_matches(), the rest one by one
+    for group in [matches[:2]] + [[m] for m in matches[2:]]:
+        for m in group:
+            match.matches.update(m.matches)
+        for m in group:
+            if m.name is not None:
+                mm = copy(m)
+                del mm[MATCHES]
+                match.matches[m.name] = mm
+    return match
+
+
 def copy_rename(match, name):
     m = copy(match)
     m[NAME] = name
     return m
 
 
+def shift_match(match, offset):
+    """Copy of the match with the positions of the match and its submatches shifted by `offset`."""
+    m = copy(match)
+    m[START] += offset
+    m[END] += offset
+    submatches = {}
+    for k, v in match.matches.items():
+        v = copy(v)
+        v[START] += offset
+        v[END] += offset
+        submatches[k] = v
+    m[MATCHES] = submatches
+    return m
+
+
 def intersect(lefts, rights):
     n, m = len(lefts), len(rights)
     i, j = 0, 0
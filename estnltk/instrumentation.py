@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""Opt-in instrumentation of Estnltk's processing steps.
+
+When instrumentation is enabled, the instrumented functions and methods (for instance,
+the tagging methods of :py:class:`~estnltk.text.Text`) record the number of calls,
+the cumulative running time, the number of items processed and the number of round trips
+to external processes (Java components, VISLCG3, MaltParser). When it is disabled (default),
+the only cost of an instrumented call is a check of a global flag.
+
+Instrumentation can be enabled for the whole process by setting the environment variable
+``ESTNLTK_INSTRUMENTATION=1`` or by calling :py:func:`enable`, or for a block of code
+with the :py:func:`instrumentation` context manager::
+
+    from estnltk import Text
+    from estnltk.instrumentation import instrumentation, get_stats
+
+    with instrumentation():
+        Text('Tere maailm!').tag_named_entities()
+    print(get_stats())
+
+Note that the times of nested calls are included in the times of the calling methods,
+for example ``Text.tag_named_entities`` includes ``Text.tag_analysis``, if the analysis
+was performed as its prerequisite.
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+ENV_VARIABLE = 'ESTNLTK_INSTRUMENTATION'
+
+CALLS = 'calls'
+SECONDS = 'seconds'
+ITEMS = 'items'
+ROUNDTRIPS = 'roundtrips'
+
+_enabled = os.environ.get(ENV_VARIABLE, '').lower() in ('1', 'true', 'yes', 'on')
+_stats = {}
+_lock = threading.Lock()
+
+
+def is_enabled():
+    """Is the instrumentation enabled?"""
+    return _enabled
+
+
+def enable():
+    """Enable the instrumentation."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Disable the instrumentation. The collected statistics are kept."""
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    """Discard the collected statistics."""
+    with _lock:
+        _stats.clear()
+
+
+@contextmanager
+def instrumentation(reset_stats=True):
+    """Context manager that enables the instrumentation within its block.
+
+    Parameters
+    ----------
+    reset_stats: bool
+        If True (default), the previously collected statistics are discarded
+        when entering the block.
+    """
+    global _enabled
+    previous = _enabled
+    if reset_stats:
+        reset()
+    _enabled = True
+    try:
+        yield
+    finally:
+        _enabled = previous
+
+
+def _entry(name):
+    entry = _stats.get(name)
+    if entry is None:
+        entry = _stats[name] = {CALLS: 0, SECONDS: 0.0, ITEMS: 0, ROUNDTRIPS: 0}
+    return entry
+
+
+def record(name, seconds=0.0, items=0, calls=1):
+    """Record a call of the processing step `name`."""
+    if not _enabled:
+        return
+    with _lock:
+        entry = _entry(name)
+        entry[CALLS] += calls
+        entry[SECONDS] += seconds
+        entry[ITEMS] += items
+
+
+def record_roundtrip(name, count=1):
+    """Record a round trip to an external process made by the processing step `name`."""
+    if not _enabled:
+        return
+    with _lock:
+        _entry(name)[ROUNDTRIPS] += count
+
+
+def instrumented(name, items=None):
+    """Decorator that records the calls of the decorated function under the given name.
+
+    Parameters
+    ----------
+    name: str
+        The name of the processing step, for instance ``Text.tag_analysis``.
+    items: function
+        Optional function that is called with the arguments of the decorated function
+        after the call and returns the number of items processed.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = time.time() - start
+                n_items = 0
+                if items is not None:
+                    try:
+                        n_items = items(*args, **kwargs)
+                    except Exception:
+                        n_items = 0
+                record(name, seconds=seconds, items=n_items)
+        return wrapper
+    return decorator
+
+
+def get_stats():
+    """Return the collected statistics.
+
+    Returns
+    -------
+    dict
+        Mapping from the names of the processing steps to dictionaries with
+        keys ``calls``, ``seconds``, ``items`` and ``roundtrips``.
+    """
+    with _lock:
+        return dict((name, dict(entry)) for name, entry in _stats.items())
+
+
+def _metric_name(name):
+    return ''.join(c if c.isalnum() else '_' for c in name)
+
+
+def to_prometheus(prefix='estnltk'):
+    """Export the collected statistics in the Prometheus text exposition format.
+
+    Parameters
+    ----------
+    prefix: str
+        The prefix of the metric names.
+
+    Returns
+    -------
+    str
+    """
+    metrics = [
+        (CALLS, 'calls_total', 'Number of calls.'),
+        (SECONDS, 'seconds_total', 'Cumulative running time in seconds.'),
+        (ITEMS, 'items_total', 'Number of items processed.'),
+        (ROUNDTRIPS, 'roundtrips_total', 'Number of round trips to external processes.'),
+    ]
+    stats = get_stats()
+    lines = []
+    for key, suffix, description in metrics:
+        metric = '{0}_{1}'.format(prefix, suffix)
+        lines.append('# HELP {0} {1}'.format(metric, description))
+        lines.append('# TYPE {0} counter'.format(metric))
+        for name in sorted(stats):
+            lines.append('{0}{{step="{1}"}} {2}'.format(metric, name, stats[name][key]))
+    return '\n'.join(lines) + '\n'
+
+
+def to_statsd(prefix='estnltk'):
+    """Export the collected statistics as StatsD metric lines.
+
+    Counts are exported as counters and the cumulative running times as timings
+    in milliseconds.
+
+    Parameters
+    ----------
+    prefix: str
+        The prefix of the metric names.
+
+    Returns
+    -------
+    list of str
+    """
+    stats = get_stats()
+    lines = []
+    for name in sorted(stats):
+        entry = stats[name]
+        metric = '{0}.{1}'.format(prefix, _metric_name(name))
+        lines.append('{0}.calls:{1}|c'.format(metric, entry[CALLS]))
+        lines.append('{0}.time:{1:.3f}|ms'.format(metric, entry[SECONDS] * 1000.0))
+        lines.append('{0}.items:{1}|c'.format(metric, entry[ITEMS]))
+        lines.append('{0}.roundtrips:{1}|c'.format(metric, entry[ROUNDTRIPS]))
+    return lines
@@ -9,6 +9,7 @@ JAVARES_PATH: str
 from __future__ import unicode_literals, print_function
 
 from estnltk.core import PACKAGE_PATH, as_unicode, as_binary
+from estnltk.instrumentation import record_roundtrip
 import subprocess
 import os
 
@@ -78,6 +79,7 @@ class JavaProcess(object):
             self._process.stdin.write(as_binary('\n'))
             self._process.stdin.flush()
             result = as_unicode(self._process.stdout.readline())
+            record_roundtrip(type(self).__name__)
             if result == '':
                 stderr = as_unicode(self._process.stderr.read())
                 raise Exception('EOF encountered while reading stream. Stderr is {0}.'.format(stderr))
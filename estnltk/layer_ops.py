@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing operations on pairs of layers.
+
+The operations take layers, i.e. lists of elements with ``start`` and ``end`` positions,
+and return the indices of the related elements instead of copies of the elements.
+The elements may be multispans (``start`` and ``end`` are lists), as the elements of the
+``clauses`` and ``verb_chains`` layers. The joins sort the spans of the layers and sweep
+over them once, so they run in O((n+m) log(n+m) + k) time, where n and m are the sizes of
+the layers and k is the number of results, instead of comparing all pairs of elements.
+
+For example, the named entities inside the clauses that contain verb chains::
+
+    from estnltk.layer_ops import overlap_join, containment_join
+
+    clauses, entities = text['clauses'], text['named_entities']
+    with_verbs = set(i for i, _ in overlap_join(clauses, text['verb_chains']))
+    inside = [entities[j] for i, j in containment_join(clauses, entities) if i in with_verbs]
+
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+
+from .names import START, END
+
+
+def element_spans(element):
+    """The spans of the element as a list of (start, end) tuples."""
+    start, end = element[START], element[END]
+    if isinstance(start, list):
+        return list(zip(start, end))
+    return [(start, end)]
+
+
+def _flatten(layer):
+    """The spans of all elements of the layer as (start, end, element index) tuples."""
+    return [(start, end, idx) for idx, element in enumerate(layer) for start, end in element_spans(element)]
+
+
+def _envelopes(layer):
+    """The (start, end) envelopes of the elements of the layer."""
+    envelopes = []
+    for element in layer:
+        spans = element_spans(element)
+        envelopes.append((spans[0][0], spans[-1][1]))
+    return envelopes
+
+
+def _unique_sorted(pairs):
+    return sorted(set(pairs))
+
+
+def overlap_join(a, b):
+    """Find the pairs of overlapping elements of two layers.
+
+    Two elements overlap, if they have at least one common character, i.e. a span of
+    one element starts before a span of the other element ends and vice versa.
+    Empty spans do not overlap anything.
+
+    Parameters
+    ----------
+    a: list of dict
+        The first layer.
+    b: list of dict
+        The second layer.
+
+    Returns
+    -------
+    list of (int, int)
+        The sorted index pairs (i, j), such that a[i] and b[j] overlap.
+    """
+    # the spans of both layers in the order of the start positions
+    spans = [(start, end, idx, 0) for start, end, idx in _flatten(a) if start < end]
+    spans.extend((start, end, idx, 1) for start, end, idx in _flatten(b) if start < end)
+    spans.sort()
+    # (end, index) of the spans that are open at the current position, for both layers
+    active = ([], [])
+    pairs = []
+    for start, end, idx, layer in spans:
+        for heap in active:
+            while heap and heap[0][0] <= start:
+                heapq.heappop(heap)
+        # the spans of the other layer started before this span and end after its start
+        for _, other in active[1 - layer]:
+            pairs.append((idx, other) if layer == 0 else (other, idx))
+        heapq.heappush(active[layer], (end, idx))
+    return _unique_sorted(pairs)
+
+
+def _containment_pairs(outer, inner):
+    """Index pairs of the contained flat spans (sorted by start) of the inner spans."""
+    outer = sorted(outer)
+    # (end, index) of the outer spans that started at or before the current inner span,
+    # sorted by the end positions
+    active = []
+    k = 0
+    for start, end, flat_idx in inner:
+        while k < len(outer) and outer[k][0] <= start:
+            insort(active, (outer[k][1], outer[k][2]))
+            k += 1
+        # the outer spans ending before the start cannot contain this or the following inner spans
+        del active[:bisect_left(active, (start, -1))]
+        for _, outer_idx in active[bisect_left(active, (end, -1)):]:
+            yield outer_idx, flat_idx
+
+
+def containment_join(outer, inner):
+    """Find the pairs of elements of two layers, where an outer element contains an inner element.
+
+    An element contains another, if every span of the other element lies within a span
+    of the element (see :py:func:`estnltk.dividing.contains`).
+
+    Parameters
+    ----------
+    outer: list of dict
+        The layer of the containing elements.
+    inner: list of dict
+        The layer of the contained elements.
+
+    Returns
+    -------
+    list of (int, int)
+        The sorted index pairs (i, j), such that outer[i] contains inner[j].
+    """
+    inner_spans = sorted(_flatten(inner))
+    span_counts = defaultdict(int)
+    for _, _, idx in inner_spans:
+        span_counts[idx] += 1
+    # the number of contained spans of the inner elements, by the index pairs
+    contained = defaultdict(set)
+    flat = [(start, end, flat_idx) for flat_idx, (start, end, _) in enumerate(inner_spans)]
+    for outer_idx, flat_idx in _containment_pairs(_flatten(outer), flat):
+        contained[(outer_idx, inner_spans[flat_idx][2])].add(flat_idx)
+    return sorted(pair for pair, spans in contained.items() if len(spans) == span_counts[pair[1]])
+
+
+def nearest_neighbours(a, b, direction='both'):
+    """Find the nearest non-overlapping element of the second layer for every element of the first layer.
+
+    The elements are compared by their envelopes, i.e. from the start of the first span
+    to the end of the last span. The distance of the elements is the number of characters
+    between them. The ties are resolved in favour of the element with the lower index
+    and, if the direction is 'both', in favour of the preceding element.
+
+    Parameters
+    ----------
+    a: list of dict
+        The layer of the elements to find the neighbours of.
+    b: list of dict
+        The layer of the neighbours.
+    direction: 'both', 'left', 'right'
+        Whether to search the neighbours on both sides, only before (ending at or before the
+        start of the element) or only after (starting at or after the end of the element).
+
+    Returns
+    -------
+    list of (int, int)
+        The index pairs (i, j), such that b[j] is the nearest neighbour of a[i], sorted by i.
+        The elements without neighbours are left out.
+    """
+    if direction not in ('both', 'left', 'right'):
+        raise ValueError("Unknown direction '%s'." % direction)
+    envelopes = _envelopes(b)
+    # the last one of the elements with the same end has the lowest index
+    by_end = sorted(range(len(b)), key=lambda j: (envelopes[j][1], -j))
+    ends = [envelopes[j][1] for j in by_end]
+    by_start = sorted(range(len(b)), key=lambda j: (envelopes[j][0], j))
+    starts = [envelopes[j][0] for j in by_start]
+    pairs = []
+    for i, (start, end) in enumerate(_envelopes(a)):
+        left, right = None, None
+        if direction != 'right':
+            k = bisect_right(ends, start) - 1
+            if k >= 0:
+                left = by_end[k]
+        if direction != 'left':
+            k = bisect_left(starts, end)
+            if k < len(starts):
+                right = by_start[k]
+        if left is not None and right is not None:
+            left_distance = start - envelopes[left][1]
+            right_distance = envelopes[right][0] - end
+            nearest = left if left_distance <= right_distance else right
+        else:
+            nearest = left if left is not None else right
+        if nearest is not None:
+            pairs.append((i, nearest))
+    return pairs
+
+
+def _span_keys(layer):
+    return [tuple(element_spans(element)) for element in layer]
+
+
+def intersection(a, b):
+    """Find the pairs of elements of two layers with the same spans.
+
+    Parameters
+    ----------
+    a: list of dict
+        The first layer.
+    b: list of dict
+        The second layer.
+
+    Returns
+    -------
+    list of (int, int)
+        The sorted index pairs (i, j), such that a[i] and b[j] have the same spans.
+    """
+    indices = defaultdict(list)
+    for j, key in enumerate(_span_keys(b)):
+        indices[key].append(j)
+    return [(i, j) for i, key in enumerate(_span_keys(a)) for j in indices.get(key, ())]
+
+
+def difference(a, b):
+    """Find the elements of the first layer, whose spans are not the spans of any element of the second layer.
+
+    Parameters
+    ----------
+    a: list of dict
+        The first layer.
+    b: list of dict
+        The second layer.
+
+    Returns
+    -------
+    list of int
+        The sorted indices of the elements of the first layer.
+    """
+    keys = set(_span_keys(b))
+    return [i for i, key in enumerate(_span_keys(a)) if key not in keys]
+
+
+def union(a, b):
+    """Merge two layers, leaving out the elements of the second layer with the same spans
+    as the elements of the first layer.
+
+    Parameters
+    ----------
+    a: list of dict
+        The first layer.
+    b: list of dict
+        The second layer.
+
+    Returns
+    -------
+    list of (int, int)
+        The pairs (0, i) referring to a[i] and (1, j) referring to b[j], sorted by the spans
+        of the elements, then by the layers and the indices.
+    """
+    a_keys = _span_keys(a)
+    b_keys = _span_keys(b)
+    keys = set(a_keys)
+    items = [(key, 0, i) for i, key in enumerate(a_keys)]
+    items.extend((key, 1, j) for j, key in enumerate(b_keys) if key not in keys)
+    items.sort()
+    return [(layer, idx) for _, layer, idx in items]
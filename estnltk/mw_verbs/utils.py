@@ -8,6 +8,7 @@
 from __future__ import unicode_literals
 
 from estnltk.names import *
+import six
 import re
 
 # ================================================================
@@ -53,6 +54,60 @@ def getClausesByClauseIDs(jsonSent):
     return clauses
 
 
+# ================================================================
+#   Compiling the rules of WordTemplate-s: frequently used simple 
+#   patterns (e.g. '^(ja|ning)$', 'V', '[DJ]', 'neg.*') are turned 
+#   into set lookups and prefix checks, other patterns are checked
+#   with the compiled regular expression; 
+#   All the checks are equivalent to re.match( pattern, value );
+# ================================================================
+_regExpMetaChars   = set('.^$*+?{}[]|()\\')
+_compiledRules     = dict()
+_compiledTemplates = dict()
+
+def _isLiteral( pattern ):
+    return not any(c in _regExpMetaChars for c in pattern)
+
+def _compileRule( regExpPattern ):
+    ''' Returns a pair (compiled, test), where compiled is the compiled regular 
+        expression, and test is a function that takes the value of a field and 
+        returns whether the regular expression matches (re.match) the value. 
+        The results are cached, so that templates created repeatedly (e.g. inside 
+        functions) do not need to compile their rules again.
+    '''
+    if regExpPattern in _compiledRules:
+        return _compiledRules[regExpPattern]
+    compiled = re.compile( regExpPattern )
+    test = lambda value: compiled.match(value) != None
+    pattern = compiled.pattern
+    if not isinstance(pattern, six.string_types) or compiled.flags & ~re.UNICODE:
+        pass
+    elif _isLiteral( pattern ) or (pattern.endswith('.*') and _isLiteral( pattern[:-2] )):
+        # A prefix: 'V', 'neg o', 'neg.*'
+        prefix = pattern[:-2] if pattern.endswith('.*') else pattern
+        test = lambda value: value.startswith(prefix)
+    elif len(pattern) > 2 and pattern[0] == '[' and pattern[-1] == ']' and \
+         all(c not in _regExpMetaChars and c not in '^-' for c in pattern[1:-1]):
+        # A character class: '[DJ]', '[SACP]'
+        firstChars = frozenset( pattern[1:-1] )
+        test = lambda value: value[:1] in firstChars
+    else:
+        # A set of alternatives: '^ole$', '^(da|ma)$', 'nud$', '(tud)$'
+        body = pattern[1:] if pattern.startswith('^') else pattern
+        if len(body) > 1 and body.endswith('$'):
+            body = body[:-1]
+            if body.startswith('(') and body.endswith(')') and '(' not in body[1:-1]:
+                alternatives = body[1:-1].split('|')
+            else:
+                alternatives = [ body ]
+            if all(_isLiteral( a ) for a in alternatives):
+                # '$' also matches before the newline at the end of the value
+                values = frozenset( alternatives + [a+'\n' for a in alternatives] )
+                test = values.__contains__
+    _compiledRules[regExpPattern] = (compiled, test)
+    return (compiled, test)
+
+
 # ================================================================
 #   A Template for filtering word tokens based on textual and 
 #   morphological constraints;
@@ -95,8 +150,18 @@ class WordTemplate:
                 etc) and a regular expression describing required value of that keyword.
         '''
         assert isinstance(newRules, dict), "newRules should be dict!"
-        for ruleKey in newRules:
-            self.addRule(ruleKey, newRules[ruleKey])
+        self._analysisTests = []
+        self._otherTests    = []
+        key = frozenset( newRules.items() )
+        if key not in _compiledTemplates:
+            for ruleKey in newRules:
+                self.addRule(ruleKey, newRules[ruleKey])
+            _compiledTemplates[key] = ( self.analysisRules, self.otherRules, \
+                                        self._analysisTests, self._otherTests )
+        # Templates are often created inside functions: reuse the compiled rules 
+        # (addRule() does not modify them, but makes new copies)
+        self.analysisRules, self.otherRules, self._analysisTests, self._otherTests = \
+            _compiledTemplates[key]
 
     def addRule(self, field, regExpPattern):
         '''Adds new rule for checking whether a value of the field matches given regular 
@@ -110,20 +175,42 @@ class WordTemplate:
                 a regular expression that the value of the field must match (using method 
                 re.match( regExpPattern, token[field]) ).
         '''
-        compiled = re.compile( regExpPattern )
+        compiled, test = _compileRule( regExpPattern )
         if field in self.analysisFields:
-            if self.analysisRules == None:
-                self.analysisRules = dict()
+            self.analysisRules = dict( self.analysisRules or {} )
             self.analysisRules[field] = compiled
+            self._analysisTests = [ (f, t) for (f, t) in self._analysisTests if f != field ] + \
+                                  [ (field, test) ]
         else:
-            if self.otherRules == None:
-                self.otherRules = dict()
+            self.otherRules = dict( self.otherRules or {} )
             self.otherRules[field] = compiled
+            self._otherTests = [ (f, t) for (f, t) in self._otherTests if f != field ] + \
+                               [ (field, test) ]
+
+    def __getstate__(self):
+        # Compiled tests cannot be pickled: they are restored from the rules
+        state = self.__dict__.copy()
+        state.pop('_analysisTests', None)
+        state.pop('_otherTests', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._analysisTests = [ (field, _compileRule(rule)[1]) for (field, rule) in \
+                                (self.analysisRules or {}).items() ]
+        self._otherTests    = [ (field, _compileRule(rule)[1]) for (field, rule) in \
+                                (self.otherRules or {}).items() ]
 
     # =============================================
     #    Matching a single token
     # =============================================
-    
+
+    def _matchesOtherRules(self, tokenJson):
+        for field, test in self._otherTests:
+            if field not in tokenJson or not test(tokenJson[field]):
+                return False
+        return True
+
     def matches(self, tokenJson):
         '''Determines whether given token (tokenJson) satisfies all the rules listed 
            in the WordTemplate. If the rules describe tokenJson[ANALYSIS], it is 
@@ -135,32 +222,21 @@ class WordTemplate:
            ----------
            tokenJson: pyvabamorf's analysis of a single word token;
         '''
-        if self.otherRules != None:
-            otherMatches = []
-            for field in self.otherRules:
-                match = field in tokenJson and ((self.otherRules[field]).match(tokenJson[field]) != None)
-                otherMatches.append( match )
-            if not otherMatches or not all(otherMatches):
-                return False
-            elif self.analysisRules == None and all(otherMatches):
+        if self.analysisRules == None:
+            return self.otherRules != None and self._matchesOtherRules(tokenJson)
+        if self.otherRules != None and not self._matchesOtherRules(tokenJson):
+            return False
+        assert ANALYSIS in tokenJson, "No ANALYSIS found within token: "+str(tokenJson)
+        for analysis in tokenJson[ANALYSIS]:
+            # Check whether this analysis satisfies all the rules 
+            # (if not, discard the analysis)
+            for field, test in self._analysisTests:
+                if not test(analysis[field] if field in analysis else ""):
+                    break
+            else:
+                #  Return True iff there was at least one analysis that 
+                # satisfied all the rules;
                 return True
-        if self.analysisRules != None:
-            assert ANALYSIS in tokenJson, "No ANALYSIS found within token: "+str(tokenJson)
-            totalMatches = []
-            for analysis in tokenJson[ANALYSIS]:
-                # Check whether this analysis satisfies all the rules 
-                # (if not, discard the analysis)
-                matches = []
-                for field in self.analysisRules:
-                    value = analysis[field] if field in analysis else ""
-                    match = (self.analysisRules[field]).match(value) != None
-                    matches.append( match )
-                    if not match:
-                        break
-                totalMatches.append( all(matches) )
-            #  Return True iff there was at least one analysis that 
-            # satisfied all the rules;
-            return any(totalMatches)
         return False
 
     def matchingAnalyses(self, tokenJson):
@@ -175,28 +251,19 @@ class WordTemplate:
            tokenJson: pyvabamorf's analysis of a single word token;
         '''
         matchingResults = []
-        if self.otherRules != None:
-            otherMatches = []
-            for field in self.otherRules:
-                match = field in tokenJson and ((self.otherRules[field]).match(tokenJson[field]) != None)
-                otherMatches.append( match )
-            if not otherMatches or not all(otherMatches):
-                return matchingResults
-        if self.analysisRules != None:
-            assert ANALYSIS in tokenJson, "No ANALYSIS found within token: "+str(tokenJson)
-            for analysis in tokenJson[ANALYSIS]:
-                # Check whether this analysis satisfies all the rules 
-                # (if not, discard the analysis)
-                matches = []
-                for field in self.analysisRules:
-                    value = analysis[field] if field in analysis else ""
-                    match = (self.analysisRules[field]).match(value) != None
-                    matches.append( match )
-                if matches and all(matches):
-                    matchingResults.append( analysis )
-            #  Return True iff there was at least one analysis that 
-            # satisfied all the rules;
+        if self.analysisRules == None:
+            return matchingResults
+        if self.otherRules != None and not self._matchesOtherRules(tokenJson):
             return matchingResults
+        assert ANALYSIS in tokenJson, "No ANALYSIS found within token: "+str(tokenJson)
+        for analysis in tokenJson[ANALYSIS]:
+            # Check whether this analysis satisfies all the rules 
+            # (if not, discard the analysis)
+            for field, test in self._analysisTests:
+                if not test(analysis[field] if field in analysis else ""):
+                    break
+            else:
+                matchingResults.append( analysis )
         return matchingResults
 
     def matchingAnalyseIndexes(self, tokenJson):
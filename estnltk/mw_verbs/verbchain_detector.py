@@ -12,6 +12,9 @@
 
 from __future__ import unicode_literals
 import re
+import six
+
+from multiprocessing import Pool, cpu_count
 
 from estnltk.names import *
 
@@ -410,6 +413,20 @@ def addGrammaticalFeatsAndRoots( sentence, foundChains ):
         matchObj1[VOICE] = voice
 
 
+def addChainSpans( sentence, foundChains ):
+    ''' Adds to the verb chains the attributes START and END, listing the start 
+        and end positions of the words of the chain (in the order of the words);
+    '''
+    for chain in foundChains:
+        # 1) Get spans for all words of the phrase
+        wordSpans = [ ( sentence[idx][START], sentence[idx][END] ) \
+                        for idx in sorted( chain[PHRASE] ) ]
+        # 2) Assign to the chain
+        chain[START] = [ span[0] for span in wordSpans ]
+        chain[END]   = [ span[1] for span in wordSpans ]
+    return foundChains
+
+
 # ================================================================
 #    VerbChainDetector -- The Main Class
 # ================================================================
@@ -515,6 +532,17 @@ class VerbChainDetector:
              VOICE        -- voice of the main verb:  'personal', 'impersonal', '??';
 
         '''
+        # 1) Preprocessing
+        sentence = addWordIDs( sentence )
+        clauses  = getClausesByClauseIDs( sentence )
+        return self._detectVerbChains( sentence, clauses, **kwargs )
+
+
+    def _detectVerbChains( self, sentence, clauses, **kwargs ):
+        ''' Detects verb chains from given sentence, which words have been indexed 
+            (see addWordIDs()) and grouped by clauses (see getClausesByClauseIDs()).
+            See detectVerbChainsFromSent() for the parameters and the results.
+        '''
         # 0) Parse given arguments
         expand2ndTime = False
         removeOverlapping  = True
@@ -532,10 +560,6 @@ class VerbChainDetector:
             else:
                 raise Exception(' Unsupported argument given: '+argName)
 
-        # 1) Preprocessing
-        sentence = addWordIDs( sentence )
-        clauses  = getClausesByClauseIDs( sentence )
-
         # 2) Extract predicate-centric verb chains within each clause
         allDetectedVerbChains = []
         for clauseID in clauses:
@@ -594,3 +618,129 @@ class VerbChainDetector:
 
         return allDetectedVerbChains
 
+
+    def detect_documents( self, texts, **kwargs ):
+        ''' Detects verb chains from given documents. 
+        
+        Words of each document are split into sentences, indexed (see addWordIDs())
+        and grouped by clauses (see getClausesByClauseIDs()) in one pass over the 
+        document. If a subclass overrides detectVerbChainsFromSent(), the words are 
+        only split into sentences, and the overriding method is called on each 
+        sentence. If n_jobs > 1, the sentences of all the documents are distributed 
+        among worker processes, and the results are collected back in the order of 
+        the documents and sentences.
+
+        Parameters
+        ----------
+        texts:  list of Text
+            Documents, from which verb chains are detected. Clause annotations 
+            (CLAUSE_IDX of the words) are added to the documents, if missing;
+        
+        Keyword parameters
+        ------------------
+        n_jobs: int
+            Number of worker processes. If n_jobs is None or smaller than 1, the 
+            number of CPUs is used.
+            (default: 1)
+        
+        Other keyword parameters are passed to detectVerbChainsFromSent();
+
+        Returns
+        -------
+        list of (list of dict)
+            For each document, the list of verb chains detected from its sentences 
+            (see detectVerbChainsFromSent() for the attributes of a verb chain), with 
+            additional attributes START and END, listing the start and end positions
+            of the words of the chain in the document.
+        '''
+        n_jobs = kwargs.pop('n_jobs', 1)
+        if n_jobs is None or int(n_jobs) < 1:
+            n_jobs = cpu_count()
+        n_jobs = int(n_jobs)
+        # 1) Index the documents (unless detectVerbChainsFromSent() is overridden,
+        #    and thus the indexes would not be used)
+        prepare = six.get_unbound_function( self.__class__.detectVerbChainsFromSent ) is \
+                  six.get_unbound_function( VerbChainDetector.detectVerbChainsFromSent )
+        documents = []
+        for text in texts:
+            if not text.is_tagged(WORDS) or any(CLAUSE_IDX not in word for word in text[WORDS]):
+                text.tag_clause_annotations()
+            documents.append( _indexDocument( text[WORDS], text[SENTENCES], prepare ) )
+        sentences = [ sentence for document in documents for sentence in document ]
+        # 2) Detect verb chains from the sentences
+        if n_jobs > 1 and len(sentences) > 1:
+            # Distribute the sentences among the workers in (smaller) contiguous 
+            # chunks, so that the workers will be evenly loaded
+            chunkSize = max( 1, len(sentences) // (n_jobs * 4) )
+            chunks = [ sentences[i:i+chunkSize] for i in range(0, len(sentences), chunkSize) ]
+            pool = Pool( min(n_jobs, len(chunks)), _initDetectionWorker, (self,) )
+            try:
+                results = pool.map( _detectFromSentences, [(chunk, kwargs) for chunk in chunks] )
+            finally:
+                pool.close()
+                pool.join()
+            sentenceChains = [ chains for result in results for chains in result ]
+        else:
+            sentenceChains = self._detectFromSentences( sentences, **kwargs )
+        # 3) Collect the results of each document
+        results = []
+        start = 0
+        for document in documents:
+            results.append( [ chain for chains in sentenceChains[start:start+len(document)] \
+                                    for chain in chains ] )
+            start += len(document)
+        return results
+
+
+    def _detectFromSentences( self, sentences, **kwargs ):
+        ''' Detects verb chains from given sentences (pairs (sentence, clauses), see 
+            _indexDocument()), and adds START and END positions to the detected chains.
+            Returns a list of lists of chains, one list per sentence.
+        '''
+        results = []
+        for sentence, clauses in sentences:
+            if clauses is None:
+                chains = self.detectVerbChainsFromSent( sentence, **kwargs )
+            else:
+                chains = self._detectVerbChains( sentence, clauses, **kwargs )
+            results.append( addChainSpans( sentence, chains ) )
+        return results
+
+
+# ================================================================
+#    Batch processing of documents
+# ================================================================
+
+def _indexDocument( words, sentences, prepare=True ):
+    ''' Splits the words of a document into sentences (given as a list of spans 
+        with START and END) in one pass, and, if prepare is True, prepares the 
+        sentences for the detection: adds WORD_ID-s to the words, and groups the 
+        words by clauses. Returns a list of pairs (sentence, clauses), where 
+        clauses is None, if prepare is False.
+    '''
+    indexed = []
+    i = 0
+    for sentenceSpan in sentences:
+        sentence = []
+        while i < len(words) and words[i][START] < sentenceSpan[END]:
+            if words[i][START] >= sentenceSpan[START] and words[i][END] <= sentenceSpan[END]:
+                sentence.append( words[i] )
+            i += 1
+        if prepare:
+            sentence = addWordIDs( sentence )
+            indexed.append( (sentence, getClausesByClauseIDs( sentence )) )
+        else:
+            indexed.append( (sentence, None) )
+    return indexed
+
+
+# The detector used in a worker process of VerbChainDetector.detect_documents()
+_workerDetector = None
+
+def _initDetectionWorker( detector ):
+    global _workerDetector
+    _workerDetector = detector
+
+def _detectFromSentences( args ):
+    sentences, kwargs = args
+    return _workerDetector._detectFromSentences( sentences, **kwargs )
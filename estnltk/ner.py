@@ -14,11 +14,15 @@ import os
 from pprint import pprint
 import shutil
 import errno
+import hashlib
 import inspect
+import struct
+import threading
 
 import six
+from six.moves import cPickle as pickle
 
-from .core import DEFAULT_PY2_NER_MODEL_DIR, DEFAULT_PY3_NER_MODEL_DIR
+from .core import DEFAULT_PY2_NER_MODEL_DIR, DEFAULT_PY3_NER_MODEL_DIR, default_cache_dir
 from .names import *
 from .estner import Document, Sentence, Token
 from .estner import CrfsuiteTrainer, CrfsuiteTagger
@@ -28,12 +32,32 @@ from .estner.featureextraction import FeatureExtractor
 # Use different NER models depending on Python version
 DEFAULT_NER_MODEL_DIR = DEFAULT_PY3_NER_MODEL_DIR if six.PY3 else DEFAULT_PY2_NER_MODEL_DIR
 
+# Model bundle file format: magic, format version and the length of the pickled header,
+# followed by the header and the contents of the crfsuite model file.
+BUNDLE_MAGIC = b'ESTNERB'
+BUNDLE_VERSION = 1
+BUNDLE_PREFIX = struct.Struct(str('<7sHQ'))
+
+
+class NerSettings(object):
+    """Picklable snapshot of the settings defined in a NER settings module."""
+
+    def __init__(self, settings_module):
+        for name in dir(settings_module):
+            if name.isupper():
+                setattr(self, name, getattr(settings_module, name))
+
 
 class ModelStorageUtil(object):
-    def __init__(self, model_dir):
+    def __init__(self, model_dir, cache_dir=None):
         self.model_dir = model_dir
         self.model_filename = os.path.join(model_dir, 'model.bin')
         self.settings_filename = os.path.join(model_dir, 'settings.py')
+        # the bundles are kept in the user's cache directory, named after the model directory
+        model_path = os.path.abspath(model_dir)
+        path_hash = hashlib.sha1(model_path.encode('utf-8')).hexdigest()[:16]
+        self.bundle_filename = os.path.join(cache_dir or default_cache_dir(), 'ner',
+                                            '{0}.{1}.bundle'.format(os.path.basename(model_path), path_hash))
 
     def makedir(self):
         """ Create model_dir directory """
@@ -56,9 +80,78 @@ class ModelStorageUtil(object):
             import imp
             return imp.load_source(mname, self.settings_filename)
         else:
-            import importlib.machinery
-            loader = importlib.machinery.SourceFileLoader(mname, self.settings_filename)
-        return loader.load_module(mname)
+            import importlib.util
+            spec = importlib.util.spec_from_file_location(mname, self.settings_filename)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+
+    def bundle_sources(self, settings):
+        """Return the files the model bundle is compiled from, along with their
+        modification times and sizes."""
+        sources = {}
+        for filename in (self.model_filename, self.settings_filename, getattr(settings, 'GAZETTEER_FILE', None)):
+            if filename is not None and os.path.exists(filename):
+                stat = os.stat(filename)
+                sources[filename] = (stat.st_mtime, stat.st_size)
+        return sources
+
+    def save_bundle(self, settings, fex):
+        """Save the settings, the prepared feature extractor and the crfsuite
+        model into a single model bundle file.
+
+        Parameters
+        ----------
+        settings: NerSettings
+            The settings of the model.
+        fex: estnltk.estner.featureextraction.FeatureExtractor
+            The feature extractor created using the settings.
+        """
+        header = pickle.dumps({
+            'settings': settings,
+            'fex': fex,
+            'sources': self.bundle_sources(settings)
+        }, protocol=2)
+        with open(self.model_filename, 'rb') as f:
+            model_data = f.read()
+        bundle_dir = os.path.dirname(self.bundle_filename)
+        if not os.path.isdir(bundle_dir):
+            os.makedirs(bundle_dir)
+        # write to a temporary file first, so that concurrent readers never see a partial bundle
+        tmp_filename = '{0}.{1}.tmp'.format(self.bundle_filename, os.getpid())
+        with open(tmp_filename, 'wb') as f:
+            f.write(BUNDLE_PREFIX.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(header)))
+            f.write(header)
+            f.write(model_data)
+        if os.name == 'nt' and os.path.exists(self.bundle_filename):
+            os.remove(self.bundle_filename)
+        os.rename(tmp_filename, self.bundle_filename)
+
+    def load_bundle(self):
+        """Load the model bundle of the model_dir directory.
+
+        Returns
+        -------
+        (NerSettings, FeatureExtractor, bytes)
+            The settings, the feature extractor and the contents of the crfsuite
+            model, or None, if the bundle does not exist, has a different format
+            version or is older than the files it was compiled from.
+        """
+        if not os.path.exists(self.bundle_filename):
+            return None
+        with open(self.bundle_filename, 'rb') as f:
+            prefix = f.read(BUNDLE_PREFIX.size)
+            if len(prefix) < BUNDLE_PREFIX.size:
+                return None
+            magic, version, header_len = BUNDLE_PREFIX.unpack(prefix)
+            if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+                return None
+            header = pickle.loads(f.read(header_len))
+            settings = header['settings']
+            if header['sources'] != self.bundle_sources(settings):
+                return None
+            # crfsuite opens in-memory models from bytes only
+            return settings, header['fex'], f.read()
 
 
 def json_document_to_estner_document(jsondoc):
@@ -176,24 +269,50 @@ class NerTrainer(object):
 
         self.trainer.train(nerdocs, modelUtil.model_filename)
 
+        # bundle the model with freshly loaded settings, so that taggers can warm-start from it
+        settings = NerSettings(modelUtil.load_settings())
+        try:
+            modelUtil.save_bundle(settings, FeatureExtractor(settings))
+        except (IOError, OSError):
+            pass  # read-only cache directory, the bundle is just an optimization
+
 
 class NerTagger(object):
     """The class for tagging named entities."""
 
-    def __init__(self, model_dir=DEFAULT_NER_MODEL_DIR):
+    def __init__(self, model_dir=DEFAULT_NER_MODEL_DIR, use_bundle=True, cache_dir=None):
         """Initialize a new NerTagger instance.
         
         Parameters
         ----------
         model_dir: st
             A directory containing a trained ner model and a settings file.
+        use_bundle: bool
+            If True (default), the tagger is loaded from the model bundle of
+            the directory, which avoids executing the settings file and
+            re-reading the gazetteer. If the bundle is missing or outdated,
+            it is (re)created, provided that the cache directory is writable.
+            The model directory itself is never written to.
+        cache_dir: str
+            The cache directory, in the ``ner`` subdirectory of which the
+            bundle is kept (default: :py:func:`estnltk.core.default_cache_dir`).
         """
-        modelUtil = ModelStorageUtil(model_dir)
-        nersettings = modelUtil.load_settings()
-
+        modelUtil = ModelStorageUtil(model_dir, cache_dir)
+        bundle = modelUtil.load_bundle() if use_bundle else None
+        if bundle is not None:
+            nersettings, self.fex, model_data = bundle
+            self.tagger = CrfsuiteTagger(settings=nersettings, model_data=model_data)
+            return
+
+        nersettings = NerSettings(modelUtil.load_settings())
         self.fex = FeatureExtractor(nersettings)
         self.tagger = CrfsuiteTagger(settings=nersettings,
                                      model_filename=modelUtil.model_filename)
+        if use_bundle:
+            try:
+                modelUtil.save_bundle(nersettings, self.fex)
+            except (IOError, OSError):
+                pass  # read-only cache directory, the bundle is just an optimization
 
     def tag_documents(self, documents):
         nerdocs = [json_document_to_estner_document(jsondoc) for jsondoc in documents]
@@ -210,3 +329,31 @@ class NerTagger(object):
 
     def tag_document(self, document):
         return self.tag_documents([document])[0]
+
+
+_shared_taggers = {}
+_shared_taggers_lock = threading.Lock()
+
+
+def load_shared_ner_tagger(model_dir=DEFAULT_NER_MODEL_DIR):
+    """Return a process-wide NerTagger instance for the given model directory.
+
+    The tagger is created on the first call and reused on subsequent calls
+    with the same model directory.
+
+    Parameters
+    ----------
+    model_dir: str
+        A directory containing a trained ner model and a settings file.
+
+    Returns
+    -------
+    NerTagger
+    """
+    key = os.path.abspath(model_dir)
+    with _shared_taggers_lock:
+        tagger = _shared_taggers.get(key)
+        if tagger is None:
+            tagger = NerTagger(model_dir)
+            _shared_taggers[key] = tagger
+        return tagger
@@ -2,6 +2,9 @@
 Lihtkihi elementidega opereerimise tööriistad.
 """
 import copy
+import heapq
+from collections import defaultdict
+from functools import reduce
 
 
 def touching_right(x, y):
@@ -150,6 +153,41 @@ def pop_first_by_identity(lst, ob):
 
 
 
+def intersecting_index_pairs(layer):
+    """
+    Returns the index pairs (i1, i2) of the intersecting elements of the layer, such that
+    layer[i1]['start'] <= layer[i2]['start'] < layer[i1]['end'].
+    If the elements have the same start, both (i1, i2) and (i2, i1) are returned.
+    The pairs are found with a sweep over the sorted start positions in O(n log n + k log k)
+    time, where k is the number of pairs. The pairs are returned in sorted order.
+    """
+    order = sorted(range(len(layer)), key=lambda i: layer[i]['start'])
+    pairs = []
+    # (end, index) of the elements that started before the current position
+    active = []
+    group_start = 0
+    while group_start < len(order):
+        start = layer[order[group_start]]['start']
+        group_end = group_start
+        while group_end < len(order) and layer[order[group_end]]['start'] == start:
+            group_end += 1
+        group = order[group_start:group_end]
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for i2 in group:
+            for _, i1 in active:
+                pairs.append((i1, i2))
+            for i1 in group:
+                if i1 != i2 and layer[i1]['end'] > start:
+                    pairs.append((i1, i2))
+        for i in group:
+            if layer[i]['end'] > start:
+                heapq.heappush(active, (layer[i]['end'], i))
+        group_start = group_end
+    pairs.sort()
+    return pairs
+
+
 def iterate_intersecting_pairs(layer):
     """
     Given a layer of estntltk objects, yields pairwise intersecting elements.
@@ -157,15 +195,33 @@ def iterate_intersecting_pairs(layer):
     """
     yielded = set()
     ri = layer[:]  # Shallow copy the layer
-    for i1, elem1 in enumerate(ri):
-        for i2, elem2 in enumerate(ri):
-            if i1 != i2 and elem1['start'] <= elem2['start'] < elem1['end']:
-                inds = (i1, i2) if i1 < i2 else (i2, i1)
-                if inds not in yielded and in_by_identity(layer, elem1) and in_by_identity(layer, elem2):
-                    yielded.add(inds)
-                    yield elem1, elem2
-
-
+    # positions of the elements in the layer by ids; the copy keeps the elements alive, so that their ids are not reused
+    positions = dict((id(elem), i) for i, elem in enumerate(ri))
+    # are the positions up to date, i.e. has the layer not been changed since they were computed?
+    fresh = True
+
+    for i1, i2 in intersecting_index_pairs(ri):
+        inds = (i1, i2) if i1 < i2 else (i2, i1)
+        if inds in yielded:
+            continue
+        elem1, elem2 = ri[i1], ri[i2]
+        present = True
+        for elem in (elem1, elem2):
+            i = positions.get(id(elem))
+            if i is not None and i < len(layer) and layer[i] is elem:
+                continue
+            if not fresh:
+                positions = dict((id(e), i) for i, e in enumerate(layer))
+                fresh = True
+                if id(elem) in positions:
+                    continue
+            present = False
+            break
+        if present:
+            yielded.add(inds)
+            # the layer may be changed while the pair is processed
+            fresh = False
+            yield elem1, elem2
 
 
 def discard(a, b, **kwargs):
@@ -229,52 +285,53 @@ def union(x, y):
 
 
 def make_layer_nonconflicting(layer, merge_func):
-    #funktsiooni loogika:
-    #iga konflikti korral:
-    #    kui elemendid on võrdsed, kombineeri need
-    #    kui üks element on teise sees, jaga nad kolmeks või neljaks
-    #    kui elemendid on ülekattega, jaga need kolmeks
-    #korda funktsiooni kuni konflikte pole
-
-    # On ilmne, et elemendi tükeldamine ei tekita uusi konflikte, küll võib see põhjustada, et ühe tsükliga kõiki üles ei leita
-    # On ilmne, et kahe võrdse elemendi ühendamine ei tekita uusi konflikte
-    # Seega peavad konfliktid minema nulli.
-
-    while True:
-        while True:
-            if not list(iterate_intersecting_pairs(layer)):
-                break
-
-            for a, b in iterate_intersecting_pairs(layer):
-                a, b = (a, b) if a['start'] <= b['start'] else (b, a)
-
-                if equal(a, b):
-                    if a is not b:
-                        layer.append(merge(pop_first_by_identity(layer, a),
-                            pop_first_by_identity(layer, b), merge_func, value='equal'))
-                    continue
-
-                elif nested(a, b) or nested(b, a):
-                    if nested(b, a):
-                        a, b = b, a
-
-                    pop_first_by_identity(layer, b)
-                    pop_first_by_identity(layer, a)
-                    diff = difference(a, b)
-                    layer.extend(diff)
-                    continue
-
-                elif overlapping_right(a, b):
-                    mida, midb = union(copy.deepcopy(a), copy.deepcopy(b))
-                    layer.append(merge(mida, midb, merge_func, value='overlapping_right'))
-
-                    a_m = copy.deepcopy(a)
-                    a, b = delete_left(a, mida)
-                    _, b = delete_right(midb, b)
-                    continue
-
-                else:
-                    print('should not happen')
+    """
+    Resolves the conflicts of the layer in place.
+
+    The conflicting elements are split at the start and end positions of each other:
+    every part of the text that is covered by several elements gets one element, which
+    is merged from the covering elements with merge_func (see merge), and the parts
+    covered by a single element get copies of the element. The elements without conflicts
+    are kept as they are. The layer is processed in one sweep over the sorted positions.
+    Empty elements (start == end) are kept as they are.
+
+    merge_func(a, b, value='equal') is given the elements on the same span and
+    returns the attributes of the merged element. The covering elements are merged
+    in the order of the layer.
+    """
+    elements = [elem for elem in layer if elem['start'] < elem['end']]
+    empty = [elem for elem in layer if elem['start'] >= elem['end']]
+    # the elements starting and ending at each position
+    starting = defaultdict(list)
+    ending = defaultdict(list)
+    for i, elem in enumerate(elements):
+        starting[elem['start']].append(i)
+        ending[elem['end']].append(i)
+    positions = sorted(set(starting) | set(ending))
+
+    result = []
+    active = set()
+    for position, next_position in zip(positions, positions[1:]):
+        active.difference_update(ending[position])
+        active.update(starting[position])
+        if not active:
+            continue
+        covering = [elements[i] for i in sorted(active)]
+        if len(covering) == 1:
+            elem = covering[0]
+            if elem['start'] != position or elem['end'] != next_position:
+                elem = copy.deepcopy(elem)
+                elem['start'] = position
+                elem['end'] = next_position
+            result.append(elem)
+            continue
+        # merge creates new elements, so the merged parts are not copied deeply
+        parts = [dict(elem, start=position, end=next_position) for elem in covering]
+        result.append(reduce(lambda a, b: merge(a, b, merge_func, value='equal'), parts))
+
+    result.extend(empty)
+    result.sort(key=lambda elem: (elem['start'], elem['end']))
+    layer[:] = result
 
 
 '''
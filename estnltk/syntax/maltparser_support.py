@@ -26,6 +26,7 @@ from __future__ import unicode_literals, print_function
 from estnltk.names import *
 
 from estnltk.core import PACKAGE_PATH
+from estnltk.instrumentation import record_roundtrip
 
 import re, json
 import os, os.path
@@ -150,9 +151,16 @@ class CONLLFeatGenerator(object):
 
 
     def generate_features( self, sentence_text, wid ):
-        ''' Generates and returns a list of strings, containing tab-separated
-            features ID, FORM, LEMMA, CPOSTAG, POSTAG, FEATS of the word
-            (the word with index *wid* from the given *sentence_text*).
+        ''' Generates features ID, FORM, LEMMA, CPOSTAG, POSTAG, FEATS of the word
+            (the word with index *wid* from the given *sentence_text*), and returns 
+            as a list of strings, where each feature is followed by a tab string:
+            [ID, '\t', FORM, '\t', LEMMA, '\t', CPOSTAG, '\t', POSTAG, '\t', FEATS, '\t'];
+
+            Note that the sentence-level features are computed when the first 
+            word of the sentence is processed (wid == 0), and stored in the 
+            generator until the next sentence, so the words of a sentence must
+            be processed in order; for generating features of a whole sentence,
+            use the method generate_sentence_features() instead;
 
             Parameters
             -----------
@@ -174,88 +182,134 @@ class CONLLFeatGenerator(object):
 
         # 1) Pre-process (if required)
         if wid == 0:
-            #  *** Add adposition (_K_) type
-            if self.kSubCatRelsLex:
-                self.kFeatures = \
-                    _findKsubcatFeatures( sentence, self.kSubCatRelsLex, addFeaturesToK = True )
-            #  *** Add verb chain info
-            if self.addVerbcGramm or self.addNomAdvVinf:
-                self.vcFeatures = generate_verb_chain_features( sentence_text, \
-                                                                addGrammPred=self.addVerbcGramm, \
-                                                                addNomAdvVinf=self.addNomAdvVinf )
-            #  *** Add sentence ending saying verbs
-            if self.addSeSayingVerbs:
-                self.sayingverbs = detect_sentence_ending_saying_verbs( sentence_text )
-            #  *** Add clause boundary info
-            if self.addClauseBound:
-                self.clbFeatures = []
-                for tag in sentence_text.clause_annotations:
-                    if not tag:
-                        self.clbFeatures.append( [] )
-                    elif tag == EMBEDDED_CLAUSE_START:
-                        self.clbFeatures.append( ['emb_cl_start'] )
-                    elif tag == EMBEDDED_CLAUSE_END:
-                        self.clbFeatures.append( ['emb_cl_end'] )
-                    elif tag == CLAUSE_BOUNDARY:
-                        self.clbFeatures.append (['clb'] )
+            kFeatures, vcFeatures, sayingverbs, clbFeatures = \
+                self._generate_sentence_level_features( sentence_text )
+            if kFeatures is not None:
+                self.kFeatures = kFeatures
+            if vcFeatures is not None:
+                self.vcFeatures = vcFeatures
+            if sayingverbs is not None:
+                self.sayingverbs = sayingverbs
+            if clbFeatures is not None:
+                self.clbFeatures = clbFeatures
 
         # 2) Generate the features
-        estnltkWord = sentence[wid]
+        features = self._generate_word_features( sentence[wid], wid, self.kFeatures, \
+                                                 self.vcFeatures, self.sayingverbs, \
+                                                 self.clbFeatures if self.addClauseBound else None )
+        strForm = []
+        for feature in features:
+            strForm.append( feature )
+            strForm.append( '\t' )
+        return strForm
+
+
+    def generate_sentence_features( self, sentence_text ):
+        ''' Generates features ID, FORM, LEMMA, CPOSTAG, POSTAG, FEATS for all 
+            the words of the given sentence, and returns as a list of strings: 
+            one string per word, containing tab-separated features and ending
+            with a tab. Note that these are not complete CONLL lines: the fields 
+            HEAD, DEPREL, PHEAD, PDEPREL are to be appended by the caller. 
+            The string of a word is the same as the concatenation of the list 
+            returned by generate_features() for the word.
+
+            The sentence-level features (verb chain, clause boundary, adposition 
+            and saying verb features) are computed once per sentence, and no 
+            state is stored in the generator, so the same generator can be used
+            simultaneously in multiple threads;
+
+            Parameters
+            -----------
+            sentence_text : estnltk.text.Text
+                Text object corresponding to a single sentence.
+                Words of the sentence, along with their morphological analyses,
+                should be accessible via the layer WORDS.
+        '''
+        assert WORDS in sentence_text and len(sentence_text[WORDS])>0, \
+               " (!) 'words' layer missing or empty in given Text!"
+        sentence = sentence_text[WORDS]
+        kFeatures, vcFeatures, sayingverbs, clbFeatures = \
+            self._generate_sentence_level_features( sentence_text )
+        return [ '\t'.join( self._generate_word_features( word, wid, kFeatures, vcFeatures, \
+                                                           sayingverbs, clbFeatures ) + [''] ) \
+                 for wid, word in enumerate( sentence ) ]
+
+
+    def _generate_sentence_level_features( self, sentence_text ):
+        ''' Computes the sentence-level features required by the configuration
+            of the generator. Returns a tuple (kFeatures, vcFeatures, sayingverbs, 
+            clbFeatures), where features not required by the configuration are 
+            None.
+        '''
+        kFeatures   = None
+        vcFeatures  = None
+        sayingverbs = None
+        clbFeatures = None
+        #  *** Add adposition (_K_) type
+        if self.kSubCatRelsLex:
+            kFeatures = \
+                _findKsubcatFeatures( sentence_text[WORDS], self.kSubCatRelsLex, addFeaturesToK = True )
+        #  *** Add verb chain info
+        if self.addVerbcGramm or self.addNomAdvVinf:
+            vcFeatures = generate_verb_chain_features( sentence_text, \
+                                                       addGrammPred=self.addVerbcGramm, \
+                                                       addNomAdvVinf=self.addNomAdvVinf )
+        #  *** Add sentence ending saying verbs
+        if self.addSeSayingVerbs:
+            sayingverbs = detect_sentence_ending_saying_verbs( sentence_text )
+        #  *** Add clause boundary info
+        if self.addClauseBound:
+            clbFeatures = []
+            for tag in sentence_text.clause_annotations:
+                if not tag:
+                    clbFeatures.append( [] )
+                elif tag == EMBEDDED_CLAUSE_START:
+                    clbFeatures.append( ['emb_cl_start'] )
+                elif tag == EMBEDDED_CLAUSE_END:
+                    clbFeatures.append( ['emb_cl_end'] )
+                elif tag == CLAUSE_BOUNDARY:
+                    clbFeatures.append (['clb'] )
+        return kFeatures, vcFeatures, sayingverbs, clbFeatures
+
+
+    def _generate_word_features( self, estnltkWord, wid, kFeatures, vcFeatures, sayingverbs, clbFeatures ):
+        ''' Generates features ID, FORM, LEMMA, CPOSTAG, POSTAG, FEATS of the 
+            word *estnltkWord* (with index *wid* in the sentence), given the 
+            sentence-level features; returns features as a list of strings.
+        '''
         # Pick the first analysis
         firstAnalysis = estnltkWord[ANALYSIS][0]
-        strForm = []
-        # *** ID
-        strForm.append( str(wid+1) )
-        strForm.append( '\t' )
         # *** FORM
-        word_text = estnltkWord[TEXT]
-        word_text = word_text.replace(' ', '_')
-        strForm.append( word_text )
-        strForm.append( '\t' )
+        word_text = estnltkWord[TEXT].replace(' ', '_')
         # *** LEMMA
-        word_root = firstAnalysis[ROOT]
-        word_root = word_root.replace(' ', '_')
+        word_root = firstAnalysis[ROOT].replace(' ', '_')
         if len(word_root) == 0:
             word_root = "??"
-        strForm.append( word_root )
-        strForm.append( '\t' )
-        # *** CPOSTAG
-        strForm.append( firstAnalysis[POSTAG] )
-        strForm.append( '\t' )
         # *** POSTAG
         finePos = firstAnalysis[POSTAG]
         if self.addAmbiguousPos and len(estnltkWord[ANALYSIS]) > 1:
             pos_tags = sorted(list(set([ a[POSTAG] for a in estnltkWord[ANALYSIS] ])))
             finePos  = '_'.join(pos_tags)
-        #if self.kFeatures and wid in self.kFeatures:
-        #    finePos += '_'+self.kFeatures[wid]
-        strForm.append( finePos )
-        strForm.append( '\t' )
         # *** FEATS  (grammatical categories)
         grammCats = []
         if len(firstAnalysis[FORM]) != 0:
-            forms = firstAnalysis[FORM].split()
-            grammCats.extend( forms )
+            grammCats.extend( firstAnalysis[FORM].split() )
         # add features from verb chains:
-        if self.vcFeatures and self.vcFeatures[wid]:
-            grammCats.extend( self.vcFeatures[wid] )
+        if vcFeatures and vcFeatures[wid]:
+            grammCats.extend( vcFeatures[wid] )
         # add features from clause boundaries:
-        if self.addClauseBound and self.clbFeatures[wid]:
-            grammCats.extend( self.clbFeatures[wid] )
+        if clbFeatures and clbFeatures[wid]:
+            grammCats.extend( clbFeatures[wid] )
         # add adposition type ("post" or "pre")
-        if self.kFeatures and wid in self.kFeatures:
-            grammCats.extend( [self.kFeatures[wid]] )
+        if kFeatures and wid in kFeatures:
+            grammCats.append( kFeatures[wid] )
         # add saying verb features
-        if self.sayingverbs and wid in self.sayingverbs:
-            grammCats.extend( [self.sayingverbs[wid]] )
+        if sayingverbs and wid in sayingverbs:
+            grammCats.append( sayingverbs[wid] )
         # wrap up
-        if not grammCats:
-            grammCats = '_'
-        else:
-            grammCats = '|'.join( grammCats )
-        strForm.append( grammCats )
-        strForm.append( '\t' )
-        return strForm
+        grammCats = '|'.join( grammCats ) if grammCats else '_'
+        # ID, FORM, LEMMA, CPOSTAG, POSTAG, FEATS
+        return [ str(wid+1), word_text, word_root, firstAnalysis[POSTAG], finePos, grammCats ]
 
 
 # =============================================================================
@@ -325,9 +379,111 @@ def __sort_analyses(sentence):
     return sentence
 
 
-def convert_text_to_CONLL( text, feature_generator ):
+def _generate_sentence_features( feature_generator, sentence_text ):
+    ''' Generates features ID, FORM, LEMMA, CPOSTAG, POSTAG, FEATS for all the 
+        words in the *sentence_text* with given *feature_generator*. Returns a list 
+        of tab-separated feature strings, one string per word.
+        
+        If the generator does not have the method *generate_sentence_features()*, 
+        falls back to generating features word by word with *generate_features()*;
+    '''
+    if hasattr( feature_generator, 'generate_sentence_features' ):
+        return feature_generator.generate_sentence_features( sentence_text )
+    return [ ''.join( feature_generator.generate_features( sentence_text, i ) ) \
+             for i in range(len( sentence_text[WORDS] )) ]
+
+
+class _SentenceView(object):
+    ''' A light-weight substitute for the sentence Text object obtained via 
+        text.split_by( SENTENCES ): refers to the words and layer elements of 
+        the original Text instead of constructing a new Text, and provides the 
+        parts of the Text's interface required by CONLLFeatGenerator.
+    '''
+    def __init__( self, layers ):
+        self._layers = layers
+
+    def __getitem__( self, layer ):
+        return self._layers[layer]
+
+    def __contains__( self, layer ):
+        return layer in self._layers
+
+    def is_tagged( self, layer ):
+        return layer in self._layers
+
+    @property
+    def clause_annotations( self ):
+        return [word.get(CLAUSE_ANNOTATION, None) for word in self._layers[WORDS]]
+
+    @property
+    def clause_indices( self ):
+        return [word.get(CLAUSE_IDX, None) for word in self._layers[WORDS]]
+
+
+def _iterate_sentences( text, feature_generator, layers=[] ):
+    ''' Yields sentences (or clauses, depending on the *parseScope* of the 
+        *feature_generator*) of given *text* for generating CONLL features. 
+        Analyses of the words are sorted (see __sort_analyses()), and the yielded
+        sentences also contain given *layers* (divided by sentences).
+        
+        If the generator is a CONLLFeatGenerator and sentences are required, 
+        yields _SentenceView-s of the sentences, constructed from word ranges of 
+        the original Text (and layers required by the generator are tagged in 
+        a copy of the whole text beforehand); otherwise, yields Text objects obtained via 
+        text.split_by();
+    '''
+    try:
+        granularity = feature_generator.parseScope
+    except AttributeError:
+        granularity = SENTENCES
+    assert granularity in [SENTENCES, CLAUSES], '(!) Unsupported granularity: "'+str(granularity)+'"!'
+    if granularity == SENTENCES and isinstance( feature_generator, CONLLFeatGenerator ):
+        from estnltk.dividing import divide
+        # Tag layers required by the feature generator
+        needs_verb_chains = ( feature_generator.addVerbcGramm or feature_generator.addNomAdvVinf or \
+                              feature_generator.addSeSayingVerbs ) and not text.is_tagged( VERB_CHAINS )
+        needs_clauses = ( feature_generator.addClauseBound or feature_generator.addSeSayingVerbs ) and \
+                        not (len(text[WORDS]) > 0 and CLAUSE_IDX in text[WORDS][0])
+        if needs_verb_chains or needs_clauses:
+            # The layers are tagged on a copy of the text (with copies of the words), 
+            # so that the given text is not modified
+            from estnltk.text import Text
+            text = Text( dict(text), **text.get_kwargs() )
+            text[WORDS] = [ dict(word) for word in text[WORDS] ]
+            if needs_verb_chains:
+                text.tag_verb_chains()
+            if needs_clauses:
+                text.tag_clause_annotations()
+        layers = [ layer for layer in layers if layer != VERB_CHAINS ]
+        if VERB_CHAINS in text:
+            layers.append( VERB_CHAINS )
+        divided_layers = [ (layer, divide( text[layer], text[SENTENCES] )) for layer in layers ]
+        for sid, words in enumerate( text.divide( layer=WORDS, by=SENTENCES ) ):
+            sentence = { WORDS: __sort_analyses( [ dict(word) for word in words ] ) }
+            for layer, elements in divided_layers:
+                sentence[layer] = elements[sid]
+            yield _SentenceView( sentence )
+    else:
+        for sentence_text in text.split_by( granularity ):
+            sentence_text[WORDS] = __sort_analyses( sentence_text[WORDS] )
+            yield sentence_text
+
+
+def _write_lines( lines, out_f=None ):
+    ''' Joins given *lines* by newlines and returns as a string, or, if the 
+        file-like object *out_f* is given, writes the lines to the *out_f* 
+        (one by one, without joining) and returns None. '''
+    if out_f is None:
+        return '\n'.join( lines )
+    for i, line in enumerate( lines ):
+        if i > 0:
+            out_f.write( '\n' )
+        out_f.write( line )
+
+
+def convert_text_to_CONLL( text, feature_generator, out_f=None ):
     ''' Converts given estnltk Text object into CONLL format and returns as a 
-        string.
+        string (or writes into *out_f*, if given).
         Uses given *feature_generator* to produce fields ID, FORM, LEMMA, CPOSTAG, 
         POSTAG, FEATS for each token.
         Fields to predict (HEAD, DEPREL) will be left empty.
@@ -340,7 +496,14 @@ def convert_text_to_CONLL( text, feature_generator ):
             
         feature_generator : CONLLFeatGenerator
             An instance of CONLLFeatGenerator, which has method *generate_features()* 
-            for generating morphological features for a single token;
+            for generating morphological features for a single token (and, 
+            optionally, method *generate_sentence_features()* for generating 
+            features for all the tokens of a sentence);
+        
+        out_f : file-like object
+            If given, the CONLL lines are written into *out_f* sentence by sentence 
+            (instead of collecting into a string), and None is returned;
+            Default: None
         
         The aimed format looks something like this:
         1	Öö	öö	S	S	sg|nom	_	xxx	_	_
@@ -352,36 +515,19 @@ def convert_text_to_CONLL( text, feature_generator ):
     from estnltk.text import Text
     if not isinstance( text, Text ):
         raise Exception('(!) Unexpected type of input argument! Expected EstNLTK\'s Text. ')
-    try:
-        granularity = feature_generator.parseScope
-    except AttributeError:
-        granularity = SENTENCES
-    assert granularity in [SENTENCES, CLAUSES], '(!) Unsupported granularity: "'+str(granularity)+'"!'
-    sentenceStrs = []
-    for sentence_text in text.split_by( granularity ):
-        sentence_text[WORDS] = __sort_analyses( sentence_text[WORDS] )
-        for i in range(len( sentence_text[WORDS] )):
-            # Generate features  ID, FORM, LEMMA, CPOSTAG, POSTAG, FEATS
-            strForm = feature_generator.generate_features( sentence_text, i )
-            # *** HEAD  (syntactic parent)
-            strForm.append( '_' )
-            strForm.append( '\t' )
-            # *** DEPREL  (label of the syntactic relation)
-            strForm.append( 'xxx' )
-            strForm.append( '\t' )
-            # *** PHEAD
-            strForm.append( '_' )
-            strForm.append( '\t' )
-            # *** PDEPREL
-            strForm.append( '_' )
-            sentenceStrs.append( ''.join( strForm ) )
-        sentenceStrs.append( '' )
-    return '\n'.join( sentenceStrs )
+    def sentence_lines():
+        for sentence_text in _iterate_sentences( text, feature_generator ):
+            # Generate features  ID, FORM, LEMMA, CPOSTAG, POSTAG, FEATS, and 
+            # leave HEAD, DEPREL, PHEAD, PDEPREL unfilled
+            for features in _generate_sentence_features( feature_generator, sentence_text ):
+                yield features + '_\txxx\t_\t_'
+            yield ''
+    return _write_lines( sentence_lines(), out_f )
 
 
-def convert_text_w_syntax_to_CONLL( text, feature_generator, layer=LAYER_CONLL ):
+def convert_text_w_syntax_to_CONLL( text, feature_generator, layer=LAYER_CONLL, out_f=None ):
     ''' Converts given estnltk Text object into CONLL format and returns as a 
-        string.
+        string (or writes into *out_f*, if given).
         Uses given *feature_generator* to produce fields ID, FORM, LEMMA, CPOSTAG, 
         POSTAG, FEATS for each token.
         Fills fields to predict (HEAD, DEPREL) with the syntactic information from
@@ -395,12 +541,19 @@ def convert_text_w_syntax_to_CONLL( text, feature_generator, layer=LAYER_CONLL )
             
         feature_generator : CONLLFeatGenerator
             An instance of CONLLFeatGenerator, which has method *generate_features()* 
-            for generating morphological features for a single token;
+            for generating morphological features for a single token (and, 
+            optionally, method *generate_sentence_features()* for generating 
+            features for all the tokens of a sentence);
         
         layer : str
             Name of the *text* layer from which syntactic information is to be taken.
             Defaults to LAYER_CONLL.
         
+        out_f : file-like object
+            If given, the CONLL lines are written into *out_f* sentence by sentence 
+            (instead of collecting into a string), and None is returned;
+            Default: None
+        
         The aimed format looks something like this:
         1	Öö	öö	S	S	sg|n	2	@SUBJ	_	_
         2	oli	ole	V	V	s	0	ROOT	_	_
@@ -417,36 +570,24 @@ def convert_text_w_syntax_to_CONLL( text, feature_generator, layer=LAYER_CONLL )
     except AttributeError:
         granularity = SENTENCES
     assert granularity in [SENTENCES, CLAUSES], '(!) Unsupported granularity: "'+str(granularity)+'"!'
-    sentenceStrs = []
     if granularity == CLAUSES:
         _create_clause_based_dep_links( text, layer )
-    for sentence_text in text.split_by( granularity ):
-        sentence_text[WORDS] = __sort_analyses( sentence_text[WORDS] )
-        for i in range(len( sentence_text[WORDS] )):
+    def sentence_lines():
+        for sentence_text in _iterate_sentences( text, feature_generator, layers=[layer] ):
             # Generate features  ID, FORM, LEMMA, CPOSTAG, POSTAG, FEATS
-            strForm = feature_generator.generate_features( sentence_text, i )
-            # Get syntactic analysis of the token
-            syntaxToken    = sentence_text[layer][i]
-            firstSyntaxRel = syntaxToken[PARSER_OUT][0]
-            # *** HEAD  (syntactic parent)
-            parentLabel = str( firstSyntaxRel[1] + 1 )
-            strForm.append( parentLabel )
-            strForm.append( '\t' )
-            # *** DEPREL  (label of the syntactic relation)
-            if parentLabel == '0':
-                strForm.append( 'ROOT' )
-                strForm.append( '\t' )
-            else:
-                strForm.append( firstSyntaxRel[0] )
-                strForm.append( '\t' )
-            # *** PHEAD
-            strForm.append( '_' )
-            strForm.append( '\t' )
-            # *** PDEPREL
-            strForm.append( '_' )
-            sentenceStrs.append( ''.join( strForm ) )
-        sentenceStrs.append( '' )
-    return '\n'.join( sentenceStrs )
+            sentence_features = _generate_sentence_features( feature_generator, sentence_text )
+            for i in range(len( sentence_text[WORDS] )):
+                # Get syntactic analysis of the token
+                syntaxToken    = sentence_text[layer][i]
+                firstSyntaxRel = syntaxToken[PARSER_OUT][0]
+                # *** HEAD  (syntactic parent)
+                parentLabel = str( firstSyntaxRel[1] + 1 )
+                # *** DEPREL  (label of the syntactic relation)
+                deprel = 'ROOT' if parentLabel == '0' else firstSyntaxRel[0]
+                # *** PHEAD, PDEPREL
+                yield sentence_features[i] + '\t'.join( [parentLabel, deprel, '_', '_'] )
+            yield ''
+    return _write_lines( sentence_lines(), out_f )
 
 
 # =============================================================================
@@ -487,17 +628,20 @@ def _executeMaltparser( input_string, maltparser_dir, maltparser_jar, model_name
     temp_output_file = tempfile.NamedTemporaryFile(prefix='malt_out.', mode='w', delete=False)
     temp_output_file.close()
     
-    current_dir = os.getcwd()
-    os.chdir(maltparser_dir)
+    # Run MaltParser in its own directory; note that the working directory is
+    # passed to the subprocess instead of changing the working directory of the
+    # whole process, so that multiple MaltParser processes can be executed 
+    # in parallel threads;
     cmd = ['java', '-jar', os.path.join(maltparser_dir, maltparser_jar), \
            '-c', model_name, \
            '-i', temp_input_file.name, \
            '-o', temp_output_file.name, \
            '-m', 'parse' ]
-    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    if p.wait() != 0: 
-        raise Exception(' Error on running Maltparser: ', p.stderr.read() )
-    os.chdir(current_dir)
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=maltparser_dir)
+    record_roundtrip('MaltParser')
+    p_stdout, p_stderr = p.communicate()
+    if p.returncode != 0: 
+        raise Exception(' Error on running Maltparser: ', p_stderr )
     
     results = []
     in_f = codecs.open(temp_output_file.name, mode='r', encoding='utf-8')
@@ -692,6 +836,16 @@ def align_CONLL_with_Text( lines, text, feature_generator, **kwargs ):
             * 'sent_word_id' - index of the current word in the sentence, starting from 0;
             Default:False
         
+        normalise : bool
+            Optional argument specifying whether the syntactic information should be
+            normalised into the compact format of labelled dependency relations (as in 
+            the output of utils.normalise_alignments()) during the alignment: each 
+            sentence is normalised right after its words have been aligned, so that no 
+            separate pass over the alignments is required;
+            If True, the optional arguments of utils.normalise_alignments() (e.g. 
+            "fix_selfrefs", "keep_old", "mark_root") can also be passed;
+            Default:False
+        
     ''' 
     from estnltk.text import Text
     if not isinstance( text, Text ):
@@ -705,11 +859,17 @@ def align_CONLL_with_Text( lines, text, feature_generator, **kwargs ):
     assert granularity in [SENTENCES, CLAUSES], '(!) Unsupported granularity: "'+str(granularity)+'"!'
     check_tokens = False
     add_word_ids = False
+    normalise    = False
     for argName, argVal in kwargs.items() :
         if argName in ['check_tokens', 'check'] and argVal in [True, False]:
            check_tokens = argVal
         if argName in ['add_word_ids', 'word_ids'] and argVal in [True, False]:
            add_word_ids = argVal
+        if argName in ['normalise', 'normalize'] and argVal in [True, False]:
+           normalise = argVal
+    if normalise:
+        from estnltk.syntax.utils import _get_normalisation_settings, _normalise_sentence
+        normalisation_settings = _get_normalisation_settings( **kwargs )
     generalWID = 0
     sentenceID = 0
     # Collect clause indices for each sentence (if required)
@@ -730,6 +890,7 @@ def align_CONLL_with_Text( lines, text, feature_generator, **kwargs ):
         tokens_to_collect = len( sentence_words )
         tokens_collected  = 0
         chunks      = [[]]
+        sentence_results = []
         while j < len(lines):
             maltparserToken = lines[j]
             if len( maltparserToken ) > 1 and '\t' in maltparserToken:
@@ -762,7 +923,7 @@ def align_CONLL_with_Text( lines, text, feature_generator, **kwargs ):
                 if add_word_ids:
                     result_dict['text_word_id'] = generalWID # word id in the text
                     result_dict['sent_word_id'] = wid        # word id in the sentence
-                results.append( result_dict )
+                sentence_results.append( result_dict )
                 generalWID += 1
         elif granularity == CLAUSES:
             # B. The tricky case: clause-wise splitting was used
@@ -824,8 +985,11 @@ def align_CONLL_with_Text( lines, text, feature_generator, **kwargs ):
                 if add_word_ids:
                     results_by_wid[wid]['text_word_id'] = generalWID # word id in the text
                     results_by_wid[wid]['sent_word_id'] = wid        # word id in the sentence
-                results.append( results_by_wid[wid] )
+                sentence_results.append( results_by_wid[wid] )
                 generalWID += 1
+        if normalise:
+            _normalise_sentence( sentence_results, CONLL_DATA, normalisation_settings )
+        results.extend( sentence_results )
         sentenceID += 1
     return results
 
@@ -13,6 +13,8 @@
 #
 
 import os.path
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 
 from estnltk.names import *
 
@@ -28,6 +30,101 @@ from estnltk.syntax.vislcg3_syntax import VISLCG3Pipeline, cleanup_lines, align_
 from estnltk.syntax.utils import normalise_alignments, build_trees_from_text
 
 
+# ==================================================================================
+# ==================================================================================
+#   Sharding the input of the parsers by sentences
+# ==================================================================================
+# ==================================================================================
+
+def _get_n_jobs( n_jobs ):
+    ''' Returns the number of parallel jobs: given *n_jobs*, or the number of 
+        CPUs, if n_jobs is None or is smaller than 1. '''
+    if n_jobs is None or int(n_jobs) < 1:
+        return cpu_count()
+    return int(n_jobs)
+
+
+def _split_into_sentences( lines, is_sentence_end ):
+    ''' Groups given *lines* into sentences: each sentence (a list of lines) 
+        ends with a line for which  is_sentence_end(line)  is True. Groups 
+        consisting only of empty lines (e.g. trailing empty lines of the 
+        output) are discarded.
+    '''
+    sentences = []
+    current   = []
+    for line in lines:
+        current.append( line )
+        if is_sentence_end( line ):
+            if any( len(l.strip()) > 0 for l in current ):
+                sentences.append( current )
+            current = []
+    if any( len(l.strip()) > 0 for l in current ):
+        sentences.append( current )
+    return sentences
+
+
+def _make_shards( sentences, n_shards ):
+    ''' Distributes given *sentences* (lists of lines) into at most *n_shards* 
+        contiguous shards, containing approximately equal number of lines. 
+        Returns a list of shards, each shard being a list of sentences. 
+    '''
+    total_lines = sum( len(sentence) for sentence in sentences )
+    shards  = []
+    current = []
+    covered = 0
+    for sentence in sentences:
+        current.append( sentence )
+        covered += len( sentence )
+        if len(shards) < n_shards - 1 and covered * n_shards >= total_lines * (len(shards) + 1):
+            shards.append( current )
+            current = []
+    if current:
+        shards.append( current )
+    return shards
+
+
+def _process_in_shards( documents, process_lines, is_sentence_end, n_jobs ):
+    ''' Processes the input lines of given *documents* (a list of lists of lines)
+        with the function *process_lines*, which takes a list of input lines and 
+        returns a list of output lines (e.g. executes an external parser).
+        
+        The sentences of all the documents are distributed among *n_jobs* 
+        shards, and the shards are processed in parallel threads (each thread 
+        calling its own external process). Outputs of the shards are split into 
+        sentences again, and merged back into outputs of the documents, keeping 
+        the original order of the sentences. Returns a list of lists of output 
+        lines, one list per document.
+    '''
+    doc_sentences = [ _split_into_sentences( lines, is_sentence_end ) for lines in documents ]
+    all_sentences = [ sentence for sentences in doc_sentences for sentence in sentences ]
+    shards = _make_shards( all_sentences, n_jobs )
+    shard_inputs = [ [ line for sentence in shard for line in sentence ] for shard in shards ]
+    if n_jobs > 1 and len(shard_inputs) > 1:
+        pool = ThreadPool( min(n_jobs, len(shard_inputs)) )
+        try:
+            shard_outputs = pool.map( process_lines, shard_inputs )
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        shard_outputs = [ process_lines( lines ) for lines in shard_inputs ]
+    # Merge the outputs: split into sentences and collect sentences of each document
+    output_sentences = []
+    for shard, output_lines in zip( shards, shard_outputs ):
+        sentences = _split_into_sentences( output_lines, is_sentence_end )
+        if len(sentences) != len(shard):
+            raise Exception('(!) Unexpected number of sentences in the output of the parser: '+\
+                            str(len(sentences))+'. Expected: '+str(len(shard))+'.')
+        output_sentences.extend( sentences )
+    results = []
+    start = 0
+    for sentences in doc_sentences:
+        end = start + len(sentences)
+        results.append( [ line for sentence in output_sentences[start:end] for line in sentence ] )
+        start = end
+    return results
+
+
 # ==================================================================================
 # ==================================================================================
 #   VISL-CG3 based syntactic analyser
@@ -94,6 +191,12 @@ class VISLCG3Parser(object):
                 This argument is used in initiating SyntaxPreprocessing (preprocessor).
                 (Defaults to: 'abileksikon06utf.lx' in 'syntax/files')
                 
+            binary_cache : bool
+                Whether the parsed rule files (fs_to_synt_rules and subcat_rules) are also
+                cached as pickled files in the user's cache directory;
+                This argument is used in initiating SyntaxPreprocessing (preprocessor).
+                (Defaults to: False)
+                
             vislcg_cmd : str
                 Name of visl_cg3 binary executable. If the executable is accessible from 
                 system's PATH variable, full path can be omitted, otherwise, the name must 
@@ -131,7 +234,8 @@ class VISLCG3Parser(object):
        # initialize pre-processing pipeline
        if not self.preprocessor:
             new_kwargs = self._filter_kwargs( \
-                ['subcat_rules','fs_to_synt_rules','allow_to_remove'], **kwargs )
+                ['subcat_rules','fs_to_synt_rules','allow_to_remove',\
+                 'binary_cache'], **kwargs )
             self.preprocessor = SyntaxPreprocessing( **new_kwargs )
        # initialize vislcg3 pipeline
        if not self.vislcg3_processor:
@@ -218,6 +322,29 @@ class VISLCG3Parser(object):
                 which contains the initial/old analysis lines;
                 Default:False
             
+            n_jobs : int
+                Number of VISLCG3 pipelines to be executed in parallel. If n_jobs > 1,
+                the sentences of the text are distributed among n_jobs shards, which 
+                are analysed in parallel, and the results are merged back in the 
+                order of the sentences; If n_jobs is None or smaller than 1, the number
+                of CPUs is used;
+                Default: 1
+            
+        """
+        return self.parse_texts( [text], **kwargs )[0]
+
+
+    def parse_texts(self, texts, **kwargs):
+        """ Parses given list of texts with VISLCG3 based syntactic analyzer, and 
+            returns a list of results (one result per each input text, in the same
+            order as the texts).
+            
+            Sentences of all the texts are distributed among *n_jobs* shards, which 
+            are analysed by parallel VISLCG3 pipelines; so, a single pipeline can 
+            also process sentences from multiple texts. The layer LAYER_VISLCG3 will 
+            be attached to each text; 
+            
+            Supports the same arguments as the method parse_text();
         """
         # a) get the configuration:
         apply_tag_analysis = False
@@ -240,33 +367,40 @@ class VISLCG3Parser(object):
         kwargs['remove_cap']    = kwargs.get('remove_cap', True)
         kwargs['keep_old']      = kwargs.get('keep_old',  False)
         kwargs['double_quotes'] = 'unesc'
+        kwargs['normalise']     = True  # normalise syntactic info during the alignment
+        n_jobs = _get_n_jobs( kwargs.get('n_jobs', 1) )
         
         # b) process:
         if apply_tag_analysis:
-            text = text.tag_analysis()
-        result_lines1 = \
-            self.preprocessor.process_Text(text, **kwargs)
-        result_lines2 = \
-            self.vislcg3_processor.process_lines(result_lines1, **kwargs)
-        alignments = \
-            align_cg3_with_Text(result_lines2, text, **kwargs)
-        alignments = \
-            normalise_alignments( alignments, data_type=VISLCG3_DATA, **kwargs )
-        
-        # c) attach & return results
-        text[LAYER_VISLCG3] = alignments
-        if augment_words:
-            self._augment_text_w_syntactic_info( text, text[LAYER_VISLCG3] )
-        if return_type   == "vislcg3":
-            return result_lines2
-        elif return_type == "trees":
-            return build_trees_from_text( text, layer=LAYER_VISLCG3, **kwargs )
-        elif return_type == "dep_graphs":
-            trees = build_trees_from_text( text, layer=LAYER_VISLCG3, **kwargs )
-            graphs = [tree.as_dependencygraph() for tree in trees]
-            return graphs
+            texts = [ text.tag_analysis() for text in texts ]
+        all_lines1 = [ self.preprocessor.process_Text(text, **kwargs) for text in texts ]
+        if len(texts) == 1 and n_jobs == 1:
+            all_lines2 = \
+                [ self.vislcg3_processor.process_lines(all_lines1[0], **kwargs) ]
         else:
-            return text
+            all_lines2 = \
+                _process_in_shards( all_lines1, \
+                    lambda lines: self.vislcg3_processor.process_lines(lines, **kwargs), \
+                    lambda line: line.strip() == '"</s>"', n_jobs )
+        
+        # c) attach & collect results
+        results = []
+        for text, result_lines2 in zip( texts, all_lines2 ):
+            text[LAYER_VISLCG3] = \
+                align_cg3_with_Text(result_lines2, text, **kwargs)
+            if augment_words:
+                self._augment_text_w_syntactic_info( text, text[LAYER_VISLCG3] )
+            if return_type   == "vislcg3":
+                results.append( result_lines2 )
+            elif return_type == "trees":
+                results.append( build_trees_from_text( text, layer=LAYER_VISLCG3, **kwargs ) )
+            elif return_type == "dep_graphs":
+                trees = build_trees_from_text( text, layer=LAYER_VISLCG3, **kwargs )
+                graphs = [tree.as_dependencygraph() for tree in trees]
+                results.append( graphs )
+            else:
+                results.append( text )
+        return results
     
     
     def _filter_kwargs(self, keep_list, **kwargs):
@@ -459,8 +593,31 @@ class MaltParser(object):
                 If True, each dict will be augmented with key 'init_parser_out' 
                 which contains the initial/old analysis lines;
                 Default:False
+            
+            n_jobs : int
+                Number of MaltParser processes to be executed in parallel. If n_jobs > 1,
+                the sentences of the text are distributed among n_jobs shards, which 
+                are parsed in parallel, and the results are merged back in the order 
+                of the sentences; If n_jobs is None or smaller than 1, the number of 
+                CPUs is used;
+                Default: 1
         
         '''
+        return self.parse_texts( [text], **kwargs )[0]
+
+
+    def parse_texts( self, texts, **kwargs ):
+        ''' Parses given list of texts with Maltparser, and returns a list of 
+            results (one result per each input text, in the same order as the 
+            texts).
+            
+            Sentences of all the texts are distributed among *n_jobs* shards, which 
+            are parsed by parallel MaltParser processes; so, a single MaltParser 
+            process can also parse sentences from multiple texts. The layer 
+            LAYER_CONLL will be attached to each text;
+            
+            Supports the same arguments as the method parse_text();
+        '''
         # a) get the configuration:
         augment_words    = False
         all_return_types = ["text", "conll", "trees", "dep_graphs"]
@@ -473,51 +630,53 @@ class MaltParser(object):
                     raise Exception(' Unexpected return type: ', argVal)
             elif argName.lower() == 'augment_words':
                 augment_words = bool(argVal)
+        n_jobs = _get_n_jobs( kwargs.get('n_jobs', 1) )
         
         # b) process:
-        #  If text has not been morphologically analysed yet, add the 
-        #  morphological analysis
-        if not text.is_tagged(ANALYSIS):
-            text.tag_analysis()
-        # Obtain CONLL formatted version of the text
-        textConllStr = convert_text_to_CONLL( text, self.feature_generator )
-
-        # Execute MaltParser and get results as CONLL formatted string
-        resultsConllStr = \
-            _executeMaltparser( textConllStr, self.maltparser_dir, \
-                                              self.maltparser_jar, \
-                                              self.model_name )
-        # Align the results with the initial text
-        alignments = \
-            align_CONLL_with_Text( resultsConllStr, text, self.feature_generator, **kwargs )
-        alignments = \
-            normalise_alignments( alignments, data_type=CONLL_DATA, **kwargs )
-        
-        # c) attach & return results
-        text[LAYER_CONLL] = alignments
-        if augment_words:
-            # Augment the input text with the dependency relation information 
-            # obtained from MaltParser 
-            # (!) Note: this will be deprecated in the future
-            augmentTextWithCONLLstr( resultsConllStr, text )
-        if return_type   == "conll":
-            return resultsConllStr
-        elif return_type == "trees":
-            return build_trees_from_text( text, layer=LAYER_CONLL, **kwargs )
-        elif return_type == "dep_graphs":
-            trees = build_trees_from_text( text, layer=LAYER_CONLL, **kwargs )
-            graphs = [tree.as_dependencygraph() for tree in trees]
-            return graphs
-            # An alternative:
-            # Return DependencyGraphs
-            #from nltk.parse.dependencygraph import DependencyGraph
-            #all_trees = []
-            #for tree_str in ("\n".join(resultsConllStr)).split('\n\n'):
-            #    t = DependencyGraph(tree_str)
-            #    all_trees.append(t)
-            #return all_trees
+        textConllStrs = []
+        for text in texts:
+            #  If text has not been morphologically analysed yet, add the 
+            #  morphological analysis
+            if not text.is_tagged(ANALYSIS):
+                text.tag_analysis()
+            # Obtain CONLL formatted version of the text
+            textConllStrs.append( convert_text_to_CONLL( text, self.feature_generator ) )
+
+        # Execute MaltParser and get results as CONLL formatted strings
+        execute = lambda lines: _executeMaltparser( '\n'.join(lines), self.maltparser_dir, \
+                                                                      self.maltparser_jar, \
+                                                                      self.model_name )
+        if len(texts) == 1 and n_jobs == 1:
+            allResultsConllStrs = [ execute( [textConllStrs[0]] ) ]
         else:
-            return text
+            allResultsConllStrs = \
+                _process_in_shards( [ conllStr.split('\n') for conllStr in textConllStrs ], \
+                                    execute, lambda line: len(line.strip()) == 0, n_jobs )
+        
+        # c) attach & collect results
+        #   (the syntactic information is normalised during the alignment)
+        kwargs['normalise'] = True
+        results = []
+        for text, resultsConllStr in zip( texts, allResultsConllStrs ):
+            # Align the results with the initial text
+            text[LAYER_CONLL] = \
+                align_CONLL_with_Text( resultsConllStr, text, self.feature_generator, **kwargs )
+            if augment_words:
+                # Augment the input text with the dependency relation information 
+                # obtained from MaltParser 
+                # (!) Note: this will be deprecated in the future
+                augmentTextWithCONLLstr( resultsConllStr, text )
+            if return_type   == "conll":
+                results.append( resultsConllStr )
+            elif return_type == "trees":
+                results.append( build_trees_from_text( text, layer=LAYER_CONLL, **kwargs ) )
+            elif return_type == "dep_graphs":
+                trees = build_trees_from_text( text, layer=LAYER_CONLL, **kwargs )
+                graphs = [tree.as_dependencygraph() for tree in trees]
+                results.append( graphs )
+            else:
+                results.append( text )
+        return results
 
 
 
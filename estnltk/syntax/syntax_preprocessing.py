@@ -58,11 +58,15 @@
 from __future__ import unicode_literals, print_function
 
 from estnltk.names import *
-from estnltk.core import PACKAGE_PATH
+from estnltk.core import PACKAGE_PATH, default_cache_dir
+
+from six.moves import cPickle as pickle
 
 import re, json
 import os, os.path
 import codecs
+import hashlib
+import threading
 
 
 SYNTAX_PATH      = os.path.join(PACKAGE_PATH, 'syntax', 'files')
@@ -84,6 +88,36 @@ def _esc_que_mark( analysis ):
     '''
     return (analysis.replace(' ?', ' #?')).replace(' ?', ' #?')
 
+def _split_tokens( mrf_lines ):
+    ''' Groups mrf lines into tokens. Returns a list of pairs [word_line, analysis_lines],
+        where word_line is a line that does not start with an indentation (a word, or
+        a sentence boundary tag), and analysis_lines is the list of (indented) analysis 
+        lines following it; If the input begins with analysis lines, these are grouped
+        into a token with word_line None;
+    '''
+    tokens = []
+    token  = None
+    for line in mrf_lines:
+        if line.startswith('  '):
+            if token is None:
+                token = [None, []]
+                tokens.append( token )
+            token[1].append( line )
+        else:
+            token = [line, []]
+            tokens.append( token )
+    return tokens
+
+def _join_tokens( tokens ):
+    ''' Converts tokens grouped by _split_tokens() back into a list of mrf lines.
+    '''
+    mrf_lines = []
+    for word_line, analysis_lines in tokens:
+        if word_line is not None:
+            mrf_lines.append( word_line )
+        mrf_lines.extend( analysis_lines )
+    return mrf_lines
+
 
 # ==================================================================================
 # ==================================================================================
@@ -303,6 +337,54 @@ _morfWithoutForm = re.compile('^\s*(\S.*)\s+//\s*(_._)\s+//')
 
 # ================================================
 
+def _convert_analysis_to_syntax_mrf( line, conversion_rules ):
+    ''' Converts a single analysis line from Filosoft's mrf format to syntactic 
+        analyzer's format (see convert_mrf_to_syntax_mrf() for details);
+        
+        Returns a list of analysis lines: the conversion of one Filosoft's analysis
+        may result in multiple syntactic analyzer's analyses;
+    '''
+    converted = line
+    # 1) Convert punctuation
+    if _punctOrAbbrev.search(line):
+        converted = _convert_punctuation( line )
+        if '_Y_' not in line:
+            return [ converted ]
+    # 2) Convert morphological analyses that have a form specified
+    withFormMatch = _morfWithForm.search(line)
+    if withFormMatch:
+        root    = withFormMatch.group(1)
+        pos     = withFormMatch.group(2)
+        formStr = withFormMatch.group(3)
+        all_new_lines = []
+        newlines = []
+        for form in formStr.split(','):
+            morphKey = pos+' '+form.strip()
+            if morphKey in conversion_rules:
+                newlines = [ '    '+root+' //'+_esc_que_mark(r)+' //' for r in conversion_rules[morphKey] ]
+                all_new_lines.extend( newlines )
+        if all_new_lines:
+            # Keep the behaviour of the original in-place implementation: the new lines
+            # are given in the reversed order, and only the lines obtained from the last 
+            # form are final; lines obtained from the other forms are converted again;
+            all_new_lines.reverse()
+            results = all_new_lines[:len(newlines)]
+            for newline in all_new_lines[len(newlines):]:
+                results.extend( _convert_analysis_to_syntax_mrf( newline, conversion_rules ) )
+            return results
+    else:
+        withoutFormMatch = _morfWithoutForm.search(line)
+        if withoutFormMatch:
+            # 3) Convert morphological analyses that have only POS specified
+            root = withoutFormMatch.group(1)
+            pos  = withoutFormMatch.group(2)
+            if pos in conversion_rules:
+                newlines = [ '    '+root+' //'+_esc_que_mark(r)+' //' for r in conversion_rules[pos] ]
+                newlines.reverse()
+                return newlines
+    return [ converted ]
+
+
 def convert_mrf_to_syntax_mrf( mrf_lines, conversion_rules ):
     ''' Converts given lines from Filosoft's mrf format to syntactic analyzer's 
         format, using the morph-category conversion rules from conversion_rules,
@@ -319,53 +401,13 @@ def convert_mrf_to_syntax_mrf( mrf_lines, conversion_rules ):
         original Filosoft's analysis is expanded into multiple analyses 
         suitable for the syntactic analyzer;
     ''' 
-    i = 0
-    while ( i < len(mrf_lines) ):
-        line = mrf_lines[i]
+    converted = []
+    for line in mrf_lines:
         if line.startswith('  '):  # only consider lines of analysis 
-            # 1) Convert punctuation
-            if _punctOrAbbrev.search(line):
-                mrf_lines[i] = _convert_punctuation( line )
-                if '_Y_' not in line:
-                    i += 1
-                    continue
-            # 2) Convert morphological analyses that have a form specified
-            withFormMatch = _morfWithForm.search(line)
-            if withFormMatch:
-                root    = withFormMatch.group(1)
-                pos     = withFormMatch.group(2)
-                formStr = withFormMatch.group(3)
-                forms   = formStr.split(',')
-                all_new_lines = []
-                for form in forms:
-                    morphKey = pos+' '+form.strip()
-                    if morphKey in conversion_rules:
-                        newlines = [ '    '+root+' //'+_esc_que_mark(r)+' //' for r in conversion_rules[morphKey] ]
-                        all_new_lines.extend( newlines )
-                if all_new_lines:
-                    del mrf_lines[i] 
-                    for newline in all_new_lines:
-                        mrf_lines.insert(i, newline)
-                    i += len(newlines)
-                    continue
-            else:
-                withoutFormMatch = _morfWithoutForm.search(line)
-                if withoutFormMatch:
-                    # 3) Convert morphological analyses that have only POS specified
-                    root = withoutFormMatch.group(1)
-                    pos  = withoutFormMatch.group(2)
-                    morphKey = pos
-                    all_new_lines = []
-                    if morphKey in conversion_rules:
-                        newlines = [ '    '+root+' //'+_esc_que_mark(r)+' //' for r in conversion_rules[morphKey] ]
-                        all_new_lines.extend( newlines )
-                    if all_new_lines:
-                        del mrf_lines[i] 
-                        for newline in all_new_lines:
-                            mrf_lines.insert(i, newline)
-                        i += len(newlines)
-                        continue
-        i += 1
+            converted.extend( _convert_analysis_to_syntax_mrf( line, conversion_rules ) )
+        else:
+            converted.append( line )
+    mrf_lines[:] = converted
     return mrf_lines
 
 
@@ -490,6 +532,35 @@ _pronConversions = [ ["(emb\+.* //\s*_P_)\s+([sp])",             "\\1 det \\2"],
 ]
 
 
+def compile_pronoun_rules( conversions=_pronConversions ):
+    ''' Compiles pronoun conversion rules (a list of [pattern, replacement] pairs, 
+        see _pronConversions) into a list of (compiled_pattern, replacement) pairs;
+    '''
+    return [ (re.compile(pattern), replacement) for [pattern, replacement] in conversions ]
+
+
+def _convert_pronoun( line, pronoun_rules, cache=None ):
+    ''' Converts a single pronoun analysis line using the first matching rule 
+        from pronoun_rules (compiled via compile_pronoun_rules()); Returns the 
+        converted line (same as input, if no conversion was performed);
+        
+        If a dict is given as cache, it is used for memorizing the conversions:
+        pronouns are a closed class, so the number of distinct pronoun analysis 
+        lines is small, and most of the lines can be converted with a single 
+        lookup instead of trying the rules one by one;
+    '''
+    if cache is not None and line in cache:
+        return cache[line]
+    converted = line
+    for pattern, replacement in pronoun_rules:
+        converted = pattern.sub(replacement, line)
+        if converted != line:
+            break
+    if cache is not None:
+        cache[line] = converted
+    return converted
+
+
 def convert_pronouns( mrf_lines ):
     ''' Converts pronouns (analysis lines with '_P_') from Filosoft's mrf to 
         syntactic analyzer's mrf format;
@@ -503,17 +574,11 @@ def convert_pronouns( mrf_lines ):
         Returns the input mrf list, with the lines converted from one format
         to another;
     ''' 
-    i = 0
-    while ( i < len(mrf_lines) ):
-        line = mrf_lines[i]
+    pronoun_rules = compile_pronoun_rules( _pronConversions )
+    cache = {}
+    for i, line in enumerate( mrf_lines ):
         if '_P_' in line:  # only consider lines containing pronoun analyses
-           for [pattern, replacement] in _pronConversions:
-               lastline = line
-               line = re.sub(pattern, replacement, line)
-               if lastline != line:
-                  mrf_lines[i] = line
-                  break
-        i += 1
+           mrf_lines[i] = _convert_pronoun( line, pronoun_rules, cache )
     return mrf_lines
 
 
@@ -525,6 +590,48 @@ def convert_pronouns( mrf_lines ):
 # ==================================================================================
 # ==================================================================================
 
+_KpreAnalysis  = re.compile('/_K_\s+pre\s+//')
+_KpostAnalysis = re.compile('/_K_\s+post\s+//')
+
+def _remove_duplicate_analyses( analysis_lines, allow_to_delete_all = True ):
+    ''' Removes duplicate analyses and redundant adposition analyses from the 
+        analysis lines of a single token (see remove_duplicate_analyses() for 
+        details);
+        
+        Returns a list of the remaining analysis lines;
+    '''
+    seen_analyses  = set()
+    to_delete      = []
+    Kpre_index     = -1
+    Kpost_index    = -1
+    for i, line in enumerate( analysis_lines ):
+        if line in seen_analyses:
+           # Remember line that has been already seen as a duplicate
+           to_delete.append( i )
+        else:
+           # Remember '_K pre' and '_K_ post' indices
+           if _KpreAnalysis.search(line):
+              Kpre_index  = i
+           elif _KpostAnalysis.search(line):
+              Kpost_index = i
+           # Remember that the line has already been seen
+           seen_analyses.add( line )
+    if Kpre_index != -1 and Kpost_index != -1:
+       # If there was both _K_pre and _K_post, add _K_pre to removables;
+       to_delete.append( Kpre_index )
+    elif Kpost_index != -1:
+       # If there was only _K_post, add _K_post to removables;
+       to_delete.append( Kpost_index )
+    if not to_delete:
+       return analysis_lines
+    if not allow_to_delete_all and len(to_delete) == len(analysis_lines):
+       # If we must preserve at least one analysis, and it has been 
+       # found that all should be deleted, then keep the first one
+       return analysis_lines[:1]
+    to_delete = set( to_delete )
+    return [ line for i, line in enumerate( analysis_lines ) if i not in to_delete ]
+
+
 def remove_duplicate_analyses( mrf_lines, allow_to_delete_all = True ):
     ''' Removes duplicate analysis lines from mrf_lines. 
         
@@ -544,54 +651,12 @@ def remove_duplicate_analyses( mrf_lines, allow_to_delete_all = True ):
         
         Returns the input list where the removals have been applied;
     ''' 
-    i = 0
-    seen_analyses  = []
-    analyses_count = 0
-    to_delete      = []
-    Kpre_index     = -1
-    Kpost_index    = -1
-    while ( i < len(mrf_lines) ):
-        line = mrf_lines[i]
-        if not line.startswith('  '): 
-           if Kpre_index != -1 and Kpost_index != -1:
-              # If there was both _K_pre and _K_post, add _K_pre to removables;
-              to_delete.append( Kpre_index )
-           elif Kpost_index != -1:
-              # If there was only _K_post, add _K_post to removables;
-              to_delete.append( Kpost_index )
-           # Delete found duplicates
-           if to_delete:
-              for k, j in enumerate(sorted(to_delete, reverse=True)):
-                  # If we must preserve at least one analysis, and
-                  # it has been found that all should be deleted, then 
-                  # keep the last one
-                  if not allow_to_delete_all and \
-                     analyses_count == len(to_delete) and \
-                     k == len(to_delete) - 1:
-                     continue
-                  # Delete the analysis line
-                  del mrf_lines[j]
-                  i -= 1
-           # Reset the memory for each new word/token
-           seen_analyses = []
-           analyses_count = 0
-           to_delete     = []
-           Kpre_index    = -1
-           Kpost_index   = -1
-        elif line.startswith('  '):   # the line of analysis 
-           analyses_count += 1
-           if line in seen_analyses:
-              # Remember line that has been already seen as a duplicate
-              to_delete.append( i )
-           else:
-              # Remember '_K pre' and '_K_ post' indices
-              if re.search('/_K_\s+pre\s+//', line):
-                 Kpre_index  = i
-              elif re.search('/_K_\s+post\s+//', line):
-                 Kpost_index = i
-              # Remember that the line has already been seen
-              seen_analyses.append( line )
-        i += 1
+    tokens = _split_tokens( mrf_lines )
+    # Note: as in the original implementation, removals are applied to a token only 
+    # if it is followed by another token (normally, the last token is '</s>')
+    for token in tokens[:-1]:
+        token[1] = _remove_duplicate_analyses( token[1], allow_to_delete_all=allow_to_delete_all )
+    mrf_lines[:] = _join_tokens( tokens )
     return mrf_lines
 
 
@@ -602,6 +667,9 @@ def remove_duplicate_analyses( mrf_lines, allow_to_delete_all = True ):
 # ==================================================================================
 # ==================================================================================
 
+# The end of analysis content: new tags are inserted before the last '//'
+_analysisEnd = re.compile('(//.+\S)\s+//')
+
 # Information about verb finite forms
 _morfFinV    = re.compile('//\s*(_V_).*\s+(ps.|neg|quot|impf imps|pres imps)\s')
 _morfNotFinV = re.compile('//\s*(_V_)\s+(aux neg)\s+//')
@@ -619,6 +687,20 @@ _mrfHashTagConversions = [ ["(=[td]ud.+//.+)(\s+//)",   "\\1 partic #tud //"], \
 ]
 
 
+def _add_hashtag_info( line, cap ):
+    ''' Augments a single analysis line with hashtag information (see 
+        add_hashtag_info() for details); The flag cap indicates whether 
+        the word of the analysis begins with a capital letter;
+    '''
+    if cap:
+       line = _analysisEnd.sub('\\1 #cap //', line)
+    if _morfFinV.search( line ) and not _morfNotFinV.search( line ):
+       line = _analysisEnd.sub('\\1 #FinV //', line)
+    for [pattern, replacement] in _mrfHashTagConversions:
+        line = re.sub(pattern, replacement, line)
+    return line
+
+
 def add_hashtag_info( mrf_lines ):
     ''' Augments analysis lines with various hashtag information:
           *) marks words with capital beginning with #cap;
@@ -629,21 +711,12 @@ def add_hashtag_info( mrf_lines ):
 
         Returns the input list where the augmentation has been applied;
     ''' 
-    i   = 0
     cap = False
-    while ( i < len(mrf_lines) ):
-        line = mrf_lines[i]
+    for i, line in enumerate( mrf_lines ):
         if not line.startswith('  ') and len(line) > 0:
            cap = (line[0]).isupper()
         elif line.startswith('  '): 
-           if cap:
-              line = re.sub('(//.+\S)\s+//', '\\1 #cap //', line)
-           if _morfFinV.search( line ) and not _morfNotFinV.search( line ):
-              line = re.sub('(//.+\S)\s+//', '\\1 #FinV //', line)
-           for [pattern, replacement] in _mrfHashTagConversions:
-               line = re.sub(pattern, replacement, line)
-           mrf_lines[i] = line
-        i += 1
+           mrf_lines[i] = _add_hashtag_info( line, cap )
     return mrf_lines
 
 
@@ -718,6 +791,81 @@ analysisLemmaPat = re.compile('^\s+([^+ ]+)\+')
 analysisPat      = re.compile('//([^/]+)//')
 
 
+def compile_subcat_rules( subcat_rules ):
+    ''' Pre-parses subcategorization rules loaded via method load_subcat_info();
+        
+        Returns a dict mapping each lemma to a list of parsed rules; each parsed 
+        rule is a pair (conditions, additions), where conditions is a tuple of 
+        POS-tag conditions (the left side of '>'), and additions is a tuple of
+        alternatives (separated by '|' on the right side of '>'), each alternative
+        being a tuple of (item, replacement) pairs, where replacement is the 
+        replacement string for adding the item to an analysis line;
+        
+        Example: the rule 
+            '_K_ post >#gen |#nom |#el'
+        is parsed into
+            ( ('_K_', 'post'), 
+              ( (('#gen', '\\1 #gen //'),), 
+                (('#nom', '\\1 #nom //'),), 
+                (('#el', '\\1 #el //'),) ) )
+    '''
+    compiled_rules = {}
+    for lemma, rules in subcat_rules.items():
+        parsed_rules = []
+        for rule in rules:
+            condition, addition = rule.split('>')
+            conditions = tuple( condition.strip().split() )
+            additions  = tuple( tuple( (item, '\\1 '+item+' //') for item in a.split() ) \
+                                for a in addition.split('|') )
+            parsed_rules.append( (conditions, additions) )
+        compiled_rules[lemma] = parsed_rules
+    return compiled_rules
+
+
+def _tag_subcat_info( line, compiled_subcat_rules ):
+    ''' Adds subcategorization information to a single analysis line (see 
+        tag_subcat_info() for details); The rules must be pre-parsed via
+        compile_subcat_rules();
+        
+        Returns a list of analysis lines: if the subcategorization rule lists 
+        alternatives (separated by '|'), then each alternative is placed on a 
+        separate analysis line;
+    '''
+    lemma_match = analysisLemmaPat.match(line)
+    if lemma_match:
+       # Find whether there is subcategorization info associated 
+       # with the lemma
+       rules = compiled_subcat_rules.get( lemma_match.group(1) )
+       if rules:
+          analysis_match = analysisPat.search(line)
+          if not analysis_match:
+             raise Exception(' Could not find analysis from the line:',line)
+          analysis = analysis_match.group(1)
+          for conditions, additions in rules:
+              # Check the condition string; If there are multiple conditions, 
+              # all must be satisfied for the rule to fire
+              if all( _check_condition(c, analysis) for c in conditions ):
+                 #
+                 # There can be multiple additions:
+                 #   1) additions without '|' must be added to a single analysis line;
+                 #   2) additions separated by '|' must be placed on separate analysis 
+                 #      lines;
+                 #
+                 new_lines = []
+                 for items_to_add in additions:
+                     line_copy = line
+                     for item, replacement in items_to_add:
+                         if not _check_condition(item, analysis):
+                            line_copy = _analysisEnd.sub(replacement, line_copy)
+                     new_lines.append( line_copy )
+                 # As in the original implementation, the lines of additions 
+                 # are given in the reversed order
+                 new_lines.reverse()
+                 # No need to search forward
+                 return new_lines
+    return [ line ]
+
+
 def tag_subcat_info( mrf_lines, subcat_rules ):
     ''' Adds subcategorization information (hashtags) to verbs and adpositions;
         
@@ -732,55 +880,14 @@ def tag_subcat_info( mrf_lines, subcat_rules ):
         Returns the input list where verb/adposition analyses have been augmented 
         with available subcategorization information;
     ''' 
-    i = 0
-    while ( i < len(mrf_lines) ):
-        line = mrf_lines[i]
+    compiled_subcat_rules = compile_subcat_rules( subcat_rules )
+    tagged = []
+    for line in mrf_lines:
         if line.startswith('  '):
-           lemma_match = analysisLemmaPat.match(line)
-           if lemma_match:
-              lemma = lemma_match.group(1)
-              # Find whether there is subcategorization info associated 
-              # with the lemma
-              if lemma in subcat_rules:
-                 analysis_match = analysisPat.search(line)
-                 if not analysis_match:
-                    raise Exception(' Could not find analysis from the line:',line)
-                 analysis = analysis_match.group(1)
-                 for rule in subcat_rules[lemma]:
-                     condition, addition = rule.split('>')
-                     # Check the condition string; If there are multiple conditions, 
-                     # all must be satisfied for the rule to fire
-                     condition  = condition.strip()
-                     conditions = condition.split()
-                     satisfied1 = [ _check_condition(c, analysis) for c in conditions ]
-                     if all( satisfied1 ):
-                        #
-                        # There can be multiple additions:
-                        #   1) additions without '|' must be added to a single analysis line;
-                        #   2) additions separated by '|' must be placed on separate analysis 
-                        #      lines;
-                        #
-                        additions = addition.split('|')
-                        j = i
-                        # Add new line or lines
-                        for a in additions:
-                            line_copy = line if i == j else line[:] 
-                            items_to_add = a.split()
-                            for item in items_to_add:
-                                if not _check_condition(item, analysis):
-                                   line_copy = \
-                                       re.sub('(//.+\S)\s+//', '\\1 '+item+' //', line_copy)
-                            if j == i:
-                               # 1) replace the existing line
-                               mrf_lines[i] = line_copy
-                            else:
-                               # 2) add a new line 
-                               mrf_lines.insert(i, line_copy)
-                            j += 1
-                        i = j - 1
-                        # No need to search forward
-                        break
-        i += 1
+           tagged.extend( _tag_subcat_info( line, compiled_subcat_rules ) )
+        else:
+           tagged.append( line )
+    mrf_lines[:] = tagged
     return mrf_lines
 
 
@@ -791,6 +898,40 @@ def tag_subcat_info( mrf_lines, subcat_rules ):
 # ==================================================================================
 # ==================================================================================
 
+def _convert_word_to_cg3( line ):
+    ''' Converts a line containing word/token into cg3 input format;
+    '''
+    #  a. surround the word with "< and >"
+    line = re.sub('^(\S.*)([\n\r]*)$','"<\\1>"\\2', line)
+    #  b. fix the sentence begin/end tags
+    line = re.sub('<<(s|/s)>>', '<\\1>', line)
+    return line
+
+
+def _convert_analysis_to_cg3( line ):
+    ''' Converts a line containing analysis into cg3 input format;
+    '''
+    #  1. perform various fixes:
+    line = re.sub('#cap #cap','cap', line)
+    line = re.sub('#cap','cap', line)
+    line = re.sub('\*\*CLB','CLB', line)
+    line = re.sub('#Correct!','<Correct!>', line)
+    line = re.sub('####','', line)
+    line = re.sub('#(\S+)','<\\1>', line)
+    line = re.sub('\$([,.;!?:<]+)','\\1', line)
+    line = re.sub('_Y_\s+\? _Z_','_Z_', line)
+    line = re.sub('_Y_\s+\?\s+_Z_','_Z_', line)
+    line = re.sub('_Y_\s+_Z_','_Z_', line)
+    line = re.sub('_Z_\s+\?','_Z_', line)
+    #  2. convert analysis line \w word ending
+    line = re.sub('^\s+(\S+)(.*)\+(\S+)\s*//_(\S)_ (.*)//(.*)$', \
+                  '    "\\1\\2" L\\3 \\4 \\5 \\6', line)
+    #  3. convert analysis line \wo word ending
+    line = re.sub('^\s+(\S+)(.*)\s+//_(\S)_ (.*)//(.*)$', \
+                  '    "\\1\\2" \\3 \\4 \\5', line)
+    return line
+
+
 def convert_to_cg3_input( mrf_lines ):
     ''' Converts given mrf lines from syntax preprocessing format to cg3 input
         format:
@@ -804,45 +945,147 @@ def convert_to_cg3_input( mrf_lines ):
         Returns the input list, where elements (tokens/analyses) have been converted
         into the new format;
     ''' 
-    i = 0
-    while ( i < len(mrf_lines) ):
-        line = mrf_lines[i]
+    for i, line in enumerate( mrf_lines ):
         if not line.startswith('  ') and len(line) > 0:
            #
            # A line containing word/token
            #
-           #  a. surround the word with "< and >"
-           line = re.sub('^(\S.*)([\n\r]*)$','"<\\1>"\\2', line)
-           #  b. fix the sentence begin/end tags
-           line = re.sub('<<(s|/s)>>', '<\\1>', line)
-           mrf_lines[i] = line
+           mrf_lines[i] = _convert_word_to_cg3( line )
         elif line.startswith('  '):
            #
            # A line containing analysis
            #
-           #  1. perform various fixes:
-           line = re.sub('#cap #cap','cap', line)
-           line = re.sub('#cap','cap', line)
-           line = re.sub('\*\*CLB','CLB', line)
-           line = re.sub('#Correct!','<Correct!>', line)
-           line = re.sub('####','', line)
-           line = re.sub('#(\S+)','<\\1>', line)
-           line = re.sub('\$([,.;!?:<]+)','\\1', line)
-           line = re.sub('_Y_\s+\? _Z_','_Z_', line)
-           line = re.sub('_Y_\s+\?\s+_Z_','_Z_', line)
-           line = re.sub('_Y_\s+_Z_','_Z_', line)
-           line = re.sub('_Z_\s+\?','_Z_', line)
-           #  2. convert analysis line \w word ending
-           line = re.sub('^\s+(\S+)(.*)\+(\S+)\s*//_(\S)_ (.*)//(.*)$', \
-                         '    "\\1\\2" L\\3 \\4 \\5 \\6', line)
-           #  3. convert analysis line \wo word ending
-           line = re.sub('^\s+(\S+)(.*)\s+//_(\S)_ (.*)//(.*)$', \
-                         '    "\\1\\2" \\3 \\4 \\5', line)
-           mrf_lines[i] = line
-        i += 1
+           mrf_lines[i] = _convert_analysis_to_cg3( line )
     return mrf_lines
 
 
+# ==================================================================================
+# ==================================================================================
+#   Caching of the parsed rule files
+# ==================================================================================
+# ==================================================================================
+
+RULES_CACHE_VERSION = 1
+
+# Parsed rules: (name of the loader, absolute path of the rules file) -> (signature, rules)
+_rules_cache      = {}
+_rules_cache_lock = threading.Lock()
+
+
+def default_rules_cache_dir():
+    ''' Returns the directory of the binary (pickled) rules cache files: the 
+        directory given by the environment variable ESTNLTK_CACHE_DIR, or the 
+        directory 'estnltk' in the user's cache directory ($XDG_CACHE_HOME or 
+        ~/.cache);
+    '''
+    return default_cache_dir()
+
+
+def _binary_cache_file( cache_dir, path, loader_name ):
+    ''' Returns the name of the binary cache file of the rules file (given by 
+        its absolute path) loaded with the given loader;
+    '''
+    path_hash = hashlib.sha1( path.encode('utf-8') ).hexdigest()[:16]
+    return os.path.join( cache_dir, '{0}.{1}.{2}.pickle'.format( os.path.basename(path), \
+                                                                  path_hash, loader_name ) )
+
+
+def _file_signature( filename ):
+    ''' Returns the modification time and the size of the file;
+    '''
+    stat = os.stat( filename )
+    return (stat.st_mtime, stat.st_size)
+
+
+def _load_rules_binary( binary_file, loader_name, signature ):
+    ''' Loads rules from a binary (pickled) cache file; Returns None, if the file 
+        does not exist, is unreadable, or does not correspond to the current 
+        version of the rules file;
+    '''
+    if not os.path.exists( binary_file ):
+        return None
+    try:
+        with open( binary_file, 'rb' ) as in_f:
+            data = pickle.load( in_f )
+    except Exception:
+        # a partially written file or a file pickled by an incompatible version
+        return None
+    if not isinstance( data, dict ) or data.get('version') != RULES_CACHE_VERSION or \
+       data.get('loader') != loader_name or data.get('source') != signature:
+        return None
+    return data['rules']
+
+
+def _save_rules_binary( binary_file, loader_name, signature, rules ):
+    ''' Saves rules into a binary (pickled) cache file;
+    '''
+    data = { 'version': RULES_CACHE_VERSION, 'loader': loader_name, \
+             'source': signature, 'rules': rules }
+    # write to a temporary file first, so that concurrent readers never see a partial file
+    tmp_filename = '{0}.{1}.tmp'.format( binary_file, os.getpid() )
+    cache_dir = os.path.dirname( binary_file )
+    if not os.path.isdir( cache_dir ):
+        os.makedirs( cache_dir )
+    with open( tmp_filename, 'wb' ) as out_f:
+        pickle.dump( data, out_f, protocol=2 )
+    if os.name == 'nt' and os.path.exists( binary_file ):
+        os.remove( binary_file )
+    os.rename( tmp_filename, binary_file )
+
+
+def load_cached_rules( load_function, rules_file, binary_cache=False, cache_dir=None ):
+    ''' Loads rules from rules_file using the function load_function (e.g. 
+        load_fs_mrf_to_syntax_mrf_translation_rules() or load_subcat_info()), 
+        and caches the result;
+        
+        The parsed rules are cached in-process, keyed by the path of the rules file
+        and its modification time, so that the rules file is parsed only once, 
+        no matter how many SyntaxPreprocessing (or VISLCG3Parser) instances are 
+        created; If the rules file is modified, it is parsed again;
+        
+        If binary_cache is True, the parsed rules are also cached in a pickled 
+        file in cache_dir (default: default_rules_cache_dir()), named after the 
+        rules file and the loader, so that other processes (e.g. worker processes 
+        of a parallel parsing) can load the rules without parsing; If the 
+        binary file cannot be written, only the in-process cache is used; 
+        (default: False)
+        
+        Note that the returned rules are shared between all the users of the 
+        cache, and should not be modified;
+    '''
+    path        = os.path.abspath( rules_file )
+    loader_name = load_function.__name__
+    signature   = _file_signature( path )
+    key = (loader_name, path)
+    with _rules_cache_lock:
+        cached = _rules_cache.get( key )
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        rules = None
+        if cache_dir is None:
+            cache_dir = default_rules_cache_dir()
+        binary_file = _binary_cache_file( cache_dir, path, loader_name )
+        if binary_cache:
+            rules = _load_rules_binary( binary_file, loader_name, signature )
+        if rules is None:
+            rules = load_function( path )
+            if binary_cache:
+                try:
+                    _save_rules_binary( binary_file, loader_name, signature, rules )
+                except (IOError, OSError):
+                    pass  # unwritable cache directory, the binary file is just an optimization
+        _rules_cache[key] = (signature, rules)
+        return rules
+
+
+def load_compiled_subcat_info( subcat_lex_file ):
+    ''' Loads subcategorization rules via load_subcat_info(), and pre-parses them 
+        via compile_subcat_rules(); Returns a pair (subcat_rules, compiled_subcat_rules);
+    '''
+    subcat_rules = load_subcat_info( subcat_lex_file )
+    return (subcat_rules, compile_subcat_rules( subcat_rules ))
+
+
 # ==================================================================================
 # ==================================================================================
 #   Syntax  preprocessing  pipeline
@@ -892,8 +1135,13 @@ class SyntaxPreprocessing:
     fs_to_synt_rules = None
     subcat_rules     = None
     
+    compiled_subcat_rules  = None
+    compiled_pronoun_rules = None
+    
     allow_to_remove_all = False
     
+    binary_cache = False
+    
     def __init__( self, **kwargs):
         ''' Initializes VISL CG3 based syntax preprocessing pipeline. 
             
@@ -916,6 +1164,12 @@ class SyntaxPreprocessing:
                 in order to avoid words without any analyses;
                 Default: False
             
+            binary_cache : bool
+                Specifies whether the parsed rule files are also cached as pickled files 
+                in the user's cache directory (see load_cached_rules()); The parsed rules 
+                are always cached in-process;
+                Default: False
+            
         '''
         for argName, argVal in kwargs.items():
             if argName in ['fs_to_synt_rules_file', 'fs_to_synt_rules', 'fs_to_synt']:
@@ -924,6 +1178,8 @@ class SyntaxPreprocessing:
                 self.subcat_rules_file = argVal
             elif argName in ['allow_to_remove_all','allow_to_remove'] and argVal in [True,False]:
                 self.allow_to_remove_all = argVal
+            elif argName in ['binary_cache'] and argVal in [True,False]:
+                self.binary_cache = argVal
             else:
                 raise Exception('(!) Unsupported argument given: '+argName)
         #  fs_to_synt_rules_file:
@@ -932,13 +1188,19 @@ class SyntaxPreprocessing:
                             self.fs_to_synt_rules_file)
         else:
             self.fs_to_synt_rules = \
-                load_fs_mrf_to_syntax_mrf_translation_rules( self.fs_to_synt_rules_file )
+                load_cached_rules( load_fs_mrf_to_syntax_mrf_translation_rules, \
+                                   self.fs_to_synt_rules_file, binary_cache=self.binary_cache )
         #  subcat_rules_file:
         if not self.subcat_rules_file or not os.path.exists( self.subcat_rules_file ):
             raise Exception('(!) Unable to find *subcat_rules* from location:', \
                             self.subcat_rules_file)
         else:
-            self.subcat_rules = load_subcat_info( self.subcat_rules_file )
+            self.subcat_rules, self.compiled_subcat_rules = \
+                load_cached_rules( load_compiled_subcat_info, \
+                                   self.subcat_rules_file, binary_cache=self.binary_cache )
+        #  Compile pronoun rules for fast dispatching:
+        self.compiled_pronoun_rules = compile_pronoun_rules( _pronConversions )
+        self._pronoun_cache = {}
 
 
 
@@ -965,17 +1227,47 @@ class SyntaxPreprocessing:
 
             The input should be an analysis of the text in Filosoft's old mrf format;
 
-            Returns the input list, where elements (tokens/analyses) have been converted
-            into the new format;
+            The lines are grouped into tokens (a word line and its analysis lines), 
+            and all the processing steps are applied token by token in a single pass 
+            over the input; the input list itself is not modified;
+
+            Returns a list: lines of analyses in the VISL CG3 input format;
         '''
-        converted1 = convert_mrf_to_syntax_mrf( mrf_lines, self.fs_to_synt_rules )
-        converted2 = convert_pronouns( converted1 )
-        converted3 = remove_duplicate_analyses( converted2, allow_to_delete_all=self.allow_to_remove_all )
-        converted4 = add_hashtag_info( converted3 )
-        converted5 = tag_subcat_info( converted4, self.subcat_rules )
-        converted6 = remove_duplicate_analyses( converted5, allow_to_delete_all=self.allow_to_remove_all )
-        converted7 = convert_to_cg3_input( converted6 )
-        return converted7
+        tokens  = _split_tokens( mrf_lines )
+        last    = len(tokens) - 1
+        results = []
+        cap     = False
+        for i, (word_line, analysis_lines) in enumerate( tokens ):
+            if word_line:
+                cap = (word_line[0]).isupper()
+            # 2) convert_mrf_to_syntax_mrf( ) and 3) convert_pronouns( )
+            converted = []
+            for line in analysis_lines:
+                for new_line in _convert_analysis_to_syntax_mrf( line, self.fs_to_synt_rules ):
+                    if '_P_' in new_line:
+                        new_line = _convert_pronoun( new_line, self.compiled_pronoun_rules, \
+                                                     self._pronoun_cache )
+                    converted.append( new_line )
+            # 4) remove_duplicate_analyses( )
+            #    (as in remove_duplicate_analyses(), the last token is left untouched)
+            if i < last:
+                converted = _remove_duplicate_analyses( converted, \
+                                allow_to_delete_all=self.allow_to_remove_all )
+            # 5) add_hashtag_info( ) and 6) tag_subcat_info( )
+            tagged = []
+            for line in converted:
+                tagged.extend( _tag_subcat_info( _add_hashtag_info( line, cap ), \
+                                                 self.compiled_subcat_rules ) )
+            # 7) remove_duplicate_analyses( )
+            if i < last:
+                tagged = _remove_duplicate_analyses( tagged, \
+                                allow_to_delete_all=self.allow_to_remove_all )
+            # 8) convert_to_cg3_input( )
+            if word_line is not None:
+                results.append( _convert_word_to_cg3( word_line ) )
+            for line in tagged:
+                results.append( _convert_analysis_to_cg3( line ) )
+        return results
 
 
 
@@ -22,6 +22,7 @@ from __future__ import unicode_literals, print_function
 import re, json
 import os, os.path
 import codecs, sys
+from array import array
 
 #from nltk.tokenize.regexp import WhitespaceTokenizer
 from nltk.tokenize.simple import LineTokenizer
@@ -176,116 +177,127 @@ def normalise_alignments( alignments, data_type=VISLCG3_DATA, **kwargs ):
     '''
     if not isinstance( alignments, list ):
         raise Exception('(!) Unexpected type of input argument! Expected a list of strings.')
+    data_type = _get_data_type( data_type )
+    settings  = _get_normalisation_settings( **kwargs )
+    # Iterate over the sentences and normalise information
+    sentStart = 0
+    for i in range(1, len(alignments)+1):
+        if i == len(alignments) or alignments[i][SENT_ID] != alignments[sentStart][SENT_ID]:
+            _normalise_sentence( alignments[sentStart:i], data_type, settings )
+            sentStart = i
+    return alignments
+
+
+def _get_data_type( data_type ):
+    ''' Validates and returns the type of syntactic data: VISLCG3_DATA or CONLL_DATA.
+    '''
     if data_type.lower() == VISLCG3_DATA:
-       data_type = VISLCG3_DATA
+       return VISLCG3_DATA
     elif data_type.lower() == CONLL_DATA:
-       data_type = CONLL_DATA
-    else: 
-       raise Exception('(!) Unexpected type of data: ', data_type)
-    keep_old         = False
-    rep_miss_w_dummy = True
-    mark_root        = False
-    fix_selfrefs     = True
-    fix_out_of_sent  = False
+       return CONLL_DATA
+    raise Exception('(!) Unexpected type of data: ', data_type)
+
+
+def _get_normalisation_settings( **kwargs ):
+    ''' Collects the optional arguments of normalise_alignments() from *kwargs*,
+        and returns as a dict, where missing arguments have default values;
+    '''
+    settings = { 'keep_old': False, 'rep_miss_w_dummy': True, 'mark_root': False, \
+                 'fix_selfrefs': True, 'fix_out_of_sent': False }
     for argName, argVal in kwargs.items():
         if argName in ['selfrefs', 'fix_selfrefs'] and argVal in [True, False]:
            #  Fix self-references
-           fix_selfrefs = argVal
+           settings['fix_selfrefs'] = argVal
         if argName in ['keep_old'] and argVal in [True, False]:
            #  After the normalisation, keep also the original analyses;
-           keep_old = argVal
+           settings['keep_old'] = argVal
         if argName in ['rep_miss_w_dummy', 'rep_miss'] and argVal in [True, False]:
            #  Replace missing analyses with dummy analyses;
-           rep_miss_w_dummy = argVal
+           settings['rep_miss_w_dummy'] = argVal
         if argName in ['mark_root', 'root'] and argVal in [True, False]:
            #  Mark the root node in the syntactic tree with the label ROOT;
-           mark_root = argVal
+           settings['mark_root'] = argVal
         if argName in ['fix_out_of_sent']:
            #  Fix links pointing out of the sentence;
-           fix_out_of_sent = bool(argVal)
-    # Iterate over the alignments and normalise information
-    prev_sent_id = -1
-    wordID       = 0
-    sentStart    = -1
-    for i in range(len(alignments)):
-        alignment = alignments[i]
-        if prev_sent_id != alignment[SENT_ID]:
-            # Detect and fix out-of-the-sentence links in the previous sentence (if required)
-            if fix_out_of_sent and sentStart > -1:
-                _fix_out_of_sentence_links( alignments, sentStart, i )
-            # Start of a new sentence: reset word id
-            wordID = 0
-            sentStart = i
+           settings['fix_out_of_sent'] = bool(argVal)
+    return settings
+
+
+def _extract_relations( analysis_lines, data_type ):
+    ''' Extracts syntactic relations from the analysis lines of a single word.
+        Returns a list of relations [syntactic_label, index_of_the_head], where 
+        the index of the head is zero-based (-1 marks the root);
+    '''
+    foundRelations = []
+    if data_type == VISLCG3_DATA:
+        # *****************  VISLCG3 format
+        for line in analysis_lines:
+            # Extract info from VISLCG3 format analysis:
+            sfuncs  = pat_cg3_surface_rel.findall( line )
+            deprels = pat_cg3_dep_rel.findall( line )
+            # If sfuncs is empty, generate an empty syntactic function (e.g. for 
+            # punctuation)
+            sfuncs = ['xxx'] if not sfuncs else sfuncs
+            # Generate all pairs of labels vs dependency
+            for func in sfuncs:
+                for (relS,relT) in deprels:
+                    foundRelations.append( [func, int(relT)-1] )
+    elif data_type == CONLL_DATA:
+        # *****************  CONLL format
+        for line in analysis_lines:
+            parts = line.split('\t')
+            if len(parts) != 10:
+                raise Exception('(!) Unexpected line format for CONLL data:', line)
+            foundRelations.append( [parts[7], int( parts[6] ) - 1] )
+    return foundRelations
+
+
+def _normalise_sentence( sentence_alignments, data_type, settings ):
+    ''' Normalises dependency syntactic information in the alignments of a single 
+        sentence ( see normalise_alignments() for details ); *settings* should be
+        a dict returned by _get_normalisation_settings();
+        
+        The alignments (dicts) are modified in place;
+    '''
+    sent_len = len( sentence_alignments )
+    for wordID, alignment in enumerate( sentence_alignments ):
         # 1) Extract syntactic information
-        foundRelations = []
-        if data_type == VISLCG3_DATA:
-            # *****************  VISLCG3 format
-            for line in alignment[PARSER_OUT]:
-                # Extract info from VISLCG3 format analysis:
-                sfuncs  = pat_cg3_surface_rel.findall( line )
-                deprels = pat_cg3_dep_rel.findall( line )
-                # If sfuncs is empty, generate an empty syntactic function (e.g. for 
-                # punctuation)
-                sfuncs = ['xxx'] if not sfuncs else sfuncs
-                # Generate all pairs of labels vs dependency
-                for func in sfuncs:
-                    for (relS,relT) in deprels:
-                        relS = int(relS)-1
-                        relT = int(relT)-1
-                        foundRelations.append( [func, relT] )
-        elif data_type == CONLL_DATA:
-            # *****************  CONLL format
-            for line in alignment[PARSER_OUT]:
-                parts = line.split('\t')
-                if len(parts) != 10:
-                    raise Exception('(!) Unexpected line format for CONLL data:', line)
-                relT = int( parts[6] ) - 1
-                func = parts[7]
-                foundRelations.append( [func, relT] )
+        foundRelations = _extract_relations( alignment[PARSER_OUT], data_type )
         # Handle missing relations (VISLCG3 specific problem)
         if not foundRelations:
             # If no alignments were found (probably due to an error in analysis)
-            if rep_miss_w_dummy:
+            if settings['rep_miss_w_dummy']:
                 # Replace missing analysis with a dummy analysis, with dep link 
                 # pointing to self;
                 foundRelations.append( ['xxx', wordID] )
             else:
-                raise Exception('(!) Analysis missing for the word nr.', alignment[0])
+                raise Exception('(!) Analysis missing for the word nr.', wordID)
         # Fix self references ( if requested )
-        if fix_selfrefs:
-            for r in range(len(foundRelations)):
-                if foundRelations[r][1] == wordID:
+        if settings['fix_selfrefs']:
+            for rel in foundRelations:
+                if rel[1] == wordID:
                     # Make it to point to the previous word in the sentence,
                     # and if the previous one does not exist, make it to point
                     # to the next word;
-                    foundRelations[r][1] = \
-                        wordID-1 if wordID-1 > -1 else wordID+1
+                    rel[1] = wordID-1 if wordID-1 > -1 else wordID+1
                     # If the self-linked token is the only token in the sentence, 
                     # mark it as the root of the sentence:
-                    if wordID-1 == -1 and (i+1 == len(alignments) or \
-                       alignments[i][SENT_ID] != alignments[i+1][SENT_ID]):
-                        foundRelations[r][1] = -1
+                    if wordID-1 == -1 and sent_len == 1:
+                        rel[1] = -1
         # Mark the root node in the syntactic tree with the label ROOT ( if requested )
-        if mark_root:
-            for r in range(len(foundRelations)):
-                if foundRelations[r][1] == -1:
-                    foundRelations[r][0] = 'ROOT'
+        if settings['mark_root']:
+            for rel in foundRelations:
+                if rel[1] == -1:
+                    rel[0] = 'ROOT'
         # 2) Replace existing syntactic info with more compact info
-        if not keep_old:
-            # Overwrite old info
-            alignment[PARSER_OUT] = foundRelations
-        else: 
-            # or preserve the initial information, and add new compact information
+        if settings['keep_old']:
+            # preserve the initial information
             alignment[INIT_PARSER_OUT] = alignment[PARSER_OUT]
-            alignment[PARSER_OUT]      = foundRelations
-        alignments[i] = alignment
-        prev_sent_id = alignment[SENT_ID]
-        # Increase word id 
-        wordID += 1
-    # Detect and fix out-of-the-sentence links in the last sentence (if required)
-    if fix_out_of_sent and sentStart > -1:
-        _fix_out_of_sentence_links( alignments, sentStart, len(alignments) )
-    return alignments
+        alignment[PARSER_OUT] = foundRelations
+    # Detect and fix out-of-the-sentence links (if required)
+    if settings['fix_out_of_sent'] and sent_len > 0:
+        _fix_out_of_sentence_links( sentence_alignments, 0, sent_len )
+    return sentence_alignments
 
 
 # ==================================================================================
@@ -396,8 +408,9 @@ def read_text_from_cg3_file( file_name, layer_name=LAYER_VISLCG3, **kwargs ):
     text.tokenize_words()
     
     # 4) Align syntactic analyses with the Text
+    #    (and normalise the syntactic information during the alignment)
+    kwargs['normalise'] = True
     alignments = align_cg3_with_Text( cg3_lines, text, **kwargs )
-    normalise_alignments( alignments, data_type=VISLCG3_DATA, **kwargs )
     # Attach alignments to the text
     text[ layer_name ] = alignments
     return text
@@ -477,8 +490,9 @@ def read_text_from_conll_file( file_name, layer_name=LAYER_CONLL, **kwargs ):
     text.tokenize_words()
     
     # 4) Align syntactic analyses with the Text
+    #    (and normalise the syntactic information during the alignment)
+    kwargs['normalise'] = True
     alignments = align_CONLL_with_Text( conll_lines, text, None, **kwargs )
-    normalise_alignments( alignments, data_type=CONLL_DATA, **kwargs )
     # Attach alignments to the text
     text[ layer_name ] = alignments
     return text
@@ -804,19 +818,7 @@ class Tree(object):
                 graph.root = graph.nodes[address]
             if add_morph and child.morph:
                 # Add morphological information, if possible
-                lemmas  = set([analysis[LEMMA] for analysis in child.morph])
-                postags = set([analysis[POSTAG] for analysis in child.morph])
-                feats   = set([analysis[FORM] for analysis in child.morph])
-                lemma  = ('|'.join( list(lemmas)  )).replace(' ','_')
-                postag = ('|'.join( list(postags) )).replace(' ','_')
-                feats  = ('|'.join( list(feats) )).replace(' ','_')
-                graph.nodes[address].update(
-                {
-                    'tag  ': postag,
-                    'ctag' : postag,
-                    'feats': feats,
-                    'lemma': lemma
-                } )
+                graph.nodes[address].update( _graph_node_morph_info( child.morph ) )
 
         #
         # 2) Update / Add arcs of the graph 
@@ -917,16 +919,12 @@ def build_trees_from_sentence( sentence, syntactic_relations, layer=LAYER_VISLCG
 
 
 
-def build_trees_from_text( text, layer, **kwargs ):
+def _sentences_with_relations( text, layer ):
     ''' Given a text object and the name of the layer where dependency syntactic 
-        relations are stored, builds trees ( estnltk.syntax.utils.Tree objects )
-        from all the sentences of the text and returns as a list of Trees.
-        
-        Uses the method  build_trees_from_sentence()  for acquiring trees of each
-        sentence;
-        
-        Note that there is one-to-many correspondence between EstNLTK's sentences
-        and dependency syntactic trees: one sentence can evoke multiple trees;
+        relations are stored, groups the relations by sentences, and yields tuples
+        (sentence_id, sentence, syntactic_relations), where *sentence* is a list of
+        EstNLTK's word tokens, and *syntactic_relations* the list of corresponding
+        tokens from the syntactic layer;
     '''
     from estnltk.text import Text
     assert isinstance(text, Text), \
@@ -934,7 +932,6 @@ def build_trees_from_text( text, layer, **kwargs ):
     assert layer in text, \
            '(!) The layer '+str(layer)+' is missing from the input text.'
     text_sentences = list( text.divide( layer=WORDS, by=SENTENCES ) )
-    all_sentence_trees = []  # Collected sentence trees
     prev_sent_id       = -1
     #  (!) Note: if the Text object has been split into smaller Texts with split_by(),
     #      SENT_ID-s still refer to old text, and thus are not useful as indices
@@ -944,37 +941,423 @@ def build_trees_from_text( text, layer, **kwargs ):
     #      deciding whether one sentence ends and another begins;
     norm_prev_sent_id  = -1
     current_sentence   = []
-    k = 0
-    while k < len( text[layer] ):
-        node_desc = text[layer][k]
+    for node_desc in text[layer]:
         if prev_sent_id != node_desc[SENT_ID] and current_sentence:
             norm_prev_sent_id += 1
             # If the index of the sentence has changed, and we have collected a sentence, 
-            # then build tree(s) from this sentence
+            # then yield the sentence
             assert norm_prev_sent_id<len(text_sentences), '(!) Sentence with the index '+str(norm_prev_sent_id)+\
                                                           ' not found from the input text.'
-            sentence = text_sentences[norm_prev_sent_id]
-            trees_of_sentence = \
-                build_trees_from_sentence( sentence, current_sentence, layer, sentence_id=norm_prev_sent_id, \
-                                           **kwargs )
-            # Record trees constructed from this sentence
-            all_sentence_trees.extend( trees_of_sentence )
+            yield norm_prev_sent_id, text_sentences[norm_prev_sent_id], current_sentence
             # Reset the sentence collector
             current_sentence = []
         # Collect sentence
         current_sentence.append( node_desc )
         prev_sent_id = node_desc[SENT_ID]
-        k += 1
     if current_sentence:
         norm_prev_sent_id += 1
         assert norm_prev_sent_id<len(text_sentences), '(!) Sentence with the index '+str(norm_prev_sent_id)+\
                                                       ' not found from the input text.'
-        sentence = text_sentences[norm_prev_sent_id]
-        # If we have collected a sentence, then build tree(s) from this sentence
+        yield norm_prev_sent_id, text_sentences[norm_prev_sent_id], current_sentence
+
+
+
+def build_trees_from_text( text, layer, **kwargs ):
+    ''' Given a text object and the name of the layer where dependency syntactic 
+        relations are stored, builds trees ( estnltk.syntax.utils.Tree objects )
+        from all the sentences of the text and returns as a list of Trees.
+        
+        Uses the method  build_trees_from_sentence()  for acquiring trees of each
+        sentence;
+        
+        Note that there is one-to-many correspondence between EstNLTK's sentences
+        and dependency syntactic trees: one sentence can evoke multiple trees;
+    '''
+    all_sentence_trees = []  # Collected sentence trees
+    for sent_id, sentence, syntactic_relations in _sentences_with_relations( text, layer ):
+        # Build tree(s) from this sentence
         trees_of_sentence = \
-            build_trees_from_sentence( sentence, current_sentence, layer, sentence_id=norm_prev_sent_id, \
+            build_trees_from_sentence( sentence, syntactic_relations, layer, sentence_id=sent_id, \
                                        **kwargs )
         # Record trees constructed from this sentence
         all_sentence_trees.extend( trees_of_sentence )
     return all_sentence_trees
 
+
+
+# ==================================================================================
+# ==================================================================================
+#   Array-based representation of the syntactic trees of a sentence
+# ==================================================================================
+# ==================================================================================
+
+# Typecode of the integer arrays (array() requires native str in Py 2)
+_INT_TYPECODE = str('i')
+
+def _graph_node_morph_info( morph ):
+    ''' Converts the morphological analyses of a word into the fields of 
+        a DependencyGraph's node. '''
+    lemmas  = set([analysis[LEMMA] for analysis in morph])
+    postags = set([analysis[POSTAG] for analysis in morph])
+    feats   = set([analysis[FORM] for analysis in morph])
+    lemma  = ('|'.join( list(lemmas)  )).replace(' ','_')
+    postag = ('|'.join( list(postags) )).replace(' ','_')
+    feats  = ('|'.join( list(feats) )).replace(' ','_')
+    return { 'tag  ': postag, 'ctag' : postag, 'feats': feats, 'lemma': lemma }
+
+
+class DependencyTree(object):
+    ''' A compact representation of all the dependency syntactic trees of 
+        a single sentence. 
+        
+        Unlike Tree, which links a Python object for each word, DependencyTree 
+        stores the structure of the sentence in flat arrays indexed by word_id-s:
+        
+          parents  -- index of the parent of each word (-1 for roots);
+          depths   -- depth of each word (0 for roots);
+          heights  -- depth of the subtree of each word (0 for leaves);
+          labels   -- syntactic functions (list of str) of each word;
+        
+        Children of the words are stored in the compressed sparse row (CSR) 
+        format: children of the word i are
+            children[ child_offsets[i] : child_offsets[i+1] ]
+        (in the ascending order of word_id-s). Additionally, the words are 
+        listed in the depth-first pre-order in *preorder*, so that the word i
+        and all of its descendants form a contiguous slice
+            preorder[ preorder_index[i] : preorder_index[i]+subtree_sizes[i] ]
+        and the first and the last word_id of the subtree (*span_starts* and
+        *span_ends*) are precomputed. 
+        Thus, most of the queries (children, descendants, depths, subtree 
+        spans) do not require walking the trees recursively.
+        
+        Words that are headed by -1, by themselves or by a word outside the 
+        sentence are considered as roots. Words that cannot be reached from 
+        any of the roots (in case of cyclic relations) have depth -1 and do 
+        not belong to any of the trees;
+    '''
+    sent_id       = None  # -> int    # index of the sentence
+    parser        = None  # -> str    # used parser: 'maltparser' or 'vislcg3'
+    tokens        = None  # -> [dict] # EstNLTK tokens of the words of the sentence
+    syntax_tokens = None  # -> [dict] # tokens of the syntactic layer (if provided)
+
+    def __init__( self, heads, labels=None, tokens=None, sent_id=0, parser=None, **kwargs ):
+        ''' Creates a new tree of a sentence, where the i-th word is headed by
+            the word *heads[i]* and bears syntactic functions *labels[i]*. 
+            Optionally, EstNLTK's word *tokens* of the sentence can be provided 
+            for morphological queries and for exporting to NLTK.
+        '''
+        n = len(heads)
+        if labels is not None:
+            assert len(labels) == n, \
+                   '(!) Unexpected number of labels: '+str(len(labels))+'. Should be '+str(n)+'.'
+        if tokens is not None:
+            assert len(tokens) == n, \
+                   '(!) Unexpected number of tokens: '+str(len(tokens))+'. Should be '+str(n)+'.'
+        self.sent_id = sent_id
+        self.parser  = parser
+        self.tokens  = tokens
+        self.labels  = [ list(l) if l else [] for l in labels ] if labels is not None else [ [] for i in range(n) ]
+        for argName, argVal in kwargs.items():
+            if argName in ['syntax_tokens']:
+                assert isinstance(argVal, list) and len(argVal) == n, \
+                       '(!) Unexpected type of argument for '+argName+'! Should be list of dict.'
+                self.syntax_tokens = argVal
+        self._postags = None
+        #  1) Parents ( self links and links outside the sentence make roots )
+        parents = array(_INT_TYPECODE, [ h if h != i and -1 < h < n else -1 for i, h in enumerate(heads) ])
+        #  2) Children in the CSR format
+        offsets = array(_INT_TYPECODE, [0] * (n + 1))
+        for h in parents:
+            if h > -1:
+                offsets[h + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        children = array(_INT_TYPECODE, [0] * offsets[n])
+        free = offsets[:n]
+        for i, h in enumerate(parents):
+            if h > -1:
+                children[free[h]] = i
+                free[h] += 1
+        self.parents       = parents
+        self.child_offsets = offsets
+        self.children      = children
+        self.roots         = [ i for i in range(n) if parents[i] == -1 ]
+        #  3) Depth-first pre-order and depths of the words
+        depths         = array(_INT_TYPECODE, [-1] * n)
+        preorder       = array(_INT_TYPECODE)
+        preorder_index = array(_INT_TYPECODE, [-1] * n)
+        stack = list( reversed(self.roots) )
+        while stack:
+            i = stack.pop()
+            preorder_index[i] = len(preorder)
+            preorder.append(i)
+            depths[i] = 0 if parents[i] == -1 else depths[parents[i]] + 1
+            stack.extend( reversed(children[offsets[i]:offsets[i + 1]]) )
+        #  4) Subtree sizes, spans and heights ( bottom-up, in the reverse pre-order )
+        subtree_sizes = array(_INT_TYPECODE, [0] * n)
+        heights       = array(_INT_TYPECODE, [0] * n)
+        span_starts   = array(_INT_TYPECODE, range(n))
+        span_ends     = array(_INT_TYPECODE, range(n))
+        for i in reversed(preorder):
+            subtree_sizes[i] += 1
+            h = parents[i]
+            if h > -1:
+                subtree_sizes[h] += subtree_sizes[i]
+                if heights[i] + 1 > heights[h]:
+                    heights[h] = heights[i] + 1
+                if span_starts[i] < span_starts[h]:
+                    span_starts[h] = span_starts[i]
+                if span_ends[i] > span_ends[h]:
+                    span_ends[h] = span_ends[i]
+        self.depths         = depths
+        self.heights        = heights
+        self.preorder       = preorder
+        self.preorder_index = preorder_index
+        self.subtree_sizes  = subtree_sizes
+        self.span_starts    = span_starts
+        self.span_ends      = span_ends
+
+
+    def __len__( self ):
+        return len(self.parents)
+
+
+    def get_parent( self, word_id ):
+        ''' Returns word_id of the parent of the given word, or -1, if the word is a root. '''
+        return self.parents[word_id]
+
+
+    def get_root( self, word_id ):
+        ''' Returns word_id of the root of the tree that the given word belongs to, 
+            or -1, if the word does not belong to any tree. '''
+        if self.depths[word_id] < 0:
+            return -1
+        while self.parents[word_id] > -1:
+            word_id = self.parents[word_id]
+        return word_id
+
+
+    def get_ancestors( self, word_id ):
+        ''' Returns word_id-s of the ancestors of the given word, starting from 
+            its parent and ending with the root of the tree. '''
+        ancestors = []
+        if self.depths[word_id] > -1:
+            word_id = self.parents[word_id]
+            while word_id > -1:
+                ancestors.append( word_id )
+                word_id = self.parents[word_id]
+        return ancestors
+
+
+    def get_depth( self, word_id ):
+        ''' Returns the depth of the given word (0, if the word is a root). '''
+        return self.depths[word_id]
+
+
+    def get_tree_depth( self, word_id ):
+        ''' Returns the depth of the subtree of the given word (as in Tree.get_tree_depth()). '''
+        return self.heights[word_id]
+
+
+    def get_subtree_span( self, word_id ):
+        ''' Returns word_id-s of the first and the last word of the subtree of 
+            the given word, as a tuple (start, end). Note that the subtree covers 
+            all the words of the span only if the subtree is projective. '''
+        return ( self.span_starts[word_id], self.span_ends[word_id] )
+
+
+    def get_subtree( self, word_id ):
+        ''' Returns word_id-s of the given word and all of its descendants, in 
+            the depth-first pre-order. '''
+        start = self.preorder_index[word_id]
+        if start < 0:
+            return [ word_id ]
+        return list( self.preorder[start:start + self.subtree_sizes[word_id]] )
+
+
+    def get_direct_children( self, word_id ):
+        ''' Returns word_id-s of the direct children of the given word. '''
+        return list( self.children[self.child_offsets[word_id]:self.child_offsets[word_id + 1]] )
+
+
+    def _get_postags( self ):
+        if self._postags is None:
+            self._postags = [ set( [a[POSTAG] for a in token[ANALYSIS]] ) if ANALYSIS in token else set() \
+                              for token in self.tokens ] if self.tokens is not None else None
+        return self._postags
+
+
+    def _filter( self, word_ids, **kwargs ):
+        ''' Filters the given word_id-s by the conditions given in *kwargs*
+            (see get_children() for the supported conditions).
+        '''
+        syntactic_label = kwargs.get('label', None)
+        if syntactic_label:
+            labels = self.labels
+            word_ids = [ i for i in word_ids if syntactic_label in labels[i] ]
+        synt_label_regexp = kwargs.get('label_regexp', None)
+        if synt_label_regexp:
+            if isinstance(synt_label_regexp, basestring):
+                synt_label_regexp = re.compile(synt_label_regexp)
+            labels = self.labels
+            word_ids = [ i for i in word_ids if any([synt_label_regexp.match(label) != None for label in labels[i]]) ]
+        postag = kwargs.get('postag', None)
+        if postag:
+            postags = self._get_postags()
+            if postags is None:
+                raise Exception('(!) Tokens of the sentence are required for matching postags.')
+            postag = set([postag]) if isinstance(postag, basestring) else set(postag)
+            word_ids = [ i for i in word_ids if not postag.isdisjoint(postags[i]) ]
+        word_template = kwargs.get('word_template', None)
+        if word_template:
+            if not isinstance(word_template, WordTemplate):
+                raise Exception('(!) Unexpected word_template. Should be from class WordTemplate.')
+            if self.tokens is None:
+                raise Exception('(!) Tokens of the sentence are required for matching word templates.')
+            word_ids = [ i for i in word_ids if word_template.matches( self.tokens[i] ) ]
+        return word_ids
+
+
+    def get_children( self, word_id, **kwargs ):
+        ''' Collects and returns word_id-s of all the descendants of the given 
+            word (if no arguments are given), or, alternatively, descendants 
+            satisfying some specific criteria (pre-specified in the arguments);
+            The word_id-s are returned in the ascending order.
+            
+            Parameters
+            -----------
+            depth_limit : int
+                Specifies how deep into the subtree of the word the search goes;
+                depth_limit=1 -- only direct children of the word are considered;
+                Default: unbounded ( the search is not limited by depth )
+            
+            include_self : bool 
+                Specifies whether the word itself should also be included (if it
+                satisfies all the criteria);
+                Default: False
+            
+            Following parameters can be used to set conditions for the words:
+            -----------------------------------------------------------------
+            label : str
+                Syntactic label (e.g. '@SUBJ', '@OBJ' etc.) that the word must
+                have within its analysis;
+            
+            label_regexp : str
+                A regular expression pattern (as string or compiled) describing
+                the syntactic label that the word must have within its analysis;
+            
+            postag : str or list of str
+                Part-of-speech tag(s); the word must have at least one of the tags 
+                in its morphological analysis (requires tokens);
+            
+            word_template : estnltk.mw_verbs.utils.WordTemplate
+                A WordTemplate describing morphological constraints imposed to 
+                the word (requires tokens);
+        '''
+        depth_limit  = kwargs.get('depth_limit', None)
+        include_self = kwargs.get('include_self', False)
+        start = self.preorder_index[word_id]
+        if start < 0:
+            word_ids = [ word_id ] if include_self else []
+        elif depth_limit == 1:
+            word_ids = ( [ word_id ] if include_self else [] ) + self.get_direct_children( word_id )
+        else:
+            end = start + self.subtree_sizes[word_id]
+            word_ids = self.preorder[start if include_self else start + 1:end]
+            if depth_limit is not None:
+                max_depth = self.depths[word_id] + depth_limit
+                depths = self.depths
+                word_ids = [ i for i in word_ids if depths[i] <= max_depth ]
+        return sorted( self._filter( word_ids, **kwargs ) )
+
+
+    def find_words( self, **kwargs ):
+        ''' Returns word_id-s of all the words of the sentence satisfying the 
+            conditions given in *kwargs* (label, label_regexp, postag, 
+            word_template; see get_children() for details). '''
+        return self._filter( range(len(self.parents)), **kwargs )
+
+
+    def as_dependencygraph( self, root_id, keep_dummy_root=False, add_morph=True ):
+        ''' Returns the tree rooted at the word *root_id* as NLTK's DependencyGraph 
+            object. The resulting graph is the same as the one returned by
+            Tree.as_dependencygraph() (see its documentation for the parameters);
+        '''
+        from nltk.parse.dependencygraph import DependencyGraph
+        assert self.tokens is not None, \
+               '(!) Tokens of the sentence are required for building DependencyGraph.'
+        graph = DependencyGraph( zero_based = True )
+        all_tree_nodes = self.get_subtree( root_id )
+        if keep_dummy_root:
+            graph.nodes[-1] = graph.nodes[0]
+            graph.nodes[-1].update( { 'address': -1 } )
+            graph.root = graph.nodes[-1]
+        del graph.nodes[0]
+        for i in all_tree_nodes:
+            labels = self.labels[i]
+            graph.nodes[i].update(
+            {
+                'address': i,
+                'word':  self.tokens[i][TEXT],
+                'rel':   'xxx' if not labels else '|'.join(labels),
+            } )
+            if not keep_dummy_root and i == root_id:
+                graph.root = graph.nodes[i]
+            if add_morph and self.tokens[i].get(ANALYSIS):
+                graph.nodes[i].update( _graph_node_morph_info( self.tokens[i][ANALYSIS] ) )
+        for i in all_tree_nodes:
+            for dep in self.children[self.child_offsets[i]:self.child_offsets[i + 1]]:
+                graph.add_arc( i, dep )
+            head = -1 if i == root_id else self.parents[i]
+            if head == -1 and keep_dummy_root:
+                graph.add_arc( -1, i )
+            graph.nodes[i].update( { 'head': head } )
+        return graph
+
+
+    def as_dependencygraphs( self, **kwargs ):
+        ''' Returns all the trees of the sentence as a list of NLTK's DependencyGraph 
+            objects (one graph per each root). Arguments are passed to the method 
+            as_dependencygraph(). '''
+        return [ self.as_dependencygraph( root_id, **kwargs ) for root_id in self.roots ]
+
+
+    def as_nltk_tree( self, root_id ):
+        ''' Returns the tree rooted at the word *root_id* as NLTK's Tree object. '''
+        return self.as_dependencygraph( root_id ).tree()
+
+
+def build_dependency_tree_from_sentence( sentence, syntactic_relations, layer=LAYER_VISLCG3, \
+                                         sentence_id=0 ):
+    ''' Given a sentence ( a list of EstNLTK's word tokens ), and a list of 
+        dependency syntactic relations ( output of normalise_alignments() ),
+        builds and returns an array-based DependencyTree of the sentence.
+        
+        As in build_trees_from_sentence(), if a word has more than one parent,
+        the first parent is used;
+    '''
+    heads  = [ syntax_token[PARSER_OUT][0][1] for syntax_token in syntactic_relations ]
+    labels = [ [ o[0] for o in syntax_token[PARSER_OUT] ] for syntax_token in syntactic_relations ]
+    return DependencyTree( heads, labels, tokens=sentence, sent_id=sentence_id, parser=layer, \
+                           syntax_tokens=syntactic_relations )
+
+
+def build_dependency_trees_from_text( text, layer ):
+    ''' Given a text object and the name of the layer where dependency syntactic 
+        relations are stored, builds DependencyTree-s of all the sentences of 
+        the text, and returns as a list (one DependencyTree per sentence).
+    '''
+    return [ build_dependency_tree_from_sentence( sentence, syntactic_relations, layer, \
+                                                  sentence_id=sent_id ) \
+             for sent_id, sentence, syntactic_relations in _sentences_with_relations( text, layer ) ]
+
+
+def dependency_graphs_from_text( text, layer, **kwargs ):
+    ''' Given a text object and the name of the layer where dependency syntactic 
+        relations are stored, exports all the trees of the text as a list of 
+        NLTK's DependencyGraph objects. Arguments are passed to the method 
+        DependencyTree.as_dependencygraph(). '''
+    graphs = []
+    for tree in build_dependency_trees_from_text( text, layer ):
+        graphs.extend( tree.as_dependencygraphs( **kwargs ) )
+    return graphs
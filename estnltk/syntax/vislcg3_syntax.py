@@ -58,6 +58,7 @@ from __future__ import unicode_literals, print_function
 
 from estnltk.names import *
 from estnltk.core import PACKAGE_PATH, as_unicode
+from estnltk.instrumentation import record_roundtrip
 
 import re
 import os, os.path, sys
@@ -289,6 +290,7 @@ class VISLCG3Pipeline:
 
         # 4) Communicate results form the last item in the pipeline
         result = as_unicode( pipeline[-1]['process'].communicate()[0] )
+        record_roundtrip('VISLCG3Pipeline', count=len(pipeline))
         pipeline[-1]['process'].stdout.close() # Close the last process
 
         # Clean-up
@@ -450,6 +452,16 @@ def align_cg3_with_Text( lines, text, **kwargs ):
             * 'text_word_id' - current word index in the whole Text, starting from 0;
             * 'sent_word_id' - index of the current word in the sentence, starting from 0;
             Default:False
+        
+        normalise : bool
+            Optional argument specifying whether the syntactic information should be
+            normalised into the compact format of labelled dependency relations (as in 
+            the output of utils.normalise_alignments()) during the alignment: each 
+            sentence is normalised right after its words have been aligned, so that no 
+            separate pass over the alignments is required;
+            If True, the optional arguments of utils.normalise_alignments() (e.g. 
+            "fix_selfrefs", "keep_old", "mark_root") can also be passed;
+            Default:False
 
 
         Example output (for text 'Jah . Öö oli täiesti tuuletu .'):
@@ -470,11 +482,17 @@ def align_cg3_with_Text( lines, text, **kwargs ):
         raise Exception('(!) Unexpected type of input argument! Expected a list of strings.')
     check_tokens = False
     add_word_ids = False
+    normalise    = False
     for argName, argVal in kwargs.items() :
         if argName in ['check_tokens', 'check'] and argVal in [True, False]:
            check_tokens = argVal
         if argName in ['add_word_ids', 'word_ids'] and argVal in [True, False]:
            add_word_ids = argVal
+        if argName in ['normalise', 'normalize'] and argVal in [True, False]:
+           normalise = argVal
+    if normalise:
+        from estnltk.syntax.utils import _get_normalisation_settings, _normalise_sentence
+        normalisation_settings = _get_normalisation_settings( **kwargs )
     pat_empty_line     = re.compile('^\s+$')
     pat_token_line     = re.compile('^"<(.+)>"$')
     pat_analysis_start = re.compile('^(\s+)"(.+)"(\s[LZTS].*)$')
@@ -487,6 +505,7 @@ def align_cg3_with_Text( lines, text, **kwargs ):
     results = []
     for sentence in text.divide( layer=WORDS, by=SENTENCES ):
         sentWID = 0
+        sentence_results = []
         for i in range(len(sentence)):
             # 1) take the next word in Text
             wordJson = sentence[i]
@@ -524,7 +543,7 @@ def align_cg3_with_Text( lines, text, **kwargs ):
                 if add_word_ids:
                     result_dict['text_word_id'] = generalWID # word id in the text
                     result_dict['sent_word_id'] = sentWID    # word id in the sentence
-                results.append( result_dict )
+                sentence_results.append( result_dict )
             else:
                 if j >= len(lines):
                     print('(!) End of VISLCG3 analysis reached: '+str(j)+' '+str(len(lines)),\
@@ -533,6 +552,9 @@ def align_cg3_with_Text( lines, text, **kwargs ):
                                  'for EstNLTK\'s token nr ', generalWID, ':', wordStr)
             sentWID    += 1
             generalWID += 1
+        if normalise:
+            _normalise_sentence( sentence_results, VISLCG3_DATA, normalisation_settings )
+        results.extend( sentence_results )
         sentenceID += 1
     return results
 
@@ -1,12 +1,76 @@
+from bisect import bisect_left
+from collections import defaultdict, OrderedDict
 from copy import copy
 
 from estnltk import Text
+from estnltk.grammar import compile_grammar
 
 from .adverbs import NOT_ADJ_MODIFIERS, CLASSES, WEIGHTS
 from .grammars import adjective_phrases, part_phrase
 from .measurement_adjectives import is_measurement_adjective
 
 
+# The maximum number of words, the results of which are cached by each memoized function
+MEMOIZE_MAXSIZE = 10000
+
+
+def memoize(maxsize=MEMOIZE_MAXSIZE):
+    """Cache the results of a function of a single word.
+    The words are analysed separately, so the results are the same for all documents.
+    At most maxsize results are kept; if the limit is reached, the least recently used
+    results are dropped."""
+    def decorator(function):
+        cache = OrderedDict()
+
+        def wrapper(word):
+            if word in cache:
+                result = cache.pop(word)
+            else:
+                result = function(word)
+            cache[word] = result
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+            return result
+        return wrapper
+    return decorator
+
+
+@memoize()
+def is_comparative(lemma):
+    return 'C' in Text(lemma).postags
+
+
+@memoize()
+def word_forms(word):
+    return Text(word).forms
+
+
+is_measurement_adjective = memoize()(is_measurement_adjective)
+
+
+class WordIndex:
+    """Positions of the words and verb chain tokens of a document."""
+
+    def __init__(self, doc):
+        self.starts = {}
+        self.ends = {}
+        for ind, word in enumerate(doc['words']):
+            self.starts.setdefault(word['start'], ind)
+            self.ends.setdefault(word['end'], ind)
+        self.verb_starts = None
+        self.verb_ends = None
+
+    def add_verb_chains(self, verb_chains):
+        self.verb_starts = sorted(start for verb_ph in verb_chains for start in verb_ph['start'])
+        self.verb_ends = sorted(end for verb_ph in verb_chains for end in verb_ph['end'])
+
+
+def contains_position(positions, start, end):
+    """Does the sorted list contain a position between start and end (inclusive)?"""
+    idx = bisect_left(positions, start)
+    return idx < len(positions) and positions[idx] <= end
+
+
 class AdjectivePhraseTagger:
     def __init__(self, return_layer=False, layer_name='adjective_phrases'):
         """
@@ -14,32 +78,27 @@ class AdjectivePhraseTagger:
         Parameters
         ----------
         return_layer_only - do not annotate the text object, return just the resulting layer
-        layer_name - the name of the layer. Does nothing when return_layer_only is set
+        layer_name - the name of the layer
         """
         self.layer_name = layer_name
         self.return_layer = return_layer
+        self.adjective_phrases = compile_grammar(adjective_phrases)
+        self.adjective_phrases.name = layer_name
+        self.part_phrase = compile_grammar(part_phrase)
+        self.stats = defaultdict(int)
 
 
-    def __extract_lemmas(self, doc, m, phrase):
+    def __extract_lemmas(self, doc, index, m, phrase):
         """
         :param sent: sentence from which the match was found
+        :param index: WordIndex of the sentence
         :param m: the found match
         :phrase: name of the phrase
         :return: tuple of the lemmas in the match
         """
 
-        ph_start = m['start']
-        ph_end = m['end']
-        start_index = None
-        for ind, word in enumerate(doc['words']):
-            if word['start'] == ph_start:
-                start_index = ind
-                break
-        end_index = None
-        for ind, word in enumerate(doc['words']):
-            if word['end'] == ph_end:
-                end_index = ind
-                break
+        start_index = index.starts.get(m['start'])
+        end_index = index.ends.get(m['end'])
         if start_index is not None and end_index is not None:
             
             lem = []
@@ -60,16 +119,15 @@ class AdjectivePhraseTagger:
 
 
     # Tags (normal) adjective phrases and comparative phrases in text, adds lemmas and type (adjective or comparative)
-    def __tag_adj_phrases(self, text):
-        adjective_phrases.name = self.layer_name
-        adjective_phrases.annotate(text)
+    def __tag_adj_phrases(self, text, index):
+        self.adjective_phrases.annotate(text)
         if self.layer_name in text:
             for idx, adj_ph in enumerate(text[self.layer_name]):
-                phrase_lemmas = self.__extract_lemmas(text, text[self.layer_name][idx], self.layer_name)
+                phrase_lemmas = self.__extract_lemmas(text, index, text[self.layer_name][idx], self.layer_name)
                 #adj_ph['lemmas'] = Text(adj_ph['text'], disambiguate=False).lemmas
                 adj_ph['lemmas'] = phrase_lemmas
                 
-                if 'C' in Text(adj_ph['lemmas'][-1]).postags:
+                if is_comparative(adj_ph['lemmas'][-1]):
                     adj_ph['type'] = 'comparative'
                 else:
                     adj_ph['type'] = 'adjective'
@@ -92,8 +150,8 @@ class AdjectivePhraseTagger:
 
     def __is_ja_phrase(self, phrase):
         phrase = phrase.split()
-        adj_1_forms = Text(phrase[1]).forms
-        adj_2_forms = Text(phrase[3]).forms
+        adj_1_forms = word_forms(phrase[1])
+        adj_2_forms = word_forms(phrase[3])
         for form in adj_1_forms:
             for form2 in adj_2_forms:
                 if form == form2:
@@ -102,7 +160,9 @@ class AdjectivePhraseTagger:
 
 
     # Checks whether the adverb-adjective sequence tagged as participle phrase can actually be one
-    def __is_participle_phrase(self, lemmas):
+    @staticmethod
+    @memoize()
+    def __is_participle_phrase(lemmas):
         # If the last element of the lemma gets the verb POS tag and ends with v/tav/nud/tud, the word is a participle
         for lemma in lemmas.split('|'):
             last_token = Text(lemma, disambiguate=False).roots[0].split('_')[-1]
@@ -113,12 +173,19 @@ class AdjectivePhraseTagger:
 
 
     # Tags participle phrases, adds lemmas and type (participle)
-    def __tag_participle_phrases(self, text):
-        part_phrase.annotate(text)
+    def __tag_participle_phrases(self, text, index):
+        self.part_phrase.annotate(text)
         if 'participle_phrases' in text:
+            # positions of the adjective phrases by their start and end positions
+            phrase_starts = defaultdict(list)
+            phrase_ends = defaultdict(list)
+            if self.layer_name in text:
+                for idx, adj_ph in enumerate(text[self.layer_name]):
+                    phrase_starts[adj_ph['start']].append(idx)
+                    phrase_ends[adj_ph['end']].append(idx)
             for idx, part_ph in enumerate(text['participle_phrases']):
                 #part_ph['lemmas'] = Text(part_ph['text'], disambiguate=False).lemmas
-                phrase_lemmas = self.__extract_lemmas(text, text['participle_phrases'][idx], 'participle_phrases')
+                phrase_lemmas = self.__extract_lemmas(text, index, text['participle_phrases'][idx], 'participle_phrases')
                 part_ph['lemmas'] = phrase_lemmas
                 if self.__is_participle_phrase(part_ph['lemmas'][1]):
                     part_ph['type'] = 'participle'
@@ -133,44 +200,35 @@ class AdjectivePhraseTagger:
                                 part_ph['adverb_class'] = 'unknown'  
                         
                         if self.layer_name in text:
-                            for idx, adj_ph in enumerate(text[self.layer_name]):
-                                # If participle phrase was also (partially) tagged as a usual adjective phrase, the latter is removed
-                                if adj_ph['end'] == part_ph['end'] or adj_ph['start'] == part_ph['start']:
-                                    text[self.layer_name][idx]['to_delete'] = True
-                                  
-                                    
-                            # Participle phrases included into adjective_phraes layer
-                            text[self.layer_name].append(part_ph)
+                            # If participle phrase was also (partially) tagged as a usual adjective phrase, the latter is removed
+                            for idx in phrase_ends[part_ph['end']] + phrase_starts[part_ph['start']]:
+                                text[self.layer_name][idx]['to_delete'] = True
                         else:
                             text[self.layer_name] = []
-                            text[self.layer_name].append(part_ph)
+                        # Participle phrases included into adjective_phraes layer
+                        phrase_starts[part_ph['start']].append(len(text[self.layer_name]))
+                        phrase_ends[part_ph['end']].append(len(text[self.layer_name]))
+                        text[self.layer_name].append(part_ph)
             del text['participle_phrases']
         return text
 
 
     # Removes tagged phrases starting with "nii" and followed by "kui" ("nii juriidilised kui majanduslikud põhjused...")
-    def __remove_nii_kui_phrase(self, sent):
+    def __remove_nii_kui_phrase(self, sent, index):
         for idx, adj_ph in enumerate(sent[self.layer_name]):
             if adj_ph['lemmas'][0] == 'nii':
-                for i in sent['words']:
-                    if i['start'] == adj_ph['end'] + 1:
-                        if (i['analysis'][0]['lemma'] == 'kui' or i['analysis'][0]['partofspeech'] == 'A'):
-                            sent[self.layer_name][idx]['to_delete'] = True
+                word_index = index.starts.get(adj_ph['end'] + 1)
+                if word_index is not None:
+                    i = sent['words'][word_index]
+                    if (i['analysis'][0]['lemma'] == 'kui' or i['analysis'][0]['partofspeech'] == 'A'):
+                        sent[self.layer_name][idx]['to_delete'] = True
         return sent
 
 
     # Finds if tagged phrase intersects with verb chains - in case of participles,
     # this mostly means that the tagged phrase is not an actual adjective phrase
-    def __adj_verb_intersections(self, start, end, sent):
-        sent.verb_chains
-        for verb_ph in sent['verb_chains']:
-            for start_v, end_v in zip(verb_ph['start'], verb_ph['end']):
-                if end_v <= end and end_v >= start:
-                    return True
-                elif start_v >= start and start_v <= end:
-                    return True
-        else:
-            return False
+    def __adj_verb_intersections(self, start, end, index):
+        return contains_position(index.verb_ends, start, end) or contains_position(index.verb_starts, start, end)
             
 
     # Deletes phrases marked as 'to_delete'
@@ -185,38 +243,71 @@ class AdjectivePhraseTagger:
         return text
 
 
+    def __update_stats(self, text):
+        self.stats['documents'] += 1
+        self.stats['words'] += len(text['words'])
+        for ph in (text[self.layer_name] if self.layer_name in text else []):
+            self.stats['phrases'] += 1
+            self.stats[ph['type']] += 1
+            if ph['measurement_adj']:
+                self.stats['measurement_adj'] += 1
+            if ph['intersects_with_verb']:
+                self.stats['intersects_with_verb'] += 1
+
+
     ###################################
     def tag(self, text):
         if self.return_layer:
-            t2 = copy(text)
-            a2 = AdjectivePhraseTagger()
-            a2.tag(t2)
-            
+            t2 = self.__tag(copy(text))
             try:
-                return t2[a2.layer_name]
+                return t2[self.layer_name]
             except KeyError:
-                return []  
-            
+                return []
         else:
+            return self.__tag(text)
+
+    def __tag(self, text):
+        if self.layer_name in text:
+            return text
+
+        else:
+            if not text.is_tagged('analysis'):
+                text.tag_analysis()
+            index = WordIndex(text)
+            text = self.__tag_adj_phrases(text, index)
+            text = self.__tag_participle_phrases(text, index)
             if self.layer_name in text:
-                return text
+                index.add_verb_chains(text.verb_chains)
+                for idx, adj_ph in enumerate(text[self.layer_name]):
+                    adj_ph = (dict(adj_ph))
+                    # Finds whether the adjective is a measurement adjective
+                    if is_measurement_adjective(adj_ph['lemmas'][-1]) == True:
+                        text[self.layer_name][idx]['measurement_adj'] = True
+                    else:
+                        text[self.layer_name][idx]['measurement_adj'] = False
 
-            else:
-                text = self.__tag_adj_phrases(text)
-                text = self.__tag_participle_phrases(text)
-                if self.layer_name in text:
-                    for idx, adj_ph in enumerate(text[self.layer_name]):
-                        adj_ph = (dict(adj_ph))
-                        # Finds whether the adjective is a measurement adjective
-                        if is_measurement_adjective(adj_ph['lemmas'][-1]) == True:
-                            text[self.layer_name][idx]['measurement_adj'] = True
-                        else:
-                            text[self.layer_name][idx]['measurement_adj'] = False
+                    if self.__adj_verb_intersections(adj_ph['start'], adj_ph['end'], index) == True:
+                        text[self.layer_name][idx]['intersects_with_verb'] = True
+                    else:
+                        text[self.layer_name][idx]['intersects_with_verb'] = False
+                text = self.__remove_nii_kui_phrase(text, index)
+                text = self.__delete_wrong_phrases(text)
+            self.__update_stats(text)
+            return text
 
-                        if self.__adj_verb_intersections(adj_ph['start'], adj_ph['end'], text) == True:
-                            text[self.layer_name][idx]['intersects_with_verb'] = True
-                        else:
-                            text[self.layer_name][idx]['intersects_with_verb'] = False
-                    text = self.__remove_nii_kui_phrase(text)
-                    text = self.__delete_wrong_phrases(text)
-                return text
+    def tag_many(self, texts):
+        """
+        Tags adjective phrases in a batch of documents. The analyses of the phrase lemmas
+        are shared by all documents.
+        Parameters
+        ----------
+        texts - the documents to tag
+        Returns the tagged documents (or the resulting layers, if return_layer is set)
+        """
+        return [self.tag(text) for text in texts]
+
+    def reset_stats(self):
+        """
+        Resets the counts of the tagged documents, words and phrases (by type) in self.stats
+        """
+        self.stats = defaultdict(int)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Aho-Corasick automata for the keyword and event taggers.
+
+The taggers use the automata of the `pyahocorasick` package, if it is installed.
+Otherwise, :py:class:`Automaton` is used, which is a pure-Python implementation of
+the part of the `pyahocorasick` interface that the taggers need. Both automata
+can be pickled, so they can be saved to disk and sent to worker processes.
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import pickle
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+STORE_ANY = 'any'
+STORE_LENGTH = 'length'
+
+
+class Automaton(object):
+    """Pure-Python Aho-Corasick automaton.
+
+    The automaton is built by adding the words with :py:meth:`add_word` and
+    calling :py:meth:`make_automaton`. :py:meth:`iter` finds all occurrences of
+    the words in a text in a single pass."""
+
+    def __init__(self, store=STORE_ANY):
+        self.store = store
+        # the trie: transitions, values of the words ending at the states (None if no word ends there)
+        self.goto = [{}]
+        self.values = [None]
+        self.ends_word = [False]
+        self.fail = None
+        # the next state on the failure path, where a word ends
+        self.output = None
+
+    def __len__(self):
+        return sum(self.ends_word)
+
+    def add_word(self, key, value=None):
+        """Add a word to the trie. If the word is already added, its value is replaced."""
+        if self.store == STORE_LENGTH:
+            value = len(key)
+        state = 0
+        for char in key:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.values.append(None)
+                self.ends_word.append(False)
+            state = next_state
+        self.values[state] = value
+        self.ends_word[state] = True
+        self.fail = None
+
+    def make_automaton(self):
+        """Compute the failure transitions of the trie."""
+        goto = self.goto
+        fail = [0] * len(goto)
+        output = [0] * len(goto)
+        # breadth-first traversal, so the failure states are computed before their children
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, child in goto[state].items():
+                f = fail[state]
+                while f and char not in goto[f]:
+                    f = fail[f]
+                f = goto[f].get(char, 0)
+                fail[child] = f if f != child else 0
+                output[child] = fail[child] if self.ends_word[fail[child]] else output[fail[child]]
+                queue.append(child)
+        self.fail = fail
+        self.output = output
+
+    def iter(self, text):
+        """Find the occurrences of the words in the text.
+
+        Yields
+        ------
+        (int, object)
+            The index of the last character of the occurrence and the value of the word.
+            The occurrences ending at the same position are yielded from the longest.
+        """
+        if self.fail is None:
+            raise ValueError('The automaton is not built, call make_automaton() first.')
+        goto, fail, output, values, ends_word = self.goto, self.fail, self.output, self.values, self.ends_word
+        state = 0
+        for idx, char in enumerate(text):
+            next_state = goto[state].get(char)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto[state].get(char)
+            state = next_state or 0
+            match = state if ends_word[state] else output[state]
+            while match:
+                yield idx, values[match]
+                match = output[match]
+
+
+def new_automaton(store=STORE_ANY):
+    """Create a new automaton, using `pyahocorasick` if it is installed.
+
+    Parameters
+    ----------
+    store: 'any', 'length'
+        If 'any', the words are stored with given values, if 'length', the values are the lengths of the words.
+    """
+    if ahocorasick is not None:
+        return ahocorasick.Automaton(ahocorasick.STORE_LENGTH if store == STORE_LENGTH else ahocorasick.STORE_ANY)
+    return Automaton(store)
+
+
+def save_automaton(automaton, path):
+    """Save the automaton to a file."""
+    with open(path, 'wb') as f:
+        pickle.dump(automaton, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_automaton(path):
+    """Load an automaton saved with :py:func:`save_automaton`."""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
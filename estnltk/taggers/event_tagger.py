@@ -1,8 +1,6 @@
 from __future__ import unicode_literals
 
-import ahocorasick
-from sys import version_info
-
+import numpy as np
 import regex as re
 
 import six
@@ -20,6 +18,8 @@ else:
 from estnltk.names import START, END
 from pandas import DataFrame
 
+from .aho_corasick import new_automaton, save_automaton, load_automaton, STORE_LENGTH
+
 TERM = 'term'
 WSTART_RAW = 'wstart_raw' # w - word
 WEND_RAW = 'wend_raw'
@@ -27,7 +27,7 @@ WSTART = 'wstart'
 CSTART = 'cstart' # c - character
 BSTART = 'bstart' # b - block
 
-DEFAULT_METHOD = 'ahocorasick' if version_info.major >= 3 else 'naive'
+DEFAULT_METHOD = 'ahocorasick'
 
 
 class KeywordTagger(object):
@@ -43,7 +43,8 @@ class KeywordTagger(object):
         keyword_sequence: list-like or dict-like
             sequence of keywords to annotate
         search_method: 'naive', 'ahocorasick'
-            Method to find events in text (default: 'naive' for python2 and 'ahocorasick' for python3).
+            Method to find events in text (default: 'ahocorasick'). The Aho-Corasick automaton of the
+            `pyahocorasick` package is used, if it is installed, otherwise a pure-Python automaton.
         conflict_resolving_strategy: 'ALL', 'MAX', 'MIN'
             Strategy to choose between overlapping events (default: 'MAX').
         return_layer: bool
@@ -67,9 +68,6 @@ class KeywordTagger(object):
             raise ValueError("Unknown search_method '%s'." % search_method)
         if conflict_resolving_strategy not in ['ALL', 'MIN', 'MAX']:
             raise ValueError("Unknown conflict_resolving_strategy '%s'." % conflict_resolving_strategy)
-        if search_method == 'ahocorasick' and version_info.major < 3:
-            raise ValueError(
-                "search_method='ahocorasick' is not supported by Python %s. Try 'naive' instead." % version_info.major)
         self.search_method = search_method
         self.ahocorasick_automaton = None
         self.conflict_resolving_strategy = conflict_resolving_strategy
@@ -83,14 +81,51 @@ class KeywordTagger(object):
                 start = text.find(entry, start + 1)
         return events
 
+    def _make_automaton(self):
+        automaton = new_automaton(STORE_LENGTH)
+        for entry in self.keyword_sequence:
+            automaton.add_word(entry)
+        automaton.make_automaton()
+        return automaton
+
+    def build_automaton(self):
+        """Build the Aho-Corasick automaton, if it is not built yet.
+
+        The automaton is otherwise built on the first use. Building it before
+        forking worker processes lets the workers share it.
+
+        Returns
+        -------
+        the automaton
+        """
+        if self.ahocorasick_automaton is None:
+            self.ahocorasick_automaton = self._make_automaton()
+        return self.ahocorasick_automaton
+
+    def save_automaton(self, path):
+        """Save the Aho-Corasick automaton to a file.
+
+        Parameters
+        ----------
+        path: str
+            The path of the file.
+        """
+        save_automaton(self.build_automaton(), path)
+
+    def load_automaton(self, path):
+        """Load the Aho-Corasick automaton saved by :py:meth:`save_automaton`
+        of a tagger with the same vocabulary and settings.
+
+        Parameters
+        ----------
+        path: str
+            The path of the file.
+        """
+        self.ahocorasick_automaton = load_automaton(path)
+
     def _find_keywords_ahocorasick(self, text):
         events = []
-        if self.ahocorasick_automaton == None:
-            self.ahocorasick_automaton = ahocorasick.Automaton(ahocorasick.STORE_LENGTH)
-            for index, entry in enumerate(self.keyword_sequence):
-                self.ahocorasick_automaton.add_word(entry)
-            self.ahocorasick_automaton.make_automaton()
-        for end, length in self.ahocorasick_automaton.iter(text):
+        for end, length in self.build_automaton().iter(text):
             events.append(
                 {START: end - length + 1, END: end + 1}
             )
@@ -126,6 +161,25 @@ class KeywordTagger(object):
                 del events[0]
             return events
 
+    def tag_many(self, texts):
+        """Tag a batch of texts.
+
+        Parameters
+        ----------
+        texts: list of Text
+            The texts to tag.
+
+        Returns
+        -------
+        list
+            If return_layer is True, the layers of the texts, otherwise the annotated texts.
+        """
+        results = []
+        for text in texts:
+            layer = self.tag(text)
+            results.append(layer if self.return_layer else text)
+        return results
+
     def tag(self, text):
         """Retrieves list of keywords in text.
 
@@ -197,6 +251,9 @@ class RegexTagger(KeywordTagger):
         if conflict_resolving_strategy not in ['ALL', 'MIN', 'MAX']:
             raise ValueError("Unknown conflict_resolving_strategy '%s'." % conflict_resolving_strategy)
         self.conflict_resolving_strategy = conflict_resolving_strategy
+        # the regexes are compiled once, the regex module caches only a limited number of compiled patterns
+        seq = self.map.keys() if self.mapping else self.regex_sequence
+        self.patterns = [(r, re.compile(r)) for r in seq]
 
     def tag(self, text):
         """Retrieves list of regex_matches in text.
@@ -220,13 +277,8 @@ class RegexTagger(KeywordTagger):
 
     def _match(self, text):
         matches = []
-        if self.mapping:
-            seq = self.map.keys()
-        else:
-            seq = self.regex_sequence
-
-        for r in seq:
-            for matchobj in re.finditer(r, text, overlapped=True):
+        for r, pattern in self.patterns:
+            for matchobj in pattern.finditer(text, overlapped=True):
                 groups = (matchobj.groupdict())
                 result = {
                     'start': matchobj.start(),
@@ -302,9 +354,10 @@ class EventTagger(KeywordTagger):
                                       columns=['term',    'type'])
                                           
         search_method: 'naive', 'ahocorasic'
-            (default: 'naive' for python2 and 'ahocorasick' for python3)
+            (default: 'ahocorasick')
             
-            Method to find events in text.
+            Method to find events in text. The Aho-Corasick automaton of the
+            `pyahocorasick` package is used, if it is installed, otherwise a pure-Python automaton.
         case_sensitive: bool (default: True)        
             If ``True``, then the terms are searched from the text case sensitive.
 
@@ -331,9 +384,6 @@ class EventTagger(KeywordTagger):
         self.case_sensitive = case_sensitive
         if conflict_resolving_strategy not in ['ALL', 'MIN', 'MAX']:
             raise ValueError("Unknown onflict_resolving_strategy '%s'." % conflict_resolving_strategy)
-        if search_method == 'ahocorasick' and version_info.major < 3:
-            raise ValueError(
-                "search_method='ahocorasick' is not supported by Python %s. Try 'naive' instead." % version_info.major)
         self.event_vocabulary = self._read_event_vocabulary(event_vocabulary)
         self.search_method = search_method
         self.ahocorasick_automaton = None
@@ -379,55 +429,46 @@ class EventTagger(KeywordTagger):
                 start = _text.find(term, start + 1)
         return events
 
+    def _make_automaton(self):
+        automaton = new_automaton()
+        for entry in self.event_vocabulary:
+            term = entry[TERM] if self.case_sensitive else entry[TERM].lower()
+            automaton.add_word(term, entry)
+        automaton.make_automaton()
+        return automaton
+
     def _find_events_ahocorasick(self, text):
         events = []
-        if self.ahocorasick_automaton == None:
-            self.ahocorasick_automaton = ahocorasick.Automaton()
-            for entry in self.event_vocabulary:
-                term = entry[TERM] if self.case_sensitive else entry[TERM].lower()
-                self.ahocorasick_automaton.add_word(term, entry)
-            self.ahocorasick_automaton.make_automaton()
         _text = text if self.case_sensitive else text.lower()
-        for item in self.ahocorasick_automaton.iter(_text):
+        for item in self.build_automaton().iter(_text):
             events.append(item[1].copy())
             events[-1].update({START: item[0] + 1 - len(item[1][TERM]), END: item[0] + 1})
         return events
 
     def _event_intervals(self, events, text):
-        bookmark = 0
-        overlapping_events = False
-        last_end = 0
-        for event in events:
-            if last_end > event[START]:
-                overlapping_events = True
-            last_end = event[END]
-            event[WSTART_RAW] = len(text.word_spans)
-            event[WEND_RAW] = 0
-            for i in range(bookmark, len(text.word_spans) - 1):
-                if text.word_spans[i][0] <= event[START] < text.word_spans[i + 1][0]:
-                    event[WSTART_RAW] = i
-                    bookmark = i
-                if text.word_spans[i][0] < event[END] <= text.word_spans[i + 1][0]:
-                    event[WEND_RAW] = i + 1
-                    break
+        if not events:
+            return events
+        # the events are sorted by start; they are mapped to the words by the binary search of the word starts
+        word_starts = np.array([start for start, _ in text.word_spans], dtype=np.int64)
+        starts = np.fromiter((event[START] for event in events), dtype=np.int64, count=len(events))
+        ends = np.fromiter((event[END] for event in events), dtype=np.int64, count=len(events))
+        # the word containing the start (or the whitespace following the word)
+        wstarts_raw = np.maximum(np.searchsorted(word_starts, starts, side='right') - 1, 0)
+        # one past the word containing the last character of the event
+        wends_raw = np.searchsorted(word_starts, ends, side='left')
+        columns = [(WSTART_RAW, wstarts_raw), (WEND_RAW, wends_raw)]
+        overlapping_events = bool(np.any(ends[:-1] > starts[1:]))
         if not overlapping_events:
-            w_shift = 0
-            c_shift = 0
-            b_count = -1
-            previous_wend_raw = 0
-            for event in events:
-                event[WSTART] = event[WSTART_RAW] - w_shift
-                w_shift += event[WEND_RAW] - event[WSTART_RAW] - 1
-
-                event[CSTART] = event[START] - c_shift
-                c_shift += event[END] - event[START] - 1
-
-                if event[WSTART_RAW] > previous_wend_raw:
-                    b_count += 2
-                else:
-                    b_count += 1
-                event[BSTART] = b_count
-                previous_wend_raw = event[WEND_RAW]
+            # the words and characters of the preceding events are counted as one
+            w_shifts = np.cumsum(wends_raw - wstarts_raw - 1) - (wends_raw - wstarts_raw - 1)
+            c_shifts = np.cumsum(ends - starts - 1) - (ends - starts - 1)
+            # a block of non-event words precedes the event, if there is a gap after the previous event
+            previous_wends_raw = np.concatenate(([0], wends_raw[:-1]))
+            b_counts = np.cumsum(np.where(wstarts_raw > previous_wends_raw, 2, 1)) - 1
+            columns += [(WSTART, wstarts_raw - w_shifts), (CSTART, starts - c_shifts), (BSTART, b_counts)]
+        for name, values in columns:
+            for event, value in zip(events, values.tolist()):
+                event[name] = value
         return events
 
     def tag(self, text):
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+from estnltk import Text
+from estnltk.taggers import AdjectivePhraseTagger
+from estnltk.taggers.adjective_phrase_tagger import adj_phrase_tagger
+from estnltk.taggers.adjective_phrase_tagger.adj_phrase_tagger import memoize
+
+
+def test_adjective_phrase_tagger():
+    tagger = AdjectivePhraseTagger()
+    text = tagger.tag(Text('Koer oli kõige kiirem ja üsna kenasti lõikav.'))
+    phrases = [(ph['text'], ph['type'], ph['lemmas']) for ph in text['adjective_phrases']]
+    assert phrases == [('kõige kiirem', 'comparative', ['kõige', 'kiirem']),
+                       ('kenasti lõikav', 'participle', ['kenasti', 'lõikav'])]
+
+
+def test_tag_many():
+    tagger = AdjectivePhraseTagger(return_layer=True)
+    layers = tagger.tag_many([Text('Väga ilus kass.'), Text('Kass')])
+    assert [[ph['text'] for ph in layer] for layer in layers] == [['Väga ilus'], []]
+    assert tagger.stats['documents'] == 2
+    assert tagger.stats['words'] == 5
+    assert tagger.stats['phrases'] == tagger.stats['adjective'] == 1
+    tagger.reset_stats()
+    assert tagger.stats['documents'] == 0
+
+
+def test_return_layer_name(monkeypatch):
+    tagger = AdjectivePhraseTagger(return_layer=True, layer_name='adj')
+    # the grammars are compiled once, in the constructor
+    monkeypatch.setattr(adj_phrase_tagger, 'compile_grammar', None)
+    text = Text('Väga ilus kass.')
+    layer = tagger.tag(text)
+    assert [ph['text'] for ph in layer] == ['Väga ilus']
+    assert 'adj' not in text
+    assert tagger.stats['phrases'] == 1
+
+
+def test_memoize_maxsize():
+    calls = []
+
+    @memoize(maxsize=2)
+    def length(word):
+        calls.append(word)
+        return len(word)
+
+    assert [length(w) for w in ['kass', 'koer', 'kass', 'hiir', 'koer']] == [4, 4, 4, 4, 4]
+    # 'koer' was dropped as the least recently used word when 'hiir' was added
+    assert calls == ['kass', 'koer', 'hiir', 'koer']
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+import unittest
+import random
+from itertools import combinations
+
+from estnltk.grammar.match import Match
+from estnltk.grammar.conflictresolver import resolve_using_maximal_coverage
+
+
+def spans(matches):
+    return [(m.start, m.end) for m in matches]
+
+
+def match(start, end, name=None):
+    return Match(start, end, 'x' * (end - start), name)
+
+
+class ConflictResolverTest(unittest.TestCase):
+
+    def test_empty(self):
+        self.assertEqual(resolve_using_maximal_coverage([]), [])
+
+    def test_maximal_coverage(self):
+        matches = [match(0, 5), match(3, 10), match(9, 12), match(12, 13)]
+        self.assertEqual(spans(resolve_using_maximal_coverage(matches)), [(0, 5), (9, 12), (12, 13)])
+
+        matches = [match(0, 4), match(2, 6), match(4, 8)]
+        self.assertEqual(spans(resolve_using_maximal_coverage(matches)), [(0, 4), (4, 8)])
+
+    def test_ties_prefer_earlier_matches(self):
+        matches = [match(5, 10, 'B'), match(0, 5, 'A'), match(0, 5, 'C'), match(2, 7, 'D')]
+        result = resolve_using_maximal_coverage(matches)
+        self.assertEqual([m.name for m in result], ['A', 'B'])
+
+    def test_coverage_is_optimal(self):
+        random.seed(7)
+        for _ in range(200):
+            matches = []
+            for _ in range(random.randint(1, 8)):
+                start = random.randint(0, 20)
+                matches.append(match(start, start + random.randint(1, 6)))
+            best = 0
+            for k in range(1, len(matches) + 1):
+                for subset in combinations(sorted(matches), k):
+                    if all(a.end <= b.start for a, b in zip(subset, subset[1:])):
+                        best = max(best, sum(len(m) for m in subset))
+            result = resolve_using_maximal_coverage(matches)
+            self.assertTrue(all(a.end <= b.start for a, b in zip(result, result[1:])))
+            self.assertEqual(sum(len(m) for m in result), best)
@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
+import os
+import pickle
+import shutil
+import tempfile
 import unittest
 
 from estnltk import Text
 from estnltk.names import START, END
 from estnltk.taggers import EventTagger
+from estnltk.taggers.aho_corasick import Automaton
 
 
 class EventTaggerTest(unittest.TestCase):
@@ -184,3 +189,66 @@ class EventTaggerTest(unittest.TestCase):
                     {'term': 'KaKs', 'start': 13, 'end': 17, 'wstart_raw': 3, 'wend_raw': 4, 'cstart':  6, 'wstart': 3, 'bstart': 3}]
 
         self.assertListEqual(expected, result)
+
+    def test_event_tagger_pure_python_automaton(self):
+        event_vocabulary = [{'term': 'üks'},
+                            {'term': 'kaks'},
+                            {'term': 'kaks kolm'},
+                            {'term': 's k'}]
+        text = """kolm kaks kaks kaks kolm kaks viis kolm neli kolm üks neli kaks neli
+        kaks kaks üks üks neli kolm viis kolm üks kaks kaks kolm kolm üks viis neli"""
+
+        event_tagger = EventTagger(event_vocabulary, 'naive',
+                                   case_sensitive=True,
+                                   conflict_resolving_strategy='ALL',
+                                   return_layer=True)
+        naive = event_tagger._find_events_naive(text)
+
+        automaton = Automaton()
+        for entry in event_vocabulary:
+            automaton.add_word(entry['term'], entry)
+        automaton.make_automaton()
+        event_tagger.ahocorasick_automaton = automaton
+        pure = event_tagger._find_events_ahocorasick(text)
+
+        key = lambda event: (event['start'], event['end'])
+        self.assertListEqual(sorted(naive, key=key), sorted(pure, key=key))
+
+    def test_event_tagger_save_load_automaton(self):
+        event_vocabulary = [{'term': 'kaks'},
+                            {'term': 'kaks kolm'}]
+        text = Text('üks kaks kolm neli kaks')
+        expected = EventTagger(event_vocabulary, return_layer=True).tag(text)
+
+        tempdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tempdir, 'automaton.pickle')
+            EventTagger(event_vocabulary).save_automaton(path)
+            event_tagger = EventTagger(event_vocabulary, return_layer=True)
+            event_tagger.load_automaton(path)
+            self.assertListEqual(expected, event_tagger.tag(text))
+        finally:
+            shutil.rmtree(tempdir)
+
+        event_tagger = EventTagger(event_vocabulary, return_layer=True)
+        event_tagger.build_automaton()
+        event_tagger = pickle.loads(pickle.dumps(event_tagger))
+        self.assertListEqual(expected, event_tagger.tag(text))
+
+    def test_event_tagger_tag_many(self):
+        event_vocabulary = [{'term': 'kaks'}]
+        texts = [Text('üks kaks kolm'), Text('kaks kolm kaks neli')]
+        event_tagger = EventTagger(event_vocabulary, layer_name='events')
+        self.assertListEqual(texts, event_tagger.tag_many(texts))
+        self.assertListEqual([[1], [0, 2]], [[e['wstart_raw'] for e in text['events']] for text in texts])
+
+    def test_event_tagger_last_word(self):
+        event_vocabulary = [{'term': 'kaks'},
+                            {'term': 'neli'}]
+        text = Text('kaks kolm neli')
+        event_tagger = EventTagger(event_vocabulary, return_layer=True)
+        result = event_tagger.tag(text)
+        expected = [{'term': 'kaks', 'start':  0, 'end':  4, 'wstart_raw': 0, 'wend_raw': 1, 'cstart': 0, 'wstart': 0, 'bstart': 0},
+                    {'term': 'neli', 'start': 10, 'end': 14, 'wstart_raw': 2, 'wend_raw': 3, 'cstart': 7, 'wstart': 2, 'bstart': 2}]
+
+        self.assertListEqual(expected, result)
@@ -160,3 +160,126 @@ class LayerRegexTest(unittest.TestCase):
         expected = [Match(0, 5, 'Janne')]
         self.assertListEqual(expected, matches)
 
+
+
+class GapsTest(unittest.TestCase):
+
+    def text(self):
+        return Text('Kass hüppas ja hiir kargas!')
+
+    def spans(self, matches):
+        return [(m.start, m.end) for m in matches]
+
+    def test_allgaps(self):
+        from estnltk import AllGaps
+        g = AllGaps(Postags('S'), Postags('V'))
+        self.assertListEqual(self.spans(g.get_matches(self.text(), conflict_resolver=None)),
+                             [(0, 11), (0, 26), (15, 26)])
+
+    def test_allgaps_max_gap(self):
+        from estnltk import AllGaps
+        g = AllGaps(Postags('S'), Postags('V'), max_gap=1)
+        self.assertListEqual(self.spans(g.get_matches(self.text(), conflict_resolver=None)),
+                             [(0, 11), (15, 26)])
+
+    def test_gaps(self):
+        from estnltk import Gaps
+        g = Gaps(Postags('S'), Postags('V'), Lemmas('!'), name='lause')
+        matches = g.get_matches(self.text(), conflict_resolver=None)
+        self.assertListEqual(self.spans(matches), [(0, 27), (15, 27)])
+        self.assertEqual(matches[0].name, 'lause')
+
+        g = Gaps(Postags('S'), Postags('V'), max_gap=0)
+        self.assertListEqual(self.spans(g.get_matches(self.text(), conflict_resolver=None)), [])
+
+
+class CompiledGrammarTest(unittest.TestCase):
+
+    def text(self):
+        return Text('Väga ilus ja väga suur kass hüppas ning hiir kargas!')
+
+    def dicts(self, matches):
+        return [(m.start, m.end, m.name, sorted(m.dict.items())) for m in matches]
+
+    def assertCompiledEqual(self, grammar):
+        from estnltk.grammar import compile_grammar
+        compiled = compile_grammar(grammar)
+        for conflict_resolver in ({}, {'conflict_resolver': None}):
+            self.assertListEqual(self.dicts(grammar.get_matches(self.text(), **conflict_resolver)),
+                                 self.dicts(compiled.get_matches(self.text(), **conflict_resolver)))
+
+    def test_word_symbols(self):
+        self.assertCompiledEqual(Union(Lemmas('kass', name='kaslane'), Postags('V'), Suffix('s', name='s')))
+        self.assertCompiledEqual(Intersection(Union(Postags('A'), Postags('A', 'D')), Suffix('s'), name='x'))
+
+    def test_concatenation(self):
+        from estnltk import Regex, Gaps
+        space = Regex('\\s')
+        phrase = Concatenation(Postags('D', name='adverb'), space, Postags('A', name='adjective'), name='phrase')
+        self.assertCompiledEqual(phrase)
+        self.assertCompiledEqual(Concatenation(phrase, space, Lemmas('ja'), space, phrase, name='phrases'))
+        self.assertCompiledEqual(Concatenation(Union(phrase, Postags('A')), space, Postags('S'), name='np'))
+        self.assertCompiledEqual(Gaps(phrase, Postags('V'), name='gaps'))
+
+    def test_adjective_phrases(self):
+        from estnltk.taggers.adjective_phrase_tagger.grammars import adjective_phrases
+        self.assertCompiledEqual(adjective_phrases)
+
+
+class GrammarContextTest(unittest.TestCase):
+
+    def text(self):
+        return Text('Kass hüppas ja hiir kargas. Väga ilus kass. Kass hüppas ja hiir kargas.')
+
+    def grammar(self):
+        from estnltk import Regex
+        return Concatenation(Postags('S', name='noun'), Regex('\\s'), Postags('V', name='verb'), name='clause')
+
+    def dicts(self, matches):
+        return [(m.start, m.end, m.name, sorted(m.dict.items())) for m in matches]
+
+    def test_same_matches(self):
+        from estnltk.grammar import GrammarContext
+        context = GrammarContext()
+        grammar = self.grammar()
+        expected = self.dicts(grammar.get_matches(self.text()))
+        self.assertListEqual(self.dicts(grammar.get_matches(self.text(), context=context)), expected)
+        self.assertListEqual(self.dicts(grammar.get_matches(self.text(), context=context)), expected)
+        # the first and the last sentence are equal
+        self.assertEqual((context.misses, context.hits, len(context)), (2, 4, 2))
+
+    def test_changed_sentences(self):
+        from estnltk.grammar import GrammarContext
+        context = GrammarContext()
+        grammar = self.grammar()
+        grammar.annotate(self.text(), context=context)
+        text = grammar.annotate('Kass hüppas ja hiir kargas. Väga suur koer. Kass hüppas ja hiir kargas.', context=context)
+        self.assertEqual((context.misses, context.hits), (3, 3))
+        self.assertEqual(len(context), 3)
+        self.assertListEqual(text.texts('clause'), ['Kass hüppas', 'hiir kargas', 'Kass hüppas', 'hiir kargas'])
+
+    def test_same_text(self):
+        from estnltk import Regex
+        from estnltk.grammar import GrammarContext
+        context = GrammarContext()
+        text = self.text()
+        self.grammar().annotate(text, context=context)
+        self.assertEqual((context.misses, context.hits), (2, 1))
+        # the layers added by the first grammar do not change the keys of the sentences
+        other = Concatenation(Postags('D'), Regex('\\s'), Postags('A'), name='phrase')
+        other.annotate(text, context=context)
+        self.assertEqual((context.misses, context.hits), (2, 4))
+        self.grammar().annotate(text, context=context)
+        self.assertEqual((context.misses, context.hits), (2, 7))
+        self.assertListEqual(text.texts('phrase'), ['Väga ilus'])
+        # the layers read by the grammar are hashed
+        layer_grammar = LayerRegex('clause', '^hiir', name='mouse')
+        self.assertListEqual(self.dicts(layer_grammar.get_matches(text, context=context)),
+                             self.dicts(layer_grammar.get_matches(text)))
+        self.assertEqual((context.misses, context.hits), (4, 8))
+
+    def test_max_sentences(self):
+        from estnltk.grammar import GrammarContext
+        context = GrammarContext(max_sentences=1)
+        self.grammar().get_matches(self.text(), context=context)
+        self.assertEqual(len(context), 1)
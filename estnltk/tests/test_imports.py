@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+import subprocess
+import sys
+import unittest
+
+
+class LazyImportsTest(unittest.TestCase):
+
+    def imported_modules(self, statement, modules):
+        code = '{0}; import sys; print(",".join(m for m in {1!r} if m in sys.modules))'.format(statement, modules)
+        output = subprocess.check_output([sys.executable, '-c', code]).decode('utf-8').strip()
+        return [m for m in output.split(',') if m]
+
+    def test_import_estnltk(self):
+        modules = ['pandas', 'elasticsearch', 'estnltk.ner', 'estnltk.syntax', 'estnltk.wordnet_tagger']
+        self.assertEqual(self.imported_modules('import estnltk', modules), [])
+
+    def test_lazy_attributes(self):
+        modules = ['estnltk.ner', 'estnltk.timex']
+        self.assertEqual(self.imported_modules('from estnltk import NerTagger, TimexTagger', modules), modules)
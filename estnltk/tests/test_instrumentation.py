@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+import unittest
+
+from ..text import Text
+from .. import instrumentation
+from ..instrumentation import instrumented, instrumentation as instrumentation_block
+from ..instrumentation import get_stats, reset, record_roundtrip, to_prometheus, to_statsd
+
+
+@instrumented('test.double', items=lambda values: len(values))
+def double(values):
+    return [v * 2 for v in values]
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    def tearDown(self):
+        instrumentation.disable()
+        reset()
+
+    def test_disabled(self):
+        instrumentation.disable()
+        reset()
+        self.assertEqual(double([1, 2]), [2, 4])
+        record_roundtrip('test.double')
+        self.assertEqual(get_stats(), {})
+
+    def test_context_manager(self):
+        with instrumentation_block():
+            double([1, 2, 3])
+            double([4])
+            record_roundtrip('test.double', count=2)
+        double([5])
+        stats = get_stats()['test.double']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['items'], 4)
+        self.assertEqual(stats['roundtrips'], 2)
+        self.assertTrue(stats['seconds'] >= 0)
+        self.assertFalse(instrumentation.is_enabled())
+
+    def test_text_methods(self):
+        with instrumentation_block():
+            Text('Tere maailm! Kuidas läheb?').tag_analysis()
+        stats = get_stats()
+        self.assertEqual(stats['Text.tag_analysis']['calls'], 1)
+        self.assertEqual(stats['Text.tag_analysis']['items'], 6)
+        self.assertEqual(stats['Text.tokenize_words']['calls'], 1)
+
+    def test_export(self):
+        with instrumentation_block():
+            double([1, 2, 3])
+        prometheus = to_prometheus()
+        self.assertTrue('# TYPE estnltk_calls_total counter' in prometheus)
+        self.assertTrue('estnltk_items_total{step="test.double"} 3' in prometheus)
+        statsd = to_statsd()
+        self.assertTrue('estnltk.test_double.calls:1|c' in statsd)
+        self.assertTrue('estnltk.test_double.items:3|c' in statsd)
@@ -1,6 +1,7 @@
 from estnltk import Text
 from estnltk.taggers import KeywordTagger
 from estnltk.taggers import RegexTagger
+from estnltk.taggers.aho_corasick import Automaton, STORE_LENGTH
 
 
 def test_keyword_tagger():
@@ -39,3 +40,43 @@ def test_regex_tagger():
         return_layer=True
     )
     assert [{'start':i['start'], 'end':i['end']} for i in k.tag(text)] == [{'end': 2, 'start': 0}, {'end': 14, 'start': 12}]
+
+
+def test_regex_tagger_tag_many():
+    k = RegexTagger(
+        ['(?P<number>\\d+) kg', 'kg', '\\d+'], layer_name='weights',
+        conflict_resolving_strategy='ALL', return_layer=True
+    )
+    layers = k.tag_many([Text('5 kg ja 10 kg'), Text('kaal')])
+    assert [[(i['start'], i['end'], i['regex'], i['groups']) for i in layer] for layer in layers] == [
+        [(0, 1, '\\d+', {}), (0, 4, '(?P<number>\\d+) kg', {'number': '5'}), (2, 4, 'kg', {}),
+         (8, 10, '\\d+', {}), (8, 13, '(?P<number>\\d+) kg', {'number': '10'}), (9, 10, '\\d+', {}),
+         (9, 13, '(?P<number>\\d+) kg', {'number': '0'}), (11, 13, 'kg', {})],
+        []]
+
+    k = RegexTagger(['kg'], layer_name='weights')
+    texts = k.tag_many([Text('5 kg')])
+    assert [(i['start'], i['end']) for i in texts[0]['weights']] == [(2, 4)]
+
+
+def test_keyword_tagger_pure_python_automaton():
+    automaton = Automaton(STORE_LENGTH)
+    for keyword in ['aa', 'a', 'ab', 'b']:
+        automaton.add_word(keyword)
+    automaton.make_automaton()
+    assert len(automaton) == 4
+    assert list(automaton.iter('aab')) == [(0, 1), (1, 2), (1, 1), (2, 2), (2, 1)]
+
+    text = Text('aa bb cc dd aa')
+    k = KeywordTagger(['aa', 'bb'], return_layer=True)
+    expected = k.tag(text)
+    k.ahocorasick_automaton = Automaton(STORE_LENGTH)
+    for keyword in ['aa', 'bb']:
+        k.ahocorasick_automaton.add_word(keyword)
+    k.ahocorasick_automaton.make_automaton()
+    assert k.tag(text) == expected
+
+
+def test_keyword_tagger_tag_many():
+    k = KeywordTagger(['aa'], return_layer=True)
+    assert k.tag_many([Text('aa bb'), Text('bb aa')]) == [[{'end': 2, 'start': 0}], [{'end': 5, 'start': 3}]]
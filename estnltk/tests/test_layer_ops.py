@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+import unittest
+
+from ..layer_ops import overlap_join, containment_join, nearest_neighbours, intersection, difference, union
+
+
+def span(start, end):
+    return {'start': start, 'end': end}
+
+
+class JoinTest(unittest.TestCase):
+
+    def test_overlap_join(self):
+        a = [span(0, 5), span(5, 10), span(20, 30)]
+        b = [span(4, 6), span(10, 20), span(25, 25), {'start': [1, 21], 'end': [2, 22]}]
+        self.assertListEqual(overlap_join(a, b), [(0, 0), (0, 3), (1, 0), (2, 3)])
+        self.assertListEqual(overlap_join(b, a), [(0, 0), (0, 1), (3, 0), (3, 2)])
+        self.assertListEqual(overlap_join([], b), [])
+
+    def test_containment_join(self):
+        outer = [span(0, 10), {'start': [20, 40], 'end': [30, 50]}]
+        inner = [span(0, 10), span(5, 15), span(10, 10), {'start': [22, 45], 'end': [25, 50]}, span(25, 45)]
+        self.assertListEqual(containment_join(outer, inner), [(0, 0), (0, 2), (1, 3)])
+        self.assertListEqual(containment_join(inner, outer), [(0, 0)])
+
+    def test_nearest_neighbours(self):
+        a = [span(10, 20), span(40, 45), span(0, 2)]
+        b = [span(22, 30), span(5, 8), span(0, 8), span(46, 50)]
+        self.assertListEqual(nearest_neighbours(a, b), [(0, 1), (1, 3), (2, 1)])
+        self.assertListEqual(nearest_neighbours(a, b, direction='left'), [(0, 1), (1, 0)])
+        self.assertListEqual(nearest_neighbours(a, b, direction='right'), [(0, 0), (1, 3), (2, 1)])
+        self.assertRaises(ValueError, nearest_neighbours, a, b, direction='up')
+
+    def test_clauses_with_verb_chains(self):
+        clauses = [{'start': [0, 27], 'end': [4, 51]}, {'start': [4], 'end': [26]}, {'start': [52], 'end': [67]}]
+        verb_chains = [{'start': [27, 30, 44], 'end': [29, 37, 50]}, {'start': [55], 'end': [59]}]
+        entities = [span(0, 4), span(5, 9), span(60, 66)]
+        with_verbs = set(i for i, _ in overlap_join(clauses, verb_chains))
+        inside = [j for i, j in containment_join(clauses, entities) if i in with_verbs]
+        self.assertListEqual(inside, [0, 2])
+
+
+class SetOperationsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.a = [span(0, 5), span(5, 10), {'start': [20, 30], 'end': [25, 35]}]
+        self.b = [{'start': [20, 30], 'end': [25, 35]}, span(0, 4), span(0, 5), span(0, 5)]
+
+    def test_intersection(self):
+        self.assertListEqual(intersection(self.a, self.b), [(0, 2), (0, 3), (2, 0)])
+
+    def test_difference(self):
+        self.assertListEqual(difference(self.a, self.b), [1])
+        self.assertListEqual(difference(self.b, self.a), [1])
+
+    def test_union(self):
+        self.assertListEqual(union(self.a, self.b), [(1, 1), (0, 0), (0, 1), (0, 2)])
@@ -37,3 +37,12 @@ class MatchConcatTest(unittest.TestCase):
         match = concatenate_matches(self.a_without_name(), self.b(), '12345678901234567890', 'C')
         expected = self.c_without_a()
         self.assertEqual(expected, match)
+
+    def test_shift_match(self):
+        from estnltk.grammar.match import shift_match
+        c = self.c()
+        match = shift_match(c, 5)
+        self.assertEqual((match.start, match.end), (5, 25))
+        self.assertEqual([(m['start'], m['end']) for _, m in sorted(match.matches.items())], [(5, 15), (15, 25)])
+        # the original match is not modified
+        self.assertEqual((c.start, c.end, c.matches['B']['start']), (0, 20, 10))
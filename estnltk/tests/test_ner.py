@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals, print_function, absolute_import
 import unittest
+import os
+import shutil
+import tempfile
 from copy import deepcopy
 
 import estnltk
@@ -9,7 +12,8 @@ from ..estner.featureextraction import MorphFeatureExtractor, LocalFeatureExtrac
 from ..estner.ner import Token
 from ..core import as_unicode
 from ..text import Text
-from ..ner import json_document_to_estner_document, NerTagger
+from ..ner import json_document_to_estner_document, NerTagger, ModelStorageUtil, DEFAULT_NER_MODEL_DIR
+from ..ner import load_shared_ner_tagger
 
 
 class TestFeatureExtractor(unittest.TestCase):
@@ -189,3 +193,58 @@ class TestNer(unittest.TestCase):
         t = Text(as_unicode('Elion AS ja EMT on Eesti suurimad ettevõted.'))
         self.assertEqual(t.named_entities, ['Elion AS', 'EMT', 'Eesti'])
         self.assertEqual(t.named_entity_labels, ['ORG', 'ORG', 'LOC'])
+
+
+class TestNerModelBundle(unittest.TestCase):
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp()
+        for fnm in ('model.bin', 'settings.py'):
+            shutil.copy(os.path.join(DEFAULT_NER_MODEL_DIR, fnm), self.model_dir)
+        self.cache_dir = tempfile.mkdtemp()
+        self.old_cache_dir = os.environ.get('ESTNLTK_CACHE_DIR')
+        os.environ['ESTNLTK_CACHE_DIR'] = self.cache_dir
+
+    def tearDown(self):
+        if self.old_cache_dir is None:
+            del os.environ['ESTNLTK_CACHE_DIR']
+        else:
+            os.environ['ESTNLTK_CACHE_DIR'] = self.old_cache_dir
+        shutil.rmtree(self.model_dir)
+        shutil.rmtree(self.cache_dir)
+
+    def test_bundle(self):
+        util = ModelStorageUtil(self.model_dir)
+        self.assertIsNone(util.load_bundle())
+
+        NerTagger(self.model_dir)
+        # the bundle is written into the cache directory, not into the model directory
+        self.assertEqual(os.path.dirname(util.bundle_filename), os.path.join(self.cache_dir, 'ner'))
+        self.assertTrue(os.path.exists(util.bundle_filename))
+        self.assertEqual(sorted(os.listdir(self.model_dir)), ['model.bin', 'settings.py'])
+        settings, fex, model_data = util.load_bundle()
+        with open(util.model_filename, 'rb') as f:
+            self.assertEqual(model_data, f.read())
+
+        # the bundles of different model directories do not collide
+        self.assertNotEqual(util.bundle_filename, ModelStorageUtil(DEFAULT_NER_MODEL_DIR).bundle_filename)
+        cache_dir = tempfile.mkdtemp()
+        try:
+            NerTagger(self.model_dir, cache_dir=cache_dir)
+            self.assertIsNotNone(ModelStorageUtil(self.model_dir, cache_dir).load_bundle())
+        finally:
+            shutil.rmtree(cache_dir)
+
+        tagger = NerTagger(self.model_dir)
+        text = as_unicode('Elion AS ja EMT on Eesti suurimad ettevõted.')
+        t = Text(text, ner_tagger=tagger)
+        self.assertEqual(t.named_entities, ['Elion AS', 'EMT', 'Eesti'])
+        self.assertEqual(t.named_entity_labels, ['ORG', 'ORG', 'LOC'])
+
+        # modifying the settings makes the bundle outdated
+        with open(util.settings_filename, 'a') as f:
+            f.write('\n')
+        self.assertIsNone(util.load_bundle())
+
+    def test_shared_tagger(self):
+        tagger = load_shared_ner_tagger(self.model_dir)
+        self.assertIs(tagger, load_shared_ner_tagger(self.model_dir + os.sep))
@@ -84,3 +84,47 @@ class Tests(unittest.TestCase):
         self.assertTrue(element_positions.overlapping_left({'start': 10, 'end': 20}, {'start': 9, 'end': 15}))
         self.assertTrue(element_positions.overlapping_left({'start': 15, 'end': 20}, {'start': 10, 'end': 16}))
         self.assertFalse(element_positions.overlapping_left({'start': 10, 'end': 20}, {'start': 10, 'end': 19}))
+
+    def test_intersecting_index_pairs(self):
+        layer = [{'start': 5, 'end': 10}, {'start': 0, 'end': 6}, {'start': 0, 'end': 3}, {'start': 10, 'end': 12}]
+        self.assertListEqual(element_positions.intersecting_index_pairs(layer), [(1, 0), (1, 2), (2, 1)])
+
+    def test_iterate_intersecting_pairs(self):
+        a, b, c, d = {'start': 5, 'end': 10}, {'start': 0, 'end': 6}, {'start': 0, 'end': 3}, {'start': 10, 'end': 12}
+        layer = [a, b, c, d]
+        pairs = list(element_positions.iterate_intersecting_pairs(layer))
+        self.assertEqual(len(pairs), 2)
+        self.assertTrue(pairs[0][0] is b and pairs[0][1] is a)
+        self.assertTrue(pairs[1][0] is b and pairs[1][1] is c)
+
+        # the pairs of the deleted elements are not yielded
+        pairs = []
+        for x, y in element_positions.iterate_intersecting_pairs(layer):
+            pairs.append((x, y))
+            element_positions.pop_first_by_identity(layer, x)
+        self.assertEqual(len(pairs), 1)
+        self.assertListEqual(layer, [a, c, d])
+
+    def test_make_layer_nonconflicting(self):
+        def merge_func(a, b, **kwargs):
+            return {'type': a['type'] + '+' + b['type']}
+
+        layer = [{'start': 0, 'end': 10, 'type': 'a'},
+                 {'start': 3, 'end': 5, 'type': 'b'},
+                 {'start': 4, 'end': 12, 'type': 'c'},
+                 {'start': 20, 'end': 25, 'type': 'd'},
+                 {'start': 20, 'end': 25, 'type': 'e'}]
+        element_positions.make_layer_nonconflicting(layer, merge_func)
+        self.assertListEqual(layer, [{'start': 0, 'end': 3, 'type': 'a'},
+                                     {'start': 3, 'end': 4, 'type': 'a+b'},
+                                     {'start': 4, 'end': 5, 'type': 'a+b+c'},
+                                     {'start': 5, 'end': 10, 'type': 'a+c'},
+                                     {'start': 10, 'end': 12, 'type': 'c'},
+                                     {'start': 20, 'end': 25, 'type': 'd+e'}])
+        self.assertFalse(list(element_positions.iterate_intersecting_pairs(layer)))
+
+        layer = [{'start': 0, 'end': 3, 'type': 'a'}, {'start': 3, 'end': 5, 'type': 'b'}]
+        first = layer[0]
+        element_positions.make_layer_nonconflicting(layer, merge_func)
+        self.assertTrue(layer[0] is first)
+        self.assertEqual(len(layer), 2)
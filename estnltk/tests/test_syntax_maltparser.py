@@ -2,9 +2,11 @@
 from __future__ import unicode_literals, print_function, absolute_import
 
 import unittest
+import io
 
 from ..text import Text
 from ..syntax.parsers import MaltParser
+from ..syntax.maltparser_support import CONLLFeatGenerator, convert_text_to_CONLL
 from ..names import *
 
 
@@ -90,6 +92,91 @@ class MaltParserSupportTest(unittest.TestCase):
         self.assertEqual(treeStr, '(oli Auhinnaks (tekk ilus valge .))')
 
 
+    def test_maltparser_parallel_parsing(self):
+        mparser = MaltParser( )
+        text1 = Text('Jänes oli põllu peal. Hunt jooksis metsas. Karuott magas laanes. Kohtusid suur hunt ja kuri lammas.')
+        text2 = Text('Jänes oli põllu peal. Hunt jooksis metsas. Karuott magas laanes. Kohtusid suur hunt ja kuri lammas.')
+        conll1 = mparser.parse_text( text1, return_type="conll" )
+        conll2 = mparser.parse_text( text2, return_type="conll", n_jobs=2 )
+        self.assertListEqual( conll1, conll2 )
+        self.assertListEqual( text1[LAYER_CONLL], text2[LAYER_CONLL] )
+
+
+    def test_maltparser_parse_texts(self):
+        mparser = MaltParser( )
+        texts = [ Text('Jänes oli põllu peal. Hunt jooksis metsas.'), \
+                  Text('Karuott magas laanes.'), \
+                  Text('Kohtusid suur hunt ja kuri lammas. Auhinnaks oli ilus valge tekk.') ]
+        expected = [ mparser.parse_text( Text(text.text) )[LAYER_CONLL] for text in texts ]
+        results = mparser.parse_texts( texts, n_jobs=2 )
+        self.assertEqual( len(results), 3 )
+        for text, result, layer in zip( texts, results, expected ):
+            self.assertIs( result, text )
+            self.assertListEqual( text[LAYER_CONLL], layer )
+        # sentence indices should start from 0 in each text
+        self.assertListEqual( [w[SENT_ID] for w in texts[2][LAYER_CONLL]], [0]*7 + [1]*6 )
+
+
+    def test_generate_sentence_features(self):
+        text = Text('" Ma ei tea , " kehitas ta õlgu . Jänes oli põllu peal , kui hunt tuli .')
+        text.tag_analysis()
+        # Features of the words, as generated word by word by the earlier versions of the generator
+        expected = [ [ '1\t"\t"\tZ\tZ\t_', '2\tMa\tmina\tP\tP\tsg|n', '3\tei\tei\tV\tV\tneg|neg_aux', \
+                       '4\ttea\ttead\tV\tV\to|comp_main', '5\t,\t,\tZ\tZ\t_', '6\t"\t"\tZ\tZ\tclb', \
+                       '7\tkehitas\tkehita\tV\tV\ts|se_saying_verb', '8\tta\ttema\tP\tP\tsg|n', \
+                       '9\tõlgu\tõlg\tS\tS\tpl|p', '10\t.\t.\tZ\tZ\t_' ], \
+                     [ '1\tJänes\tjänes\tS\tS\tsg|n', '2\toli\tole\tV\tV\ts', '3\tpõllu\tpõld\tS\tS\tsg|g', \
+                       '4\tpeal\tpeal\tK\tK\t_', '5\t,\t,\tZ\tZ\tclb', '6\tkui\tkui\tD\tD_J\t_', \
+                       '7\thunt\thunt\tS\tS\tsg|n', '8\ttuli\ttule\tV\tV\ts', '9\t.\t.\tZ\tZ\t_' ] ]
+        feat_generator = CONLLFeatGenerator( addAmbiguousPos=True, addVerbcGramm=True, addNomAdvVinf=True, \
+                                             addClauseBound=True, addSeSayingVerbs=True )
+        for sentence_text, sentence_expected in zip( text.split_by( SENTENCES ), expected ):
+            # generate_features() returns the features, each followed by a tab
+            for i, word_expected in enumerate( sentence_expected ):
+                pieces = []
+                for feature in word_expected.split('\t'):
+                    pieces.extend( [feature, '\t'] )
+                self.assertListEqual( feat_generator.generate_features( sentence_text, i ), pieces )
+            # generate_sentence_features() returns a string per word, ending with a tab
+            results = CONLLFeatGenerator( addAmbiguousPos=True, addVerbcGramm=True, addNomAdvVinf=True, \
+                                          addClauseBound=True, addSeSayingVerbs=True ).generate_sentence_features( sentence_text )
+            self.assertListEqual( results, [ word + '\t' for word in sentence_expected ] )
+
+
+    def test_convert_text_to_CONLL(self):
+        class WordByWordGenerator(object):
+            # A custom generator: sentences are obtained via Text.split_by()
+            def __init__(self, generator):
+                self.generator = generator
+            def generate_features(self, sentence_text, wid):
+                return self.generator.generate_features(sentence_text, wid)
+        text = Text('" Ma ei tea , " kehitas ta õlgu . Jänes oli põllu peal , kui hunt tuli .')
+        text.tag_analysis()
+        feat_generator = CONLLFeatGenerator( addAmbiguousPos=True, addVerbcGramm=True, addClauseBound=True, \
+                                             addSeSayingVerbs=True )
+        expected = convert_text_to_CONLL( text, WordByWordGenerator( feat_generator ) )
+        self.assertEqual( convert_text_to_CONLL( text, feat_generator ), expected )
+        # Writing into a file-like object
+        out_f = io.StringIO()
+        self.assertIsNone( convert_text_to_CONLL( text, feat_generator, out_f=out_f ) )
+        self.assertEqual( out_f.getvalue(), expected )
+        self.assertEqual( expected.split('\n')[6], '7\tkehitas\tkehita\tV\tV\ts|se_saying_verb\t_\txxx\t_\t_' )
+
+
+    def test_convert_text_to_CONLL_keeps_text(self):
+        # Layers required by the feature generator are not added to the given text
+        import copy
+        text = Text('Jänes oli põllu peal , kui hunt tuli .')
+        text.tag_analysis()
+        original = copy.deepcopy( dict(text) )
+        feat_generator = CONLLFeatGenerator( addVerbcGramm=True, addClauseBound=True, addSeSayingVerbs=True )
+        conll = convert_text_to_CONLL( text, feat_generator )
+        self.assertEqual( dict(text), original )
+        self.assertFalse( text.is_tagged( VERB_CHAINS ) )
+        self.assertFalse( text.is_tagged( CLAUSE_ANNOTATION ) )
+        self.assertEqual( conll.split('\n')[4:6], ['5\t,\t,\tZ\tZ\tclb\t_\txxx\t_\t_', '6\tkui\tkui\tD\tD\t_\t_\txxx\t_\t_'] )
+
+
     def test_reading_from_conll_file_1(self):
         test_conll_string = \
 '''1	Ken	Ken	H	H	sg|n	4	@SUBJ	_	_
@@ -130,4 +217,29 @@ class MaltParserSupportTest(unittest.TestCase):
         expected_layer = [[['@SUBJ', 3]], [['@J', 2]], [['@SUBJ', 0]], [['ROOT', -1]], [['@ADVL', 3]], [['@Vpart', 3]], [['xxx', 5]], [['@SUBJ', 3]], [['@J', 2]], [['@SUBJ', 0]], [['ROOT', -1]], [['@Vpart', 3]], [['@ADVL', 3]], [['xxx', 5]]]
         #print(conll_layer)
         self.assertListEqual( conll_layer, expected_layer )
-        
\ No newline at end of file
+        
+
+    def test_align_CONLL_with_Text_normalise(self):
+        conll_lines = \
+'''1	Ken	Ken	H	H	sg|n	4	@SUBJ	_	_
+2	ja	ja	J	J	_	3	@J	_	_
+3	Tolk	Tolk	H	H	sg|n	1	@SUBJ	_	_
+4	käivad	käi	V	V	vad	0	ROOT	_	_
+5	.	.	Z	Z	_	5	xxx	_	_
+
+1	Jah	jah	D	D	_	1	@ADVL	_	_
+'''.split('\n')
+        from nltk.tokenize.simple import LineTokenizer
+        from nltk.tokenize.regexp import RegexpTokenizer
+        from estnltk.syntax.maltparser_support import align_CONLL_with_Text
+        from estnltk.syntax.utils import normalise_alignments
+        text = Text( 'Ken  ja  Tolk  käivad  .\nJah', word_tokenizer=RegexpTokenizer("  ", gaps=True), \
+                     sentence_tokenizer=LineTokenizer() )
+        text.tokenize_words()
+        for kwargs in [ {}, {'keep_old':True, 'mark_root':True, 'fix_out_of_sent':True} ]:
+            alignments1 = align_CONLL_with_Text( list(conll_lines), text, None, **kwargs )
+            alignments1 = normalise_alignments( alignments1, data_type=CONLL_DATA, **kwargs )
+            alignments2 = align_CONLL_with_Text( list(conll_lines), text, None, normalise=True, **kwargs )
+            self.assertListEqual( alignments1, alignments2 )
+        self.assertListEqual( [ a[PARSER_OUT] for a in alignments2 ], \
+            [[['@SUBJ', 3]], [['@J', 2]], [['@SUBJ', 0]], [['ROOT', -1]], [['xxx', 3]], [['ROOT', -1]]] )
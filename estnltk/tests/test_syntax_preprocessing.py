@@ -5,9 +5,19 @@ import unittest
 
 from ..text import Text
 from ..syntax.syntax_preprocessing import SyntaxPreprocessing
+from ..syntax.syntax_preprocessing import convert_mrf_to_syntax_mrf, convert_pronouns
+from ..syntax.syntax_preprocessing import remove_duplicate_analyses, add_hashtag_info
+from ..syntax.syntax_preprocessing import tag_subcat_info, convert_to_cg3_input
+from ..syntax.syntax_preprocessing import compile_subcat_rules
+from ..syntax.syntax_preprocessing import load_cached_rules, load_subcat_info, load_compiled_subcat_info
+from ..syntax.syntax_preprocessing import SUBCAT_RULES_FILE
+from ..syntax import syntax_preprocessing
 from ..names import *
 
 import json
+import os
+import shutil
+import tempfile
 
 class SyntaxPreprocessingTest(unittest.TestCase):
 
@@ -129,3 +139,103 @@ class SyntaxPreprocessingTest(unittest.TestCase):
                                '"<.>"', \
                                '    "." Z Fst  ', \
                                '"</s>"'], result_lines )
+
+
+    def test_process_mrf_lines_same_as_separate_steps(self):
+        mrf_lines = [ '<s>',\
+        'Ta',\
+        '    tema+0 //_P_ sg n //',\
+        'läks',\
+        '    mine+s //_V_ s //',\
+        'läbi',\
+        '    läbi+0 //_D_  //',\
+        '    läbi+0 //_K_ pre //',\
+        '    läbi+0 //_K_ post //',\
+        '    läbi+0 //_K_ post //',\
+        'metsa',\
+        '    mets+0 //_S_ adt, sg g, sg p //',\
+        '"',\
+        '    "+0 //_Z_ //',\
+        '</s>'
+        ]
+        preprocessor = SyntaxPreprocessing()
+        result_lines = preprocessor.process_mrf_lines(mrf_lines)
+        # The input list should not be modified
+        self.assertEqual( len(mrf_lines), 15 )
+        # The pipeline should give the same results as the separate steps 
+        lines = convert_mrf_to_syntax_mrf( list(mrf_lines), preprocessor.fs_to_synt_rules )
+        lines = convert_pronouns( lines )
+        lines = remove_duplicate_analyses( lines, allow_to_delete_all=False )
+        lines = add_hashtag_info( lines )
+        lines = tag_subcat_info( lines, preprocessor.subcat_rules )
+        lines = remove_duplicate_analyses( lines, allow_to_delete_all=False )
+        lines = convert_to_cg3_input( lines )
+        self.assertListEqual( lines, result_lines )
+        self.assertIn( '    "läbi" L0 K post <gen>  ', result_lines )
+        self.assertIn( '    """ L0 Z Quo  ', result_lines )
+
+
+    def test_compile_subcat_rules(self):
+        rules = { 'läbi': ['_V_ >#Part', '_K_ post >#gen |#nom |#el', '_K_ pre >#gen'] }
+        compiled = compile_subcat_rules( rules )
+        self.assertEqual( len(compiled['läbi']), 3 )
+        self.assertEqual( compiled['läbi'][0], (('_V_',), ((('#Part', '\\1 #Part //'),),)) )
+        conditions, additions = compiled['läbi'][1]
+        self.assertEqual( conditions, ('_K_', 'post') )
+        self.assertEqual( [ [item for item, repl in a] for a in additions ], [['#gen'], ['#nom'], ['#el']] )
+        lines = tag_subcat_info( ['läbi', '    läbi+0 //_K_ post //'], rules )
+        self.assertListEqual( ['läbi', '    läbi+0 //_K_ post #el //', \
+                                       '    läbi+0 //_K_ post #nom //', \
+                                       '    läbi+0 //_K_ post #gen //'], lines )
+
+
+class SyntaxPreprocessingRulesCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+        self.rules_file = os.path.join(self.tmp_dir, 'abileksikon06utf.lx')
+        shutil.copy(SUBCAT_RULES_FILE, self.rules_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_rules_are_parsed_once(self):
+        rules1 = load_cached_rules(load_subcat_info, self.rules_file, cache_dir=self.cache_dir)
+        rules2 = load_cached_rules(load_subcat_info, self.rules_file, cache_dir=self.cache_dir)
+        self.assertIs(rules1, rules2)
+        # the binary cache is not used by default
+        self.assertFalse(os.path.exists(self.cache_dir))
+        self.assertListEqual(os.listdir(self.tmp_dir), ['abileksikon06utf.lx'])
+        preprocessor1 = SyntaxPreprocessing(subcat_rules=self.rules_file)
+        preprocessor2 = SyntaxPreprocessing(subcat_rules=self.rules_file)
+        self.assertIs(preprocessor1.subcat_rules, preprocessor2.subcat_rules)
+        self.assertIs(preprocessor1.fs_to_synt_rules, preprocessor2.fs_to_synt_rules)
+
+    def test_modified_rules_are_reloaded(self):
+        rules1 = load_cached_rules(load_subcat_info, self.rules_file)
+        self.assertNotIn('xyzzy', rules1)
+        with open(self.rules_file, 'ab') as f:
+            f.write('xyzzy\n_V_ >#Intr \n'.encode('utf-8'))
+        rules2 = load_cached_rules(load_subcat_info, self.rules_file)
+        self.assertEqual(rules2['xyzzy'], ['_V_ >#Intr'])
+
+    def test_binary_cache(self):
+        rules1 = load_cached_rules(load_subcat_info, self.rules_file, binary_cache=True, cache_dir=self.cache_dir)
+        compiled1 = load_cached_rules(load_compiled_subcat_info, self.rules_file, binary_cache=True,
+                                      cache_dir=self.cache_dir)
+        # the loaders of the same file have separate cache files
+        cache_files = sorted(os.listdir(self.cache_dir))
+        self.assertEqual(len(cache_files), 2)
+        self.assertTrue(cache_files[0].endswith('.load_compiled_subcat_info.pickle'))
+        self.assertTrue(cache_files[1].endswith('.load_subcat_info.pickle'))
+        self.assertListEqual(sorted(os.listdir(self.tmp_dir)), ['abileksikon06utf.lx', 'cache'])
+        # in a new process, the in-process cache is empty
+        syntax_preprocessing._rules_cache.clear()
+        rules2 = load_cached_rules(load_subcat_info, self.rules_file, binary_cache=True, cache_dir=self.cache_dir)
+        compiled2 = load_cached_rules(load_compiled_subcat_info, self.rules_file, binary_cache=True,
+                                      cache_dir=self.cache_dir)
+        self.assertIsNot(rules1, rules2)
+        self.assertEqual(rules1, rules2)
+        self.assertEqual(compiled1[0], compiled2[0])
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), cache_files)
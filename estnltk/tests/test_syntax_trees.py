@@ -6,6 +6,7 @@ import unittest
 from ..text import Text
 from ..mw_verbs.utils import WordTemplate
 from ..syntax.utils   import Tree, build_trees_from_sentence
+from ..syntax.utils   import DependencyTree, build_dependency_tree_from_sentence
 from ..names import *
 
 
@@ -190,3 +191,64 @@ class SyntacticTreesTest(unittest.TestCase):
         self.assertListEqual(deprels, ['@SUBJ'])
         self.assertListEqual(words, ['Naabritalu'])
 
+
+
+    def test_dependency_tree_structure(self):
+        syntax = self.sentence_2_syntax()
+        morhp  = self.sentence_2_morphology()
+        tree = \
+            build_dependency_tree_from_sentence( morhp, syntax, layer=LAYER_VISLCG3, sentence_id=0 )
+        self.assertEqual(len(tree), 6)
+        self.assertListEqual(tree.roots, [2])
+        self.assertListEqual(list(tree.parents), [2, 2, -1, 4, 2, 4])
+        self.assertListEqual(list(tree.depths),  [1, 1, 0, 2, 1, 2])
+        self.assertListEqual(tree.get_direct_children(2), [0, 1, 4])
+        self.assertListEqual(tree.get_direct_children(4), [3, 5])
+        self.assertListEqual(tree.get_subtree(2), [2, 0, 1, 4, 3, 5])
+        self.assertEqual(tree.get_subtree_span(4), (3, 5))
+        self.assertEqual(tree.get_subtree_span(2), (0, 5))
+        self.assertListEqual(tree.get_ancestors(5), [4, 2])
+        self.assertEqual(tree.get_root(3), 2)
+        self.assertEqual(tree.get_tree_depth(2), 2)
+        self.assertEqual(tree.get_tree_depth(4), 1)
+        self.assertEqual(tree.get_tree_depth(0), 0)
+
+
+    def test_dependency_tree_get_children(self):
+        syntax = self.sentence_2_syntax()
+        morhp  = self.sentence_2_morphology()
+        tree = \
+            build_dependency_tree_from_sentence( morhp, syntax, layer=LAYER_VISLCG3, sentence_id=0 )
+        root = build_trees_from_sentence( morhp, syntax, layer=LAYER_VISLCG3, sentence_id=0 )[0]
+        # Results should be the same as in case of the linked trees
+        word_template = WordTemplate({ POSTAG:'[SH]'})
+        for kwargs in [ {}, {'depth_limit':1}, {'include_self':True}, {'label':'@OBJ'}, \
+                        {'label_regexp':'(@SUBJ|@OBJ|@FMV)', 'include_self':True}, \
+                        {'word_template':word_template, 'include_self':True} ]:
+            expected = [ t.word_id for t in root.get_children( sorted=True, **kwargs ) ]
+            self.assertListEqual(tree.get_children( 2, **kwargs ), expected)
+        self.assertListEqual(tree.get_children( 2, postag='S' ), [0, 1, 4])
+        self.assertListEqual(tree.get_children( 4, postag=['A', 'Z'] ), [3, 5])
+        self.assertListEqual(tree.find_words( label='@ADVL' ), [1])
+
+
+    def test_dependency_tree_as_dependencygraph(self):
+        syntax = self.sentence_2_syntax()
+        morhp  = self.sentence_2_morphology()
+        tree = \
+            build_dependency_tree_from_sentence( morhp, syntax, layer=LAYER_VISLCG3, sentence_id=0 )
+        root = build_trees_from_sentence( morhp, syntax, layer=LAYER_VISLCG3, sentence_id=0 )[0]
+        graphs = tree.as_dependencygraphs()
+        self.assertEqual(len(graphs), 1)
+        self.assertEqual(graphs[0].to_conll(10), root.as_dependencygraph().to_conll(10))
+        self.assertEqual(str(tree.as_nltk_tree(2)), str(root.as_nltk_tree()))
+
+
+    def test_dependency_tree_cycles_and_self_links(self):
+        # Self-linked words become roots; words in cycles do not belong to any tree
+        tree = DependencyTree( [-1, 1, 3, 2, 0] )
+        self.assertListEqual(tree.roots, [0, 1])
+        self.assertListEqual(list(tree.depths), [0, 0, -1, -1, 1])
+        self.assertListEqual(tree.get_children( 0 ), [4])
+        self.assertListEqual(tree.get_ancestors( 2 ), [])
+        self.assertEqual(tree.get_root( 3 ), -1)
@@ -59,6 +59,16 @@ class VislCG3ParserTest(unittest.TestCase):
         #print(text[LAYER_VISLCG3])
         self.assertListEqual( text[LAYER_VISLCG3], expected_layer )
         
+    def test_vislcg3parser_parallel_parsing(self):
+        parser = VISLCG3Parser( vislcg_cmd = self.get_vislcg_cmd() )
+        texts = [ Text('Jänes oli parajasti põllu peal. Hunt jooksis metsas.'), \
+                  Text('Karuott magas laanes. Kohtusid suur hunt ja kuri lammas.') ]
+        expected = [ parser.parse_text( Text(text.text) )[LAYER_VISLCG3] for text in texts ]
+        results = parser.parse_texts( texts, n_jobs=2 )
+        for text, result, layer in zip( texts, results, expected ):
+            self.assertIs( result, text )
+            self.assertListEqual( text[LAYER_VISLCG3], layer )
+        
     def test_vislcg3parser_sent1_with_text_trees(self):
         parser = VISLCG3Parser( vislcg_cmd = self.get_vislcg_cmd() )
         text = Text('Jänes oli parajasti põllu peal.', syntactic_parser=parser )
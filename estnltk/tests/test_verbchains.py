@@ -4,11 +4,28 @@ from __future__ import unicode_literals, print_function, absolute_import
 import unittest
 
 from ..text import Text
+from ..names import VERB_CHAINS
 
 from ..core import VERB_CHAIN_RES_PATH
 from ..mw_verbs.verbchain_detector import VerbChainDetector
 
 
+class SingleWordDetector(VerbChainDetector):
+    # Detector overriding detectVerbChainsFromSent()
+    def detectVerbChainsFromSent( self, sentence, **kwargs ):
+        chains = VerbChainDetector.detectVerbChainsFromSent( self, sentence, **kwargs )
+        return [chain for chain in chains if len(chain['phrase']) == 1]
+
+
+class SentenceOnlyDetector(object):
+    # Detector providing only detectVerbChainsFromSent()
+    def __init__(self):
+        self.detector = VerbChainDetector( resourcesPath=VERB_CHAIN_RES_PATH )
+
+    def detectVerbChainsFromSent( self, sentence, **kwargs ):
+        return self.detector.detectVerbChainsFromSent( sentence, **kwargs )
+
+
 class VerbchainTest(unittest.TestCase):
 
     def test_verbchain_1(self):
@@ -70,4 +87,68 @@ class VerbchainTest(unittest.TestCase):
         #with self.assertRaises(Exception) as e:
         #    text.tag_verb_chains()
         #self.assertNotIsInstance(e, IndexError, 'Inappropriate exception for error')
-        self.assertTrue(True)
\ No newline at end of file
+        self.assertTrue(True)
+
+    def test_word_template_rules(self):
+        # Compiled rules must give the same results as re.match( pattern, value )
+        import re
+        from ..names import ANALYSIS, ROOT, POSTAG, FORM, TEXT
+        from ..mw_verbs.utils import WordTemplate
+        patterns = ['V', '[DJ]', 'neg.*', 'neg o', '^ole$', '^(da|ma)$', 'nud$', '(tud)$', 
+                    'o|nud|tavat$', '^(ja|ning|ega|v[ōõ]i)$', '^,+$', '^.*,$', '']
+        values = ['V', 'D', 'J', 'Z', 'neg', 'neg o', 'neg ge', 'ole', 'olema', 'da', 'ma', 'mas', 
+                  'nud', 'tud', 'o', 'tavat', 'tavatu', 'ja', 'või', 'vōi', ',', ',,', 'a,', 'ole\n', '']
+        for pattern in patterns:
+            for field in [ROOT, POSTAG, FORM, TEXT]:
+                template = WordTemplate({field: pattern})
+                for value in values:
+                    token = {TEXT: value, ANALYSIS: [{ROOT: value, POSTAG: value, FORM: value}]}
+                    expected = re.match(pattern, value) != None
+                    self.assertEqual(template.matches(token), expected, (pattern, field, value))
+        # Templates created with the same rules do not share the rules added later
+        template1 = WordTemplate({POSTAG: 'V'})
+        template2 = WordTemplate({POSTAG: 'V'})
+        template2.addRule(FORM, '^(da|ma)$')
+        token = {TEXT: 'olla', ANALYSIS: [{ROOT: 'ole', POSTAG: 'V', FORM: 'nud'}, 
+                                          {ROOT: 'ole', POSTAG: 'V', FORM: 'da'}]}
+        self.assertEqual(template1.matchingAnalyseIndexes(token), [0, 1])
+        self.assertEqual(template2.matchingAnalyseIndexes(token), [1])
+        self.assertEqual(list(WordTemplate({POSTAG: 'V'}).analysisRules.keys()), [POSTAG])
+
+    def test_detect_documents(self):
+        documents = ['Samas on selge, et senine korraldus jätkuda ei saa.', 
+                     'Kass, suur ja must, ei jooksnud üle tee. Mina ei tahtnud minna.', 
+                     '']
+        expected = []
+        for document in documents:
+            text = Text(document)
+            expected.append( text.verb_chains if document else [] )
+        detector = VerbChainDetector( resourcesPath=VERB_CHAIN_RES_PATH )
+        for n_jobs in [1, 2]:
+            results = detector.detect_documents( [Text(document) for document in documents], n_jobs=n_jobs )
+            self.assertEqual(len(results), 3)
+            self.assertEqual(results, expected)
+        self.assertListEqual([chain['roots'] for chain in results[1]], [['ei', 'jooks'], ['ei', 'taht', 'mine']])
+
+    def test_custom_detectors(self):
+        # Detectors given to Text are used through detectVerbChainsFromSent()
+        document = 'Samas on selge, et senine korraldus jätkuda ei saa. Saaks ehk jätkuda teisiti.'
+        detector = SingleWordDetector( resourcesPath=VERB_CHAIN_RES_PATH )
+        text = Text(document, verbchain_detector=detector)
+        self.assertListEqual(text.verb_chain_texts, ['on'])
+        self.assertEqual(detector.detect_documents( [Text(document)], n_jobs=2 ), [text.verb_chains])
+
+        text = Text(document, verbchain_detector=SentenceOnlyDetector())
+        self.assertListEqual(text.verb_chain_texts, ['on','jätkuda ei saa','Saaks jätkuda'])
+
+    def test_detect_documents_indexed(self):
+        # Unless detectVerbChainsFromSent() is overridden in a subclass, the sentences
+        # of the documents are indexed once, without calling detectVerbChainsFromSent()
+        document = 'Samas on selge, et senine korraldus jätkuda ei saa. Saaks ehk jätkuda teisiti.'
+        detector = VerbChainDetector( resourcesPath=VERB_CHAIN_RES_PATH )
+        def detectVerbChainsFromSent( sentence, **kwargs ):
+            raise AssertionError('detectVerbChainsFromSent() should not be called')
+        detector.detectVerbChainsFromSent = detectVerbChainsFromSent
+        text = Text(document)
+        text[VERB_CHAINS] = detector.detect_documents( [text] )[0]
+        self.assertListEqual(text.verb_chain_texts, ['on','jätkuda ei saa','Saaks jätkuda'])
@@ -12,18 +12,14 @@ from .core import VERB_CHAIN_RES_PATH
 from .names import *
 from .dividing import divide, divide_by_spans
 from .vabamorf import morf as vabamorf
-from .ner import NerTagger
-from .timex import TimexTagger
-from .wordnet_tagger import WordnetTagger
-from .clausesegmenter import ClauseSegmenter
-from .mw_verbs.verbchain_detector import VerbChainDetector
 from .textcleaner import TextCleaner
 from .tokenizers import EstWordTokenizer
-from .syntax import MaltParser, VISLCG3Parser, build_trees_from_text
+from .instrumentation import instrumented
+
+# NB! The taggers, the syntactic parsers and pandas are imported only when they are
+# first needed, as importing them takes a significant part of the start-up time.
 
 import six
-import pandas
-import nltk.data
 import regex as re
 from nltk.tokenize.regexp import RegexpTokenizer
 
@@ -36,17 +32,8 @@ from pprint import pprint
 # default functionality
 paragraph_tokenizer = RegexpTokenizer('\n\n', gaps=True, discard_empty=True)
 
-# use NLTK-s sentence tokenizer for Estonian, in case it is not downloaded, try to download it first
+# NLTK-s sentence tokenizer for Estonian, loaded on first use
 sentence_tokenizer = None
-try:
-    sentence_tokenizer = nltk.data.load('tokenizers/punkt/estonian.pickle')
-except LookupError:
-    import nltk.downloader
-    nltk.downloader.download('punkt')
-finally:
-    if sentence_tokenizer is None:
-        sentence_tokenizer = nltk.data.load('tokenizers/punkt/estonian.pickle')
-
 word_tokenizer = EstWordTokenizer()
 nertagger = None
 timextagger = None
@@ -57,16 +44,37 @@ wordnet_tagger = None
 syntactic_parser = None
 
 
+def _count_words(text, *args, **kwargs):
+    """The number of words in the text, used as the item count of instrumented methods."""
+    return len(text[WORDS]) if WORDS in text else 0
+
+
+def load_default_sentence_tokenizer():
+    global sentence_tokenizer
+    if sentence_tokenizer is None:
+        import nltk.data
+        # use NLTK-s sentence tokenizer for Estonian, in case it is not downloaded, try to download it first
+        try:
+            sentence_tokenizer = nltk.data.load('tokenizers/punkt/estonian.pickle')
+        except LookupError:
+            import nltk.downloader
+            nltk.downloader.download('punkt')
+            sentence_tokenizer = nltk.data.load('tokenizers/punkt/estonian.pickle')
+    return sentence_tokenizer
+
+
 def load_default_ner_tagger():
     global nertagger
     if nertagger is None:
-        nertagger = NerTagger()
+        from .ner import load_shared_ner_tagger
+        nertagger = load_shared_ner_tagger()
     return nertagger
 
 
 def load_default_timex_tagger():
     global timextagger
     if timextagger is None:
+        from .timex import TimexTagger
         timextagger = TimexTagger()
     return timextagger
 
@@ -74,6 +82,7 @@ def load_default_timex_tagger():
 def load_default_clausesegmenter():
     global clausesegmenter
     if clausesegmenter is None:
+        from .clausesegmenter import ClauseSegmenter
         clausesegmenter = ClauseSegmenter()
     return clausesegmenter
 
@@ -81,6 +90,7 @@ def load_default_clausesegmenter():
 def load_default_verbchain_detector():
     global verbchain_detector
     if verbchain_detector is None:
+        from .mw_verbs.verbchain_detector import VerbChainDetector
         verbchain_detector = VerbChainDetector(resourcesPath=VERB_CHAIN_RES_PATH)
     return verbchain_detector
 
@@ -88,10 +98,19 @@ def load_default_verbchain_detector():
 def load_default_syntactic_parser():
     global syntactic_parser
     if syntactic_parser is None:
+        from .syntax.parsers import MaltParser
         syntactic_parser = MaltParser()
     return syntactic_parser
 
 
+def load_default_wordnet_tagger():
+    global wordnet_tagger
+    if wordnet_tagger is None:
+        from .wordnet_tagger import WordnetTagger
+        wordnet_tagger = WordnetTagger()
+    return wordnet_tagger
+
+
 class Text(dict):
     """Central class of Estnltk that is the main interface of performing
     all NLP operations.
@@ -143,7 +162,7 @@ class Text(dict):
         self.__paragraph_tokenizer = kwargs.get(
             'paragraph_tokenizer', paragraph_tokenizer)
         self.__sentence_tokenizer = kwargs.get(
-            'sentence_tokenizer', sentence_tokenizer)
+            'sentence_tokenizer', None) # lazy loading
         self.__word_tokenizer = kwargs.get(
             'word_tokenizer', word_tokenizer)
         self.__ner_tagger = kwargs.get( # ner models take time to load, load only when needed
@@ -366,6 +385,7 @@ class Text(dict):
             mapping[layer]()
         return self
 
+    @instrumented('Text.tokenize_paragraphs')
     def tokenize_paragraphs(self):
         """Apply paragraph tokenization to this Text instance. Creates ``paragraphs`` layer."""
         tok = self.__paragraph_tokenizer
@@ -411,6 +431,7 @@ class Text(dict):
             self.tokenize_paragraphs()
         return self.ends(PARAGRAPHS)
 
+    @instrumented('Text.tokenize_sentences')
     def tokenize_sentences(self):
         """Apply sentence tokenization to this Text instance. Creates ``sentences`` layer.
            Automatically tokenizes paragraphs, if they are not already tokenized.
@@ -419,6 +440,8 @@ class Text(dict):
         """
         if not self.is_tagged(PARAGRAPHS):
             self.tokenize_paragraphs()
+        if self.__sentence_tokenizer is None:
+            self.__sentence_tokenizer = load_default_sentence_tokenizer()
         tok  = self.__sentence_tokenizer
         text = self.text
         dicts = []
@@ -514,6 +537,7 @@ class Text(dict):
             self.tokenize_sentences()
         return self.ends(SENTENCES)
 
+    @instrumented('Text.tokenize_words', items=_count_words)
     def tokenize_words(self):
         """Apply word tokenization and create ``words`` layer.
 
@@ -533,6 +557,7 @@ class Text(dict):
         self[WORDS] = dicts
         return self
 
+    @instrumented('Text.tag_analysis', items=_count_words)
     def tag_analysis(self):
         """Tag ``words`` layer with morphological analysis attributes."""
         if not self.is_tagged(WORDS):
@@ -722,6 +747,7 @@ class Text(dict):
     def tag_syntax_vislcg3(self):
         """ Changes default syntactic parser to VISLCG3Parser, performs syntactic analysis,
             and stores the results in the layer named LAYER_VISLCG3."""
+        from .syntax.parsers import VISLCG3Parser
         if not self.__syntactic_parser or not isinstance(self.__syntactic_parser, VISLCG3Parser):
             self.__syntactic_parser = VISLCG3Parser()
         return self.tag_syntax()
@@ -729,15 +755,18 @@ class Text(dict):
     def tag_syntax_maltparser(self):
         """ Changes default syntactic parser to MaltParser, performs syntactic analysis,
             and stores the results in the layer named LAYER_CONLL."""
+        from .syntax.parsers import MaltParser
         if not self.__syntactic_parser or not isinstance(self.__syntactic_parser, MaltParser):
             self.__syntactic_parser = MaltParser()
         return self.tag_syntax()
 
+    @instrumented('Text.tag_syntax', items=_count_words)
     def tag_syntax(self):
         """ Parses this text with the syntactic analyzer (``self.__syntactic_parser``), 
             and stores the found syntactic analyses: into the layer LAYER_CONLL (if MaltParser 
             is used, default), or into the layer LAYER_VISLCG3 (if VISLCG3Parser is used).
         """
+        from .syntax.parsers import MaltParser, VISLCG3Parser
         # Load default Syntactic tagger:
         if self.__syntactic_parser is None:
             self.__syntactic_parser = load_default_syntactic_parser()
@@ -768,6 +797,7 @@ class Text(dict):
             Otherwise, the *layer* must be provided by the user and it must be 
             either LAYER_CONLL or LAYER_VISLCG3. 
         """
+        from .syntax.parsers import MaltParser, VISLCG3Parser
         # If no layer specified, decide the layer based on the type of syntactic
         # analyzer used:
         if not layer and self.__syntactic_parser:
@@ -801,14 +831,17 @@ class Text(dict):
     def syntax_trees_conll(self):
         """ Return syntactic trees built from CONLL (MaltParser's) syntactic annotation. """
         assert LAYER_CONLL in self, '(!) Missing syntactic annotations layer: '+LAYER_CONLL+'!'
+        from .syntax.utils import build_trees_from_text
         return build_trees_from_text( self, layer=LAYER_CONLL )
 
     @cached_property
     def syntax_trees_vislcg3(self):
         """ Return syntactic trees built from VISL CG3's syntactic annotations. """
         assert LAYER_VISLCG3 in self, '(!) Missing syntactic annotations layer: '+LAYER_VISLCG3+'!'
+        from .syntax.utils import build_trees_from_text
         return build_trees_from_text( self, layer=LAYER_VISLCG3 )
 
+    @instrumented('Text.tag_labels', items=_count_words)
     def tag_labels(self):
         """Tag named entity labels in the ``words`` layer."""
         if not self.is_tagged(ANALYSIS):
@@ -825,6 +858,7 @@ class Text(dict):
             self.tag_labels()
         return [word[LABEL] for word in self.words]
 
+    @instrumented('Text.tag_named_entities', items=_count_words)
     def tag_named_entities(self):
         """Tag ``named_entities`` layer.
 
@@ -880,6 +914,7 @@ class Text(dict):
             self.tag_named_entities()
         return [ne[LABEL] for ne in self[NAMED_ENTITIES]]
 
+    @instrumented('Text.tag_timexes', items=_count_words)
     def tag_timexes(self):
         """Create ``timexes`` layer.
         Depends on morphological analysis data in ``words`` layer
@@ -940,6 +975,7 @@ class Text(dict):
             self.tag_timexes()
         return self.spans(TIMEXES)
 
+    @instrumented('Text.tag_clause_annotations', items=_count_words)
     def tag_clause_annotations(self):
         """Tag clause annotations in ``words`` layer.
         Depends on morphological analysis.
@@ -966,6 +1002,7 @@ class Text(dict):
             self.tag_clause_annotations()
         return [word.get(CLAUSE_IDX, None) for word in self[WORDS]]
 
+    @instrumented('Text.tag_clauses', items=_count_words)
     def tag_clauses(self):
         """Create ``clauses`` multilayer.
 
@@ -1013,6 +1050,7 @@ class Text(dict):
             self.tag_clauses()
         return self.texts(CLAUSES)
 
+    @instrumented('Text.tag_verb_chains', items=_count_words)
     def tag_verb_chains(self):
         """Create ``verb_chains`` layer.
            Depends on ``clauses`` layer.
@@ -1021,18 +1059,15 @@ class Text(dict):
             self.tag_clauses()
         if self.__verbchain_detector is None:
             self.__verbchain_detector = load_default_verbchain_detector()
-        sentences = self.divide()
+        detector = self.__verbchain_detector
+        if hasattr(detector, 'detect_documents'):
+            self[VERB_CHAINS] = detector.detect_documents( [self] )[0]
+            return self
+        # detectors providing only the per-sentence interface
+        from .mw_verbs.verbchain_detector import addChainSpans
         verbchains = []
-        for sentence in sentences:
-            chains = self.__verbchain_detector.detectVerbChainsFromSent( sentence )
-            for chain in chains:
-                # 1) Get spans for all words of the phrase
-                word_spans = [ ( sentence[idx][START], sentence[idx][END] ) \
-                                 for idx in sorted( chain[PHRASE] ) ]
-                # 2) Assign to the chain
-                chain[START] = [ span[0] for span in word_spans ]
-                chain[END]   = [ span[1] for span in word_spans ]
-            verbchains.extend(chains)
+        for sentence in self.divide():
+            verbchains.extend(addChainSpans(sentence, detector.detectVerbChainsFromSent(sentence)))
         self[VERB_CHAINS] = verbchains
         return self
 
@@ -1109,16 +1144,15 @@ class Text(dict):
         """The other verb attributes of ``verb_chains`` elements."""
         return [vc[OTHER_VERBS] for vc in self.verb_chains]
 
+    @instrumented('Text.tag_wordnet', items=_count_words)
     def tag_wordnet(self, **kwargs):
         """Create wordnet attribute in ``words`` layer.
 
         See :py:meth:`~estnltk.text.wordnet_tagger.WordnetTagger.tag_text` method
         for applicable keyword arguments.
         """
-        global wordnet_tagger
-        if wordnet_tagger is None: # cached wn tagger
-            wordnet_tagger = WordnetTagger()
-        self.__wordnet_tagger = wordnet_tagger
+        if self.__wordnet_tagger is None: # cached wn tagger
+            self.__wordnet_tagger = load_default_wordnet_tagger()
         if len(kwargs) > 0:
             return self.__wordnet_tagger.tag_text(self, **kwargs)
         return self.__wordnet_tagger.tag_text(self, **self.__kwargs)
@@ -1365,6 +1399,7 @@ class Text(dict):
     # DIVIDING
     # ///////////////////////////////////////////////////////////////////
 
+    @instrumented('Text.divide', items=_count_words)
     def divide(self, layer=WORDS, by=SENTENCES):
         """Divide the Text into pieces by keeping references to original elements, when possible.
         This is not possible only, if the _element_ is a multispan.
@@ -1445,6 +1480,7 @@ class ZipBuilder(object):
 
     @property
     def as_dataframe(self):
+        import pandas
         df = pandas.DataFrame.from_dict(self.as_dict)
         return df[self.__keys]
 
@@ -47,7 +47,7 @@ setup(
     #change the version in file `estnltk/__about__.py`
     version = __version__,
 
-    packages = find_packages(),
+    packages = find_packages(exclude=['benchmarks', 'benchmarks.*']),
     include_package_data=True,
     package_data = {
         'estnltk': ['corpora/arvutustehnika_ja_andmetootlus/*.xml', 'corpora/*.json', 'java-res/*.*'],